@@ -0,0 +1,95 @@
+"""
+agent_holder.py
+Process-wide holder for the agent.
+The agent (embedding model, vector store client, LLM client, compiled graph) is
+built once, optionally in a background thread while the UI is already serving,
+and reused by every run.
+"""
+
+import threading
+import time
+from typing import Any, Callable, Optional
+
+
+class AgentHolder:
+    """Builds an object once with `factory` and hands out the same instance afterwards."""
+
+    def __init__(self, factory: Callable[[], Any]):
+        """
+        Args:
+            factory: Callable without arguments that builds the agent.
+        """
+        self.factory = factory
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._instance = None
+        self._error: Optional[Exception] = None
+        self._state = "not started"
+        self._build_seconds: Optional[float] = None
+
+    def _build(self) -> None:
+        start = time.perf_counter()
+        try:
+            instance = self.factory()
+            with self._lock:
+                self._instance = instance
+                self._error = None
+                self._state = "ready"
+        except Exception as e:
+            print(f"Error building agent: {e}")
+            with self._lock:
+                self._error = e
+                self._state = "failed"
+        finally:
+            self._build_seconds = time.perf_counter() - start
+            self._ready.set()
+
+    def start(self) -> None:
+        """Start building the agent in a background thread (no-op if already started)."""
+        with self._lock:
+            if self._thread is not None or self._instance is not None:
+                return
+            self._state = "loading"
+            self._thread = threading.Thread(target=self._build, name="agent-warmup", daemon=True)
+            self._thread.start()
+
+    def get(self, timeout: Optional[float] = None):
+        """
+        Return the agent, building it first if that has not happened yet.
+
+        Args:
+            timeout (float, optional): Maximum seconds to wait for a build in progress.
+
+        Returns:
+            The agent instance.
+
+        Raises:
+            TimeoutError: If the agent is not ready within `timeout`.
+            Exception: The error of the failed build. A failed build is retried on the next call.
+        """
+        self.start()
+        if not self._ready.wait(timeout):
+            raise TimeoutError("Agent is still loading.")
+        with self._lock:
+            if self._instance is not None:
+                return self._instance
+            error = self._error
+            # allow a retry on the next call
+            self._thread = None
+            self._ready.clear()
+        raise error
+
+    def status(self) -> str:
+        """Return a short human readable readiness status."""
+        if self._state == "ready":
+            return f"Agent ready (built in {self._build_seconds:.1f}s)."
+        if self._state == "failed":
+            return f"Agent failed to build: {self._error}"
+        if self._state == "loading":
+            return "Agent is loading..."
+        return "Agent not started."
+
+    @property
+    def is_ready(self) -> bool:
+        return self._state == "ready"
@@ -0,0 +1,146 @@
+"""
+answer_store.py
+On-disk store for agent answers.
+Answers are written as soon as a question is finished, so an interrupted run
+loses nothing and a rerun only answers the questions that are still missing.
+An answer is only reused for the same task, question text, model and system prompt.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from typing import Callable, Optional
+
+DEFAULT_STORE_PATH = os.getenv("ANSWER_STORE_PATH", "answer_store.sqlite")
+FINAL_ANSWER_MARKER = "FINAL ANSWER:"
+
+
+class FailedAnswer(str):
+    """An answer that is submitted as it is but never stored: errors and answers without the FINAL ANSWER marker."""
+
+
+def extract_final_answer(content: str) -> str:
+    """
+    Return the text after 'FINAL ANSWER:' in the last message of the agent.
+
+    Args:
+        content (str): Content of the last message.
+
+    Returns:
+        str: The stripped answer, or the whole content as FailedAnswer if the marker is missing.
+    """
+    idx = content.find(FINAL_ANSWER_MARKER)
+    if idx == -1:
+        return FailedAnswer(content.strip())
+    return content[idx + len(FINAL_ANSWER_MARKER):].strip()
+
+
+def text_hash(text: str) -> str:
+    """Return the SHA-256 hex digest of a text."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class AnswerStore:
+    """SQLite backed answer store, safe to use from several threads."""
+
+    def __init__(self, path: str = DEFAULT_STORE_PATH):
+        """
+        Open (or create) the answer store.
+
+        Args:
+            path (str): Path of the SQLite database file.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS answers (
+                    task_id TEXT NOT NULL,
+                    question_hash TEXT NOT NULL,
+                    model_name TEXT NOT NULL,
+                    prompt_hash TEXT NOT NULL,
+                    question TEXT NOT NULL,
+                    answer TEXT NOT NULL,
+                    created_at TEXT NOT NULL,
+                    PRIMARY KEY (task_id, question_hash, model_name, prompt_hash)
+                )
+                """
+            )
+
+    def get(self, task_id: str, question: str, model_name: str, prompt_hash: str) -> Optional[str]:
+        """Return the stored answer for a question, or None if there is none."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT answer FROM answers WHERE task_id = ? AND question_hash = ? AND model_name = ? AND prompt_hash = ?",
+                (task_id, text_hash(question), model_name, prompt_hash),
+            ).fetchone()
+        return row[0] if row else None
+
+    def put(self, task_id: str, question: str, model_name: str, prompt_hash: str, answer: str) -> None:
+        """Store (or replace) the answer for a question."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO answers VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (task_id, text_hash(question), model_name, prompt_hash, question, answer,
+                 datetime.now(timezone.utc).isoformat()),
+            )
+
+    def answers_for(self, questions_data: list[dict], model_name: str, prompt_hash: str) -> tuple[list[dict], list[dict]]:
+        """
+        Collect the stored answers for a list of questions.
+
+        Args:
+            questions_data (list[dict]): Question items from the /questions endpoint.
+            model_name (str): Model the answers must have been produced with.
+            prompt_hash (str): Hash of the system prompt the answers must have been produced with.
+
+        Returns:
+            tuple: (answers_payload, results_log) for all questions that have a stored answer.
+        """
+        answers_payload = []
+        results_log = []
+        for item in questions_data:
+            task_id = item.get("task_id")
+            question_text = item.get("question")
+            if not task_id or question_text is None:
+                continue
+            answer = self.get(task_id, question_text, model_name, prompt_hash)
+            if answer is None:
+                continue
+            answers_payload.append({"task_id": task_id, "submitted_answer": answer})
+            results_log.append({"Task ID": task_id, "Question": question_text, "Submitted Answer": answer})
+        return answers_payload, results_log
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+class StoredAgent:
+    """Wraps an agent so that answers are read from and written to an AnswerStore."""
+
+    def __init__(self, agent: Callable, store: AnswerStore, model_name: str, prompt_hash: str):
+        self.agent = agent
+        self.store = store
+        self.model_name = model_name
+        self.prompt_hash = prompt_hash
+
+    def __call__(self, question: str, task_id: str = None, file_name: str = None) -> str:
+        cached = self.store.get(task_id, question, self.model_name, self.prompt_hash)
+        if cached is not None:
+            print(f"Using stored answer for task {task_id}.")
+            return cached
+
+        answer = self.agent(question, task_id=task_id, file_name=file_name)
+        if isinstance(answer, FailedAnswer):
+            # not stored, the next run tries the question again
+            print(f"Answer for task {task_id} failed, not storing it.")
+        elif answer:
+            self.store.put(task_id, question, self.model_name, self.prompt_hash, answer)
+        return answer
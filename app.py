@@ -2,15 +2,28 @@ import os
 import gradio as gr
 import requests
 import inspect
+import uuid
 import pandas as pd
 from core_agent import AIAgent
+from question_runner import run_questions, DEFAULT_CONCURRENCY
+from answer_store import AnswerStore, FailedAnswer, StoredAgent, extract_final_answer, text_hash
+from agent_holder import AgentHolder
+from prefetch import start_prefetch, task_file_url
+from tools import cassette, http_client, file_cache
+from tools.python_sandbox import close_session as close_python_session
+from tools.result_store import close_run as close_result_store
+from compaction import format_compaction_metrics
+from tools.tool_cache import format_tool_cache_stats
+from llm_cache import get_llm_cache
 from langchain_core.messages import HumanMessage
 
-import tempfile
-
 # (Keep Constants as is)
 # --- Constants ---
-DEFAULT_API_URL = "https://agents-course-unit4-scoring.hf.space"
+DEFAULT_API_URL = os.getenv("SCORING_API_URL", "https://agents-course-unit4-scoring.hf.space")
+
+#MODEL_NAME = "gpt-4.1-nano-2025-04-14"
+MODEL_NAME = "gpt-4o"
+SYSTEM_PROMPT_FILE = "system_prompt.txt"
 
 # --- Basic Agent Definition ---
 # ----- THIS IS WERE YOU CAN BUILD WHAT YOU WANT ------
@@ -19,16 +32,21 @@ class BasicAgent:
     def __init__(self):
         print("BasicAgent initialized.")
         api_key = os.getenv("OPENAI_API_KEY")
-        #model_name = "gpt-4.1-nano-2025-04-14"
-        model_name = "gpt-4o"
+        self.model_name = MODEL_NAME
 
         # Agent initialisieren
         agent = AIAgent(api_key=api_key,
-                        model_name=model_name,
-                        system_prompt_file_name="system_prompt.txt")
+                        model_name=self.model_name,
+                        system_prompt_file_name=SYSTEM_PROMPT_FILE)
 
+        self.prompt_hash = text_hash(agent.system_prompt)
         self.graph = agent.build_graph()
 
+        # Optional: load the Whisper model now instead of at the first audio question
+        if os.getenv("WHISPER_PRELOAD") == "1":
+            from tools.extract_text_from_audio_tool import preload_whisper_model
+            preload_whisper_model()
+
     def __call__(self, question: str, task_id: str = None, file_name: str = None) -> str:
         print(f"Agent received question (first 50 chars): {question[:50]}...")
 
@@ -39,128 +57,87 @@ class BasicAgent:
 
             #downlaod the file
             try:
-                file_url = f"https://agents-course-unit4-scoring.hf.space/files/{task_id}"
-                response = requests.get(file_url, timeout=15)
-                response.raise_for_status()
-                with tempfile.NamedTemporaryFile(delete=False) as temp_file:
-                    temp_file.write(response.content)
-                    temp_file_path = temp_file.name
+                file_url = task_file_url(DEFAULT_API_URL, task_id)
+                # usually already prefetched; otherwise streamed into the shared download cache
+                temp_file_path = file_cache.download(file_url, filename=file_name)
                 print(f"File downloaded to: {temp_file_path}")
                 question = f"{question} The file is located at {temp_file_path}."
             except requests.exceptions.RequestException as e:
                 print(f"Error downloading file: {e}")
-                return f"Error downloading file: {e}"
+                return FailedAnswer(f"Error downloading file: {e}")
             except Exception as e:
                 print(f"An unexpected error occurred while downloading the file: {e}")
-                return f"An unexpected error occurred while downloading the file: {e}"
+                return FailedAnswer(f"An unexpected error occurred while downloading the file: {e}")
 
         # Wrap the question in a HumanMessage from langchain_core
         messages = [HumanMessage(content=question)]
-        messages = self.graph.invoke({"messages": messages},
-                                     config={"recursion_limit": 50})
+        # One Python session per question: the code tools keep their variables between calls
+        session_id = f"{task_id or 'question'}-{uuid.uuid4().hex[:8]}"
+        try:
+            messages = self.graph.invoke({"messages": messages},
+                                         config={"recursion_limit": 50,
+                                                 "configurable": {"session_id": session_id}})
+        finally:
+            close_python_session(session_id)
+            close_result_store(session_id)
         answer = messages['messages'][-1].content
 
-        # Find the index of "FINAL ANSWER:" and slice from there
-        idx = answer.find("FINAL ANSWER:")
-        if idx != -1:
-            result = answer[idx:].strip()
-            # Remove any leading or trailing whitespace
-            result = result.strip()
-        # If "FINAL ANSWER:" is not found, use the entire answer
-        # (this is a fallback, but ideally we should always have "FINAL ANSWER:")
-        else:
-            result = answer
-
+        # Text after "FINAL ANSWER:"; without the marker the whole answer is returned as FailedAnswer (not stored)
+        result = extract_final_answer(answer)
         print(f"Answer: {result[:50]}...")
         print("" + "*"*80)
 
+        return result
 
-        return result[14:]
-
-def run_and_submit_all( profile: gr.OAuthProfile | None):
-    """
-    Fetches all questions, runs the BasicAgent on them, submits all answers,
-    and displays the results.
-    """
-    # --- Determine HF Space Runtime URL and Repo URL ---
-    space_id = os.getenv("SPACE_ID") # Get the SPACE_ID for sending link to the code
-
-    if profile:
-        username= f"{profile.username}"
-        print(f"User logged in: {username}")
-    else:
-        print("User not logged in.")
-        return "Please Login to Hugging Face with the button.", None
+# One agent per process: built once (in the background at startup) and reused by every run
+agent_holder = AgentHolder(BasicAgent)
 
-    api_url = DEFAULT_API_URL
-    questions_url = f"{api_url}/questions"
-    submit_url = f"{api_url}/submit"
+def agent_status() -> str:
+    """Readiness of the shared agent for the UI."""
+    return agent_holder.status()
 
-    # 1. Instantiate Agent ( modify this part to create your agent)
-    try:
-        agent = BasicAgent()
-    except Exception as e:
-        print(f"Error instantiating agent: {e}")
-        return f"Error initializing agent: {e}", None
-    # In the case of an app running as a hugging Face space, this link points toward your codebase ( usefull for others so please keep it public)
-    agent_code = f"https://huggingface.co/spaces/{space_id}/tree/main"
-    print(agent_code)
+def fetch_questions(questions_url: str):
+    """
+    Fetch the question list from the scoring API.
 
-    # 2. Fetch Questions
+    Returns:
+        tuple: (questions_data, None) on success or (None, error message) on failure.
+    """
     print(f"Fetching questions from: {questions_url}")
     try:
-        response = requests.get(questions_url, timeout=15)
+        response = http_client.get(questions_url, timeout=15)
         response.raise_for_status()
         questions_data = response.json()
         if not questions_data:
              print("Fetched questions list is empty.")
-             return "Fetched questions list is empty or invalid format.", None
+             return None, "Fetched questions list is empty or invalid format."
         print(f"Fetched {len(questions_data)} questions.")
+        return questions_data, None
     except requests.exceptions.RequestException as e:
         print(f"Error fetching questions: {e}")
-        return f"Error fetching questions: {e}", None
+        return None, f"Error fetching questions: {e}"
     except requests.exceptions.JSONDecodeError as e:
          print(f"Error decoding JSON response from questions endpoint: {e}")
          print(f"Response text: {response.text[:500]}")
-         return f"Error decoding server response for questions: {e}", None
+         return None, f"Error decoding server response for questions: {e}"
     except Exception as e:
         print(f"An unexpected error occurred fetching questions: {e}")
-        return f"An unexpected error occurred fetching questions: {e}", None
-
-    # 3. Run your Agent
-    results_log = []
-    answers_payload = []
-    print(f"Running agent on {len(questions_data)} questions...")
-    for item in questions_data:
-        print("" + "#"*80)
-        print(f"Processing item: {item}")
-        print("" + "#"*80)
-        task_id = item.get("task_id")
-        question_text = item.get("question")
-        if not task_id or question_text is None:
-            print(f"Skipping item with missing task_id or question: {item}")
-            continue
-        try:
-            submitted_answer = agent(question_text, task_id=task_id, file_name=item.get("file_name"))
-            answers_payload.append({"task_id": task_id, "submitted_answer": submitted_answer})
-            results_log.append({"Task ID": task_id, "Question": question_text, "Submitted Answer": submitted_answer})
-        except Exception as e:
-             print(f"Error running agent on task {task_id}: {e}")
-             results_log.append({"Task ID": task_id, "Question": question_text, "Submitted Answer": f"AGENT ERROR: {e}"})
+        return None, f"An unexpected error occurred fetching questions: {e}"
 
-    if not answers_payload:
-        print("Agent did not produce any answers to submit.")
-        return "Agent did not produce any answers to submit.", pd.DataFrame(results_log)
+def submit_answers(submit_url: str, username: str, agent_code: str, answers_payload: list, results_log: list):
+    """
+    Submit the answers to the scoring API.
 
-    # 4. Prepare Submission
+    Returns:
+        tuple: (status message, results DataFrame)
+    """
     submission_data = {"username": username.strip(), "agent_code": agent_code, "answers": answers_payload}
     status_update = f"Agent finished. Submitting {len(answers_payload)} answers for user '{username}'..."
     print(status_update)
 
-    # 5. Submit
     print(f"Submitting {len(answers_payload)} answers to: {submit_url}")
     try:
-        response = requests.post(submit_url, json=submission_data, timeout=60)
+        response = http_client.post(submit_url, json=submission_data, timeout=60)
         response.raise_for_status()
         result_data = response.json()
         final_status = (
@@ -200,6 +177,102 @@ def run_and_submit_all( profile: gr.OAuthProfile | None):
         results_df = pd.DataFrame(results_log)
         return status_message, results_df
 
+def run_and_submit_all( profile: gr.OAuthProfile | None):
+    """
+    Fetches all questions, runs the BasicAgent on them, submits all answers,
+    and displays the results.
+    Every answer is written to the answer store as soon as it is finished;
+    questions that already have a stored answer are not run again.
+    """
+    # --- Determine HF Space Runtime URL and Repo URL ---
+    space_id = os.getenv("SPACE_ID") # Get the SPACE_ID for sending link to the code
+
+    if profile:
+        username= f"{profile.username}"
+        print(f"User logged in: {username}")
+    else:
+        print("User not logged in.")
+        return "Please Login to Hugging Face with the button.", None
+
+    api_url = DEFAULT_API_URL
+    questions_url = f"{api_url}/questions"
+    submit_url = f"{api_url}/submit"
+
+    # 1. Get the shared agent (waits if it is still loading)
+    try:
+        agent = agent_holder.get()
+    except Exception as e:
+        print(f"Error instantiating agent: {e}")
+        return f"Error initializing agent: {e}", None
+    # In the case of an app running as a hugging Face space, this link points toward your codebase ( usefull for others so please keep it public)
+    agent_code = f"https://huggingface.co/spaces/{space_id}/tree/main"
+    print(agent_code)
+
+    # 2. Fetch Questions
+    questions_data, error = fetch_questions(questions_url)
+    if error:
+        return error, None
+
+    # 3. Download all task files in the background while the agent starts working
+    prefetch = start_prefetch(questions_data, api_url)
+
+    # 4. Run your Agent (several questions at once, see AGENT_CONCURRENCY)
+    stored_agent = StoredAgent(agent, AnswerStore(), agent.model_name, agent.prompt_hash)
+    answers_payload, results_log = run_questions(stored_agent, questions_data, max_workers=DEFAULT_CONCURRENCY)
+
+    prefetch.result()
+    print("HTTP metrics:\n" + http_client.format_http_metrics())
+    print("Prompt compaction: " + format_compaction_metrics())
+    print("Tool cache:\n" + format_tool_cache_stats())
+    if get_llm_cache() is not None:
+        print("LLM cache: " + get_llm_cache().format_stats())
+    if cassette.active_cassette() is not None:
+        print("Cassette: " + cassette.active_cassette().format_stats())
+
+    if not answers_payload:
+        print("Agent did not produce any answers to submit.")
+        return "Agent did not produce any answers to submit.", pd.DataFrame(results_log)
+
+    # 5. Submit
+    return submit_answers(submit_url, username, agent_code, answers_payload, results_log)
+
+def submit_cached_answers( profile: gr.OAuthProfile | None):
+    """
+    Submits the answers from the answer store without running the agent.
+    Only answers produced with the current model and system prompt are used.
+    """
+    space_id = os.getenv("SPACE_ID")
+
+    if profile:
+        username= f"{profile.username}"
+        print(f"User logged in: {username}")
+    else:
+        print("User not logged in.")
+        return "Please Login to Hugging Face with the button.", None
+
+    api_url = DEFAULT_API_URL
+    questions_url = f"{api_url}/questions"
+    submit_url = f"{api_url}/submit"
+    agent_code = f"https://huggingface.co/spaces/{space_id}/tree/main"
+
+    questions_data, error = fetch_questions(questions_url)
+    if error:
+        return error, None
+
+    try:
+        with open(SYSTEM_PROMPT_FILE, "r", encoding="utf-8") as f:
+            prompt_hash = text_hash(f.read())
+    except Exception as e:
+        return f"Error reading system prompt file: {e}", None
+
+    answers_payload, results_log = AnswerStore().answers_for(questions_data, MODEL_NAME, prompt_hash)
+    if not answers_payload:
+        print("No stored answers to submit.")
+        return "No stored answers to submit. Run the evaluation first.", None
+    print(f"Found stored answers for {len(answers_payload)}/{len(questions_data)} questions.")
+
+    return submit_answers(submit_url, username, agent_code, answers_payload, results_log)
+
 
 # --- Build Gradio Interface using Blocks ---
 with gr.Blocks() as demo:
@@ -211,6 +284,7 @@ with gr.Blocks() as demo:
         1.  Please clone this space, then modify the code to define your agent's logic, the tools, the necessary packages, etc ...
         2.  Log in to your Hugging Face account using the button below. This uses your HF username for submission.
         3.  Click 'Run Evaluation & Submit All Answers' to fetch questions, run your agent, submit answers, and see the score.
+        4.  Answers are stored as soon as they are finished. A rerun only answers the missing questions, and 'Submit Cached Answers' submits the stored answers without running the agent.
 
         ---
         **Disclaimers:**
@@ -221,7 +295,12 @@ with gr.Blocks() as demo:
 
     gr.LoginButton()
 
+    with gr.Row():
+        agent_status_output = gr.Textbox(label="Agent Status", interactive=False)
+        refresh_status_button = gr.Button("Refresh Agent Status")
+
     run_button = gr.Button("Run Evaluation & Submit All Answers")
+    submit_cached_button = gr.Button("Submit Cached Answers")
 
     status_output = gr.Textbox(label="Run Status / Submission Result", lines=5, interactive=False)
     # Removed max_rows=10 from DataFrame constructor
@@ -231,6 +310,12 @@ with gr.Blocks() as demo:
         fn=run_and_submit_all,
         outputs=[status_output, results_table]
     )
+    submit_cached_button.click(
+        fn=submit_cached_answers,
+        outputs=[status_output, results_table]
+    )
+    refresh_status_button.click(fn=agent_status, outputs=agent_status_output)
+    demo.load(fn=agent_status, outputs=agent_status_output)
 
 if __name__ == "__main__":
     print("\n" + "-"*30 + " App Starting " + "-"*30)
@@ -253,5 +338,11 @@ if __name__ == "__main__":
 
     print("-"*(60 + len(" App Starting ")) + "\n")
 
+    # Alle HTTP-Aufrufe aufzeichnen oder abspielen (CASSETTE_MODE, siehe tools/cassette.py)
+    cassette.install_from_env()
+
+    # Build the agent in the background while the UI is already serving
+    agent_holder.start()
+
     print("Launching Gradio Interface for Basic Agent Evaluation...")
     demo.launch(debug=True, share=False)
\ No newline at end of file
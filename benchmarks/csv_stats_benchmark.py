@@ -0,0 +1,108 @@
+"""
+csv_stats_benchmark.py
+Time and peak memory of analyse_csv_file on generated CSV files: the in-memory
+pandas path (read_csv + describe) against the streaming path (streaming_stats.py).
+
+Usage:
+    python benchmarks/csv_stats_benchmark.py [--rows 1000000 10000000] [--dir DIR] [--keep]
+
+Every measurement runs in a fresh interpreter, so the peak RSS is that of one analysis.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+
+_MEASURE = """
+import json, resource, sys, time
+sys.path.insert(0, {root!r})
+import pandas as pd
+from tools.streaming_stats import stream_describe
+
+def peak_rss_kb():
+    # VmHWM belongs to this process image; ru_maxrss on Linux can carry the parent's peak over exec
+    try:
+        with open("/proc/self/status") as f:
+            return next(int(line.split()[1]) for line in f if line.startswith("VmHWM:"))
+    except (OSError, StopIteration):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+baseline = peak_rss_kb()
+start = time.perf_counter()
+if {mode!r} == "pandas":
+    result = pd.read_csv({path!r}).describe()
+else:
+    result = stream_describe({path!r})
+seconds = time.perf_counter() - start
+print(json.dumps({{"seconds": seconds, "peak_rss_mb": peak_rss_kb() / 1024,
+                   "baseline_rss_mb": baseline / 1024, "describe": result.to_dict()}}))
+"""
+
+
+def generate_csv(path: str, rows: int, chunk_rows: int = 1_000_000, seed: int = 0) -> None:
+    """Write a CSV with an id, two numeric columns (one with gaps) and a text column."""
+    import pandas as pd
+    rng = np.random.default_rng(seed)
+    categories = np.array([f"category_{i}" for i in range(50)])
+    with open(path, "w", encoding="utf-8") as f:
+        for start in range(0, rows, chunk_rows):
+            n = min(chunk_rows, rows - start)
+            value = rng.normal(100, 15, n)
+            value[rng.random(n) < 0.05] = np.nan
+            chunk = pd.DataFrame({
+                "id": np.arange(start, start + n),
+                "value": value,
+                "amount": rng.exponential(50, n).round(2),
+                "category": categories[rng.zipf(1.5, n) % 50],
+            })
+            chunk.to_csv(f, index=False, header=start == 0)
+
+
+def measure(path: str, mode: str) -> dict:
+    code = _MEASURE.format(root=ROOT, mode=mode, path=path)
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    if result.returncode != 0:
+        return {"error": result.stderr.strip().splitlines()[-1] if result.stderr else f"exit code {result.returncode}"}
+    return json.loads(result.stdout)
+
+
+def max_relative_error(exact: dict, approx: dict) -> float:
+    errors = []
+    for column, stats in exact.items():
+        scale = (stats["max"] - stats["min"]) or 1
+        for key, value in stats.items():
+            errors.append(abs(approx[column][key] - value) / scale)
+    return max(errors) if errors else 0.0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare in-memory and streaming CSV statistics.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000_000, 10_000_000])
+    parser.add_argument("--dir", default=tempfile.gettempdir(), help="Where the generated files are written.")
+    parser.add_argument("--keep", action="store_true", help="Keep the generated files.")
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'file MB':>8} {'mode':>9} {'seconds':>8} {'peak RSS MB':>12} {'after import':>12} {'max err':>8}")
+    for rows in args.rows:
+        path = os.path.join(args.dir, f"benchmark_{rows}.csv")
+        if not os.path.isfile(path):
+            generate_csv(path, rows)
+        size_mb = os.path.getsize(path) / 1024 ** 2
+        results = {mode: measure(path, mode) for mode in ("pandas", "streaming")}
+        for mode, result in results.items():
+            if "error" in result:
+                print(f"{rows:>10} {size_mb:>8.0f} {mode:>9} failed: {result['error']}")
+                continue
+            error = ""
+            if mode == "streaming" and "error" not in results["pandas"]:
+                error = f"{max_relative_error(results['pandas']['describe'], result['describe']):.2%}"
+            print(f"{rows:>10} {size_mb:>8.0f} {mode:>9} {result['seconds']:>8.2f} {result['peak_rss_mb']:>12.0f} {result['baseline_rss_mb']:>12.0f} {error:>8}")
+        if not args.keep:
+            os.remove(path)
@@ -0,0 +1,88 @@
+"""
+wiki_html_benchmark.py
+Bytes and tokens of saved Wikipedia pages before and after the conversion to
+compact text (tools/html_to_text.py).
+
+Usage:
+    python benchmarks/wiki_html_benchmark.py [--fixtures DIR] [--save TITLE]
+
+Tokens are counted with tiktoken (o200k_base, as used by gpt-4o) when the
+encoding is available, otherwise estimated as characters / 4.
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from tools.html_to_text import convert_page  # noqa: E402
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "..", "tests", "fixtures", "wikipedia")
+
+
+def token_counter():
+    """Return (name, count function) for the best available tokenizer."""
+    try:
+        import tiktoken
+        encoding = tiktoken.get_encoding("o200k_base")
+        return "o200k_base", lambda text: len(encoding.encode(text, disallowed_special=()))
+    except Exception:
+        return "estimate (chars/4)", lambda text: (len(text) + 3) // 4
+
+
+def save_fixture(title: str, fixtures_dir: str) -> str:
+    """Fetch a page through the parse API and save its HTML as a fixture."""
+    from tools.wiki_search_tool import get_wikipedia_page_html
+    path = os.path.join(fixtures_dir, title.lower().replace(" ", "_") + ".html")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(get_wikipedia_page_html(title))
+    return path
+
+
+def run(fixtures_dir: str) -> list[dict]:
+    tokenizer, count_tokens = token_counter()
+    rows = []
+    for path in sorted(glob.glob(os.path.join(fixtures_dir, "*.html"))):
+        with open(path, "r", encoding="utf-8") as f:
+            html = f.read()
+        start = time.perf_counter()
+        page = convert_page(html)
+        seconds = time.perf_counter() - start
+        converted = json.dumps(page, ensure_ascii=False)
+        rows.append({
+            "page": os.path.basename(path),
+            "tokenizer": tokenizer,
+            "html_bytes": len(html.encode("utf-8")),
+            "text_bytes": len(converted.encode("utf-8")),
+            "html_tokens": count_tokens(html),
+            "text_tokens": count_tokens(converted),
+            "tables": len(page["tables"]),
+            "convert_ms": 1000 * seconds,
+        })
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare Wikipedia HTML with the compact text conversion.")
+    parser.add_argument("--fixtures", default=FIXTURES_DIR, help="Directory with saved *.html pages.")
+    parser.add_argument("--save", metavar="TITLE", help="Fetch a Wikipedia page and save it as fixture first.")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON.")
+    args = parser.parse_args()
+
+    if args.save:
+        print(f"Saved {save_fixture(args.save, args.fixtures)}")
+
+    results = run(args.fixtures)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"Tokenizer: {results[0]['tokenizer'] if results else '-'}")
+        print(f"{'page':32} {'HTML bytes':>11} {'text bytes':>11} {'HTML tok':>9} {'text tok':>9} {'ratio':>6} {'tables':>6} {'ms':>6}")
+        for row in results:
+            ratio = row["html_tokens"] / row["text_tokens"] if row["text_tokens"] else 0
+            print(f"{row['page']:32} {row['html_bytes']:>11} {row['text_bytes']:>11} {row['html_tokens']:>9} "
+                  f"{row['text_tokens']:>9} {ratio:>5.1f}x {row['tables']:>6} {row['convert_ms']:>6.1f}")
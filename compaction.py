@@ -0,0 +1,204 @@
+"""
+compaction.py
+Keeps the prompt of the agent within a token budget.
+The graph loops assistant -> tools -> assistant and every tool result stays in
+the message history, so without compaction each step re-sends all earlier
+results. The compaction node runs before every assistant step: when the history
+is larger than the budget of the model, old tool results are cut down to their
+beginning and end (the most recent results stay verbatim) until it fits.
+Saved tokens are counted in process-wide metrics.
+"""
+
+import os
+import threading
+from typing import Callable
+
+from langchain_core.messages import BaseMessage, ToolMessage
+
+# Prompt token budget per model (prefix match, the longest prefix wins)
+MODEL_TOKEN_BUDGETS = {
+    "gpt-4.1-nano": 60000,
+    "gpt-4.1-mini": 80000,
+    "gpt-4.1": 100000,
+    "gpt-4o-mini": 60000,
+    "gpt-4o": 60000,
+    "o3": 100000,
+    "o4-mini": 80000,
+}
+DEFAULT_TOKEN_BUDGET = 60000
+# Overrides the per-model budget when set
+COMPACTION_TOKEN_BUDGET = int(os.getenv("COMPACTION_TOKEN_BUDGET", "0")) or None
+# Number of most recent tool results that are never shortened in the first pass
+COMPACTION_KEEP_RECENT = int(os.getenv("COMPACTION_KEEP_RECENT", "3"))
+# Size an old tool result is cut down to
+STALE_TOOL_MESSAGE_TOKENS = 300
+
+_COMPACTED_NOTE = "[... {tokens} tokens of this earlier tool result were removed to save context; " \
+                  "call the tool again if you need them ...]"
+
+
+def budget_for_model(model_name: str) -> int:
+    """Token budget for a model: COMPACTION_TOKEN_BUDGET, else MODEL_TOKEN_BUDGETS, else the default."""
+    if COMPACTION_TOKEN_BUDGET:
+        return COMPACTION_TOKEN_BUDGET
+    matches = [prefix for prefix in MODEL_TOKEN_BUDGETS if model_name.startswith(prefix)]
+    return MODEL_TOKEN_BUDGETS[max(matches, key=len)] if matches else DEFAULT_TOKEN_BUDGET
+
+
+_encoding = None
+_encoding_loaded = False
+_encoding_lock = threading.Lock()
+
+
+def count_tokens(text: str) -> int:
+    """Tokens of a text with tiktoken (o200k_base) if available, else about 4 characters per token."""
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        with _encoding_lock:
+            if not _encoding_loaded:
+                try:
+                    import tiktoken
+
+                    _encoding = tiktoken.get_encoding("o200k_base")
+                except Exception as e:
+                    print(f"tiktoken not available, estimating tokens from characters: {e}")
+                _encoding_loaded = True
+    if _encoding is not None:
+        return len(_encoding.encode(text, disallowed_special=()))
+    return (len(text) + 3) // 4
+
+
+def _content_text(message: BaseMessage) -> str:
+    content = message.content
+    if isinstance(content, str):
+        return content
+    return "\n".join(part if isinstance(part, str) else str(part.get("text", part)) for part in content)
+
+
+def message_tokens(message: BaseMessage) -> int:
+    """Approximate prompt tokens of a message (content plus tool call arguments)."""
+    tokens = count_tokens(_content_text(message)) + 4
+    for call in getattr(message, "tool_calls", None) or []:
+        tokens += count_tokens(str(call.get("args", ""))) + 8
+    return tokens
+
+
+def shorten(text: str, max_tokens: int) -> str:
+    """Keep the beginning and the end of a text, about max_tokens in total."""
+    tokens = count_tokens(text)
+    if tokens <= max_tokens:
+        return text
+    chars = max(0, max_tokens * len(text) // tokens)
+    head, tail = text[:chars * 2 // 3], text[len(text) - chars // 3:] if chars // 3 else ""
+    return f"{head}\n{_COMPACTED_NOTE.format(tokens=tokens - max_tokens)}\n{tail}".rstrip()
+
+
+def _is_compacted(message: ToolMessage) -> bool:
+    return "tokens of this earlier tool result were removed" in _content_text(message)
+
+
+def compact_messages(messages: list[BaseMessage], budget: int,
+                     keep_recent: int = COMPACTION_KEEP_RECENT) -> tuple[list[ToolMessage], int, int]:
+    """
+    Shorten tool results until the messages fit into the token budget.
+
+    Args:
+        messages (list[BaseMessage]): The message history.
+        budget (int): Token budget for the whole history.
+        keep_recent (int): Number of most recent tool results kept verbatim in the first pass.
+
+    Returns:
+        tuple: (replacement ToolMessages with the ids of the originals, tokens before, tokens saved).
+    """
+    sizes = [message_tokens(message) for message in messages]
+    total = sum(sizes)
+    if total <= budget:
+        return [], total, 0
+
+    tool_indices = [i for i, message in enumerate(messages) if isinstance(message, ToolMessage)]
+    stale = tool_indices[:-keep_recent] if keep_recent else tool_indices
+    recent = tool_indices[len(stale):]
+    replacements: dict[int, ToolMessage] = {}
+    saved = 0
+
+    # 1. old results (oldest first), 2. if that is not enough, the recent ones down to a share of the budget
+    passes = [(stale, STALE_TOOL_MESSAGE_TOKENS), (recent, max(STALE_TOOL_MESSAGE_TOKENS, budget // 4))]
+    for indices, max_tokens in passes:
+        for i in indices:
+            if total - saved <= budget:
+                break
+            message = replacements.get(i, messages[i])
+            if sizes[i] <= max_tokens + 50 or _is_compacted(message):
+                continue
+            content = shorten(_content_text(message), max_tokens)
+            new_size = message_tokens(ToolMessage(content=content, tool_call_id=message.tool_call_id))
+            saved += sizes[i] - new_size
+            sizes[i] = new_size
+            replacements[i] = ToolMessage(content=content, tool_call_id=message.tool_call_id,
+                                          name=message.name, id=message.id, status=message.status)
+    return [replacements[i] for i in sorted(replacements)], total, saved
+
+
+class _CompactionMetrics:
+    def __init__(self):
+        self.steps = 0
+        self.compactions = 0
+        self.messages_shortened = 0
+        self.tokens_before = 0
+        self.tokens_saved = 0
+
+
+_metrics = _CompactionMetrics()
+_metrics_lock = threading.Lock()
+
+
+def make_compaction_node(budget: int, keep_recent: int = COMPACTION_KEEP_RECENT,
+                         verbose: bool = False) -> Callable[[dict], dict]:
+    """
+    Build the graph node that compacts the MessagesState before an assistant step.
+
+    Args:
+        budget (int): Token budget of the model.
+        keep_recent (int): Number of most recent tool results kept verbatim.
+        verbose (bool): Print a line for every compaction.
+
+    Returns:
+        Callable: Node function returning the shortened messages (they replace the
+        originals by id) or no update.
+    """
+    def compact(state: dict) -> dict:
+        replacements, before, saved = compact_messages(state["messages"], budget, keep_recent)
+        with _metrics_lock:
+            _metrics.steps += 1
+            _metrics.tokens_before += before
+            if replacements:
+                _metrics.compactions += 1
+                _metrics.messages_shortened += len(replacements)
+                _metrics.tokens_saved += saved
+        if not replacements:
+            return {}
+        if verbose:
+            print(f"Compaction: {before} tokens over the budget of {budget}, "
+                  f"shortened {len(replacements)} tool results, saved {saved} tokens.")
+        return {"messages": replacements}
+    return compact
+
+
+def compaction_metrics() -> dict:
+    """Return {steps, compactions, messages_shortened, tokens_before, tokens_saved} since the last reset."""
+    with _metrics_lock:
+        return dict(vars(_metrics))
+
+
+def format_compaction_metrics() -> str:
+    m = compaction_metrics()
+    share = m["tokens_saved"] / m["tokens_before"] if m["tokens_before"] else 0.0
+    return (f"{m['steps']} assistant steps, {m['compactions']} compactions, "
+            f"{m['messages_shortened']} tool results shortened, {m['tokens_saved']} of "
+            f"{m['tokens_before']} prompt tokens saved ({share:.0%})")
+
+
+def reset_metrics() -> None:
+    global _metrics
+    with _metrics_lock:
+        _metrics = _CompactionMetrics()
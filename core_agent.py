@@ -9,43 +9,20 @@ from langgraph.graph import START, StateGraph, MessagesState
 from langgraph.prebuilt import ToolNode, tools_condition
 
 from langchain_community.embeddings import HuggingFaceEmbeddings
-from langchain_community.vectorstores import SupabaseVectorStore
 from langchain.tools.retriever import create_retriever_tool
-from supabase.client import Client, create_client
+
+from retrievers import create_retriever_backend
+from compaction import budget_for_model, make_compaction_node
+from llm_cache import CachedChatModel, LlmCache, get_llm_cache, model_params
 
 from langchain_openai import ChatOpenAI
 
 from langchain_core.messages import SystemMessage, HumanMessage
 
-# Tools importieren
-from tools.time_tool import time_tool
-from tools.download_tool import download_tool
-from tools.wiki_search_tool import wiki_page_tool, wiki_search_tool
-from tools.math_tools import (
-    multiply,
-    add,
-    subtract,
-    divide,
-    modulus,
-    power_tool,
-    logarithm_tool,
-    absolute_tool,
-    percentage_tool,
-    average_tool,
-    median_tool,
-)
-from tools.tavily_search_tool import tavily_search_tool
-from tools.arxiv_search_tool import arxiv_search_tool
-from tools.defunct_countries_tool import defunct_countries_tool
-
-from tools.extract_text_from_image_tool import extract_text_from_image_tool
-from tools.extract_audio_from_youtube_tool import extract_audio_from_youtube_tool
-from tools.extract_text_from_audio_tool import extract_text_from_audio_tool
-
-from tools.analyse_excel_file_tool import analyse_excel_tool
-from tools.analyse_csv_file_tool import analyse_csv_tool
-
-from tools.python_interpreter_tool import execute_python_code_tool, parse_python_code_tool, execute_python_code_with_output_tool
+# Tools werden erst beim ersten Aufruf importiert (siehe tools/registry.py)
+from tools.registry import load_tools
+from tools.result_store import make_spilling_tool_node
+from tools.tool_cache import memoize_tools
 
 
 
@@ -56,7 +33,11 @@ class AIAgent:
             model_name: str = "gpt-4.1-nano-2025-04-14",
             temperature: float = 0.1,
             verbose: bool = True,
-            system_prompt_file_name: str = "system_prompt.txt"):
+            system_prompt_file_name: str = "system_prompt.txt",
+            retriever_backend: str = os.getenv("RETRIEVER_BACKEND", "supabase"),
+            vector_db_path: str = None,
+            token_budget: int = None,
+            llm_cache: LlmCache = None):
         """
         Initialize the AIAgent with the specified tools and model.
 
@@ -67,6 +48,10 @@ class AIAgent:
             temperature (float): Temperature for the model's responses.
             verbose (bool): Whether to print detailed logs.
             system_prompt (str): System prompt to guide the agent's behavior.
+            retriever_backend (str): Vector store for the retriever node, "supabase" or "sqlite_vec".
+            vector_db_path (str): Path of the local database for the "sqlite_vec" backend.
+            token_budget (int): Prompt token budget for the message history, defaults to the budget of the model.
+            llm_cache (LlmCache): Response cache for the assistant node, defaults to LLM_CACHE_MODE (off).
         """
 
         # Set the API key for OpenAI
@@ -88,18 +73,9 @@ class AIAgent:
         # Embeddings initialisieren
         self.embeddings = HuggingFaceEmbeddings(model_name="sentence-transformers/all-mpnet-base-v2")
 
-
-        self.supabase: Client = create_client(
-            os.environ.get("SUPABASE_URL"),
-            os.environ.get("SUPABASE_SERVICE_KEY"))
-
-
-        self.vector_store = SupabaseVectorStore(
-            client=self.supabase,
-            embedding= self.embeddings,
-            table_name="documents",
-            query_name="match_documents_langchain",
-        )
+        # Vector store für ähnliche Fragen (Supabase oder lokal mit sqlite-vec)
+        backend_kwargs = {"db_path": vector_db_path} if retriever_backend == "sqlite_vec" and vector_db_path else {}
+        self.vector_store = create_retriever_backend(retriever_backend, self.embeddings, **backend_kwargs)
 
         # LLM konfigurieren
         self.llm = ChatOpenAI(
@@ -110,33 +86,22 @@ class AIAgent:
         )
         self.verbose = verbose
 
+        # Token-Budget für den Verlauf (ältere Tool-Ergebnisse werden gekürzt, siehe compaction.py)
+        self.token_budget = token_budget or budget_for_model(model_name)
+        self.compact = make_compaction_node(self.token_budget, verbose=verbose)
+
         # Tools konfigurieren
-        self.tools = [  defunct_countries_tool,
-                        time_tool, download_tool, wiki_page_tool, wiki_search_tool,
-                        tavily_search_tool,
-                        arxiv_search_tool,
-                        extract_text_from_image_tool,
-                        extract_audio_from_youtube_tool,
-                        extract_text_from_audio_tool,
-                        analyse_excel_tool,
-                        analyse_csv_tool,
-                        add,
-                        subtract,
-                        multiply,
-                        divide,
-                        modulus,
-                        power_tool,
-                        logarithm_tool,
-                        absolute_tool,
-                        percentage_tool,
-                        average_tool,
-                        median_tool,
-                        execute_python_code_tool, parse_python_code_tool, execute_python_code_with_output_tool
-                      ]
+        self.tools = load_tools()
 
         # Bind tools to the llm
         self.llm_with_tools = self.llm.bind_tools(self.tools)
 
+        # LLM-Antworten aus dem Cache (read_through, record oder replay, siehe llm_cache.py)
+        self.llm_cache = llm_cache or get_llm_cache()
+        if self.llm_cache is not None:
+            self.llm_with_tools = CachedChatModel(self.llm_with_tools, self.tools, model_params(self.llm),
+                                                  self.llm_cache)
+
     # Node
     def assistant(self, state: MessagesState):
         """Assistant node"""
@@ -168,15 +133,19 @@ class AIAgent:
         """Baut den Graphen für den Agenten."""
         builder = StateGraph(MessagesState)
         builder.add_node("retriever", self.retriever)
+        builder.add_node("compact", self.compact)
         builder.add_node("assistant", self.assistant)
-        builder.add_node("tools", ToolNode(self.tools))
+        # Zu lange Tool-Ergebnisse landen im Result-Store, im Verlauf bleibt nur eine Vorschau (read_result)
+        # Wiederholte Aufrufe (gleiches Tool, gleiche Argumente) kommen aus dem Tool-Cache (tools/tool_cache.py)
+        builder.add_node("tools", make_spilling_tool_node(ToolNode(memoize_tools(self.tools)), embeddings=self.embeddings))
         builder.add_edge(START, "retriever")
-        builder.add_edge("retriever", "assistant")
+        builder.add_edge("retriever", "compact")
+        builder.add_edge("compact", "assistant")
         builder.add_conditional_edges(
             "assistant",
             tools_condition,
         )
-        builder.add_edge("tools", "assistant")
+        builder.add_edge("tools", "compact")
 
         # Compile graph
         return builder.compile()
@@ -0,0 +1,194 @@
+"""
+llm_cache.py
+SQLite cache for the LLM calls of the assistant node.
+Reruns of the same questions with the same model, temperature and system prompt
+send identical prompts. The cache key is a SHA-256 over the serialized message
+list (without the random message and tool call IDs), the bound tool schemas and
+the model parameters. Modes:
+- read_through: answer from the cache, call the model and store on a miss
+- record: always call the model and store (overwrites older responses)
+- replay: answer only from the cache, a miss raises LlmReplayMiss; reruns the
+  whole graph offline, e.g. to benchmark everything except the model
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+from langchain_core.messages import BaseMessage, message_to_dict, messages_from_dict
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+LLM_CACHE_MODE = os.getenv("LLM_CACHE_MODE", "off")
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "llm_cache.sqlite")
+MODES = ("off", "read_through", "record", "replay")
+
+
+class LlmReplayMiss(LookupError):
+    """Raised in replay mode when a prompt was never recorded."""
+
+
+def _message_data(message: BaseMessage) -> dict:
+    """The parts of a message the model sees; IDs are left out, they differ between runs."""
+    data = {"type": message.type, "content": message.content}
+    if message.name:
+        data["name"] = message.name
+    tool_calls = getattr(message, "tool_calls", None)
+    if tool_calls:
+        data["tool_calls"] = [{"name": call["name"], "args": call["args"]} for call in tool_calls]
+    return data
+
+
+def prompt_key(messages: list[BaseMessage], tool_schemas: list[dict], params: dict) -> str:
+    """Stable SHA-256 of the messages, the tool schemas and the model parameters."""
+    payload = {"messages": [_message_data(message) for message in messages],
+               "tools": tool_schemas, "params": params}
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def model_params(llm: Any) -> dict:
+    """Parameters of a chat model that change its responses."""
+    names = ("model_name", "temperature", "top_p", "max_tokens", "seed", "model_kwargs")
+    return {name: getattr(llm, name) for name in names if getattr(llm, name, None) is not None}
+
+
+class LlmCache:
+    """SQLite backed response cache, safe to use from several threads."""
+
+    def __init__(self, path: str = LLM_CACHE_PATH, mode: str = "read_through"):
+        """
+        Open (or create) the cache.
+
+        Args:
+            path (str): Path of the SQLite database file.
+            mode (str): 'read_through', 'record' or 'replay'.
+        """
+        if mode not in MODES[1:]:
+            raise ValueError(f"Unknown LLM cache mode {mode!r}, expected one of {', '.join(MODES[1:])}")
+        self.path = path
+        self.mode = mode
+        self.hits = 0
+        self.misses = 0
+        self.recorded = 0
+        # model latency of the cached responses that were served, i.e. the time saved
+        self.saved_seconds = 0.0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    model_name TEXT NOT NULL,
+                    response TEXT NOT NULL,
+                    latency REAL NOT NULL,
+                    created_at TEXT NOT NULL
+                )
+                """
+            )
+
+    def get(self, key: str) -> Optional[tuple[BaseMessage, float]]:
+        """Return the stored response and its original latency, or None."""
+        with self._lock:
+            row = self._conn.execute("SELECT response, latency FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        return messages_from_dict([json.loads(row[0])])[0], row[1]
+
+    def put(self, key: str, model_name: str, response: BaseMessage, latency: float) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                               (key, model_name, json.dumps(message_to_dict(response)), latency,
+                                datetime.now(timezone.utc).isoformat()))
+
+    def invoke(self, llm: Any, messages: list[BaseMessage], tool_schemas: list[dict], params: dict,
+               **kwargs: Any) -> BaseMessage:
+        """
+        Answer a prompt according to the mode.
+
+        Args:
+            llm: The chat model with bound tools.
+            messages (list[BaseMessage]): The prompt.
+            tool_schemas (list[dict]): OpenAI schemas of the bound tools (part of the key).
+            params (dict): Model parameters (part of the key).
+
+        Returns:
+            BaseMessage: The (cached) response of the model.
+
+        Raises:
+            LlmReplayMiss: In replay mode, if the prompt is not in the cache.
+        """
+        key = prompt_key(messages, tool_schemas, params)
+        if self.mode != "record":
+            cached = self.get(key)
+            if cached is not None:
+                with self._lock:
+                    self.hits += 1
+                    self.saved_seconds += cached[1]
+                return cached[0]
+            with self._lock:
+                self.misses += 1
+            if self.mode == "replay":
+                raise LlmReplayMiss(f"No recorded response for prompt {key[:12]} ({len(messages)} messages) "
+                                    f"in {self.path}")
+        start = time.perf_counter()
+        response = llm.invoke(messages, **kwargs)
+        self.put(key, str(params.get("model_name", "")), response, time.perf_counter() - start)
+        with self._lock:
+            self.recorded += 1
+        return response
+
+    def stats(self) -> dict:
+        """Return {mode, hits, misses, recorded, saved_seconds}."""
+        with self._lock:
+            return {"mode": self.mode, "hits": self.hits, "misses": self.misses,
+                    "recorded": self.recorded, "saved_seconds": self.saved_seconds}
+
+    def format_stats(self) -> str:
+        s = self.stats()
+        return (f"{s['mode']}: {s['hits']} hits, {s['misses']} misses, {s['recorded']} responses recorded, "
+                f"{s['saved_seconds']:.1f} s of model latency saved")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class CachedChatModel:
+    """Chat model with bound tools whose invoke() goes through an LlmCache."""
+
+    def __init__(self, llm: Any, tools: list, params: dict, cache: LlmCache):
+        """
+        Args:
+            llm: The chat model with bound tools (llm.bind_tools(tools)).
+            tools (list): The bound tools, their schemas are part of the key.
+            params (dict): Model parameters, see model_params().
+            cache (LlmCache): The cache.
+        """
+        self.llm = llm
+        self.tool_schemas = [convert_to_openai_tool(tool) for tool in tools]
+        self.params = params
+        self.cache = cache
+
+    def invoke(self, messages: list[BaseMessage], **kwargs: Any) -> BaseMessage:
+        return self.cache.invoke(self.llm, messages, self.tool_schemas, self.params, **kwargs)
+
+
+_cache: Optional[LlmCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache(mode: str = LLM_CACHE_MODE, path: str = LLM_CACHE_PATH) -> Optional[LlmCache]:
+    """Return the process-wide cache for LLM_CACHE_MODE/LLM_CACHE_PATH, or None if the mode is 'off'."""
+    global _cache
+    if mode == "off":
+        return None
+    with _cache_lock:
+        if _cache is None or (_cache.mode, _cache.path) != (mode, path):
+            _cache = LlmCache(path, mode)
+        return _cache
@@ -0,0 +1,68 @@
+"""
+prefetch.py
+Downloads the attachments of all tasks into the file cache before (and while)
+the agent works on the questions, so a question never waits for its file.
+The downloads run concurrently on their own thread pool; the agent's own
+download of a file then finds it in the cache.
+"""
+
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional
+
+from tools import file_cache
+
+# Number of files downloaded at the same time
+PREFETCH_CONCURRENCY = int(os.getenv("PREFETCH_CONCURRENCY", "8"))
+
+
+def task_file_url(api_url: str, task_id: str) -> str:
+    """URL of the attachment of a task on the scoring API."""
+    return f"{api_url.rstrip('/')}/files/{task_id}"
+
+
+def prefetch_task_files(questions_data: list[dict], api_url: str, cache: Optional[file_cache.FileCache] = None,
+                        max_workers: int = PREFETCH_CONCURRENCY) -> dict[str, str]:
+    """
+    Download the attachment of every task that has a `file_name`.
+
+    Args:
+        questions_data (list[dict]): Question items from the /questions endpoint.
+        api_url (str): Base URL of the scoring API.
+        cache (FileCache, optional): Cache to download into, defaults to the shared one.
+        max_workers (int): Number of concurrent downloads.
+
+    Returns:
+        dict: {task_id: local path or "Error ..." message}. A failed download does
+        not stop the others; the agent retries it when it reaches the question.
+    """
+    cache = cache or file_cache.get_file_cache()
+    tasks = [item for item in questions_data if item.get("task_id") and item.get("file_name")]
+    if not tasks:
+        return {}
+
+    def fetch(item: dict) -> tuple[str, str]:
+        try:
+            return item["task_id"], cache.fetch(task_file_url(api_url, item["task_id"]), filename=item["file_name"])
+        except Exception as e:
+            print(f"Error prefetching file of task {item['task_id']}: {e}")
+            return item["task_id"], f"Error downloading file: {e}"
+
+    print(f"Prefetching {len(tasks)} task files with {max(1, max_workers)} worker(s)...")
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(tasks))), thread_name_prefix="prefetch") as executor:
+        results = dict(executor.map(fetch, tasks))
+    print(f"Prefetched {sum(not path.startswith('Error') for path in results.values())}/{len(tasks)} task files.")
+    return results
+
+
+def start_prefetch(questions_data: list[dict], api_url: str, cache: Optional[file_cache.FileCache] = None,
+                   max_workers: int = PREFETCH_CONCURRENCY) -> Future:
+    """
+    Run prefetch_task_files in the background and return its Future.
+    The agent can start right away; a question whose file is still downloading
+    waits for that download only (the file cache locks per URL).
+    """
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="prefetch-main")
+    future = executor.submit(prefetch_task_files, questions_data, api_url, cache, max_workers)
+    executor.shutdown(wait=False)
+    return future
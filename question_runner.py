@@ -0,0 +1,78 @@
+"""
+question_runner.py
+Runs the agent over the list of evaluation questions.
+Questions are answered concurrently on a bounded thread pool; the results keep
+the order of the incoming question list and an error in one task does not
+affect the others.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+# Number of questions answered at the same time (1 = serial, like before)
+DEFAULT_CONCURRENCY = int(os.getenv("AGENT_CONCURRENCY", "4"))
+
+
+def answer_question(agent: Callable, item: dict) -> Optional[tuple[dict, dict]]:
+    """
+    Run the agent on a single question item.
+
+    Args:
+        agent: Callable agent, called as agent(question, task_id=..., file_name=...).
+        item (dict): Question item as returned by the /questions endpoint.
+
+    Returns:
+        tuple: (answer entry or None, results log entry), or None if the item is invalid.
+    """
+    task_id = item.get("task_id")
+    question_text = item.get("question")
+    if not task_id or question_text is None:
+        print(f"Skipping item with missing task_id or question: {item}")
+        return None
+
+    print("" + "#"*80)
+    print(f"Processing item: {item}")
+    print("" + "#"*80)
+    try:
+        submitted_answer = agent(question_text, task_id=task_id, file_name=item.get("file_name"))
+        answer = {"task_id": task_id, "submitted_answer": submitted_answer}
+        log = {"Task ID": task_id, "Question": question_text, "Submitted Answer": submitted_answer}
+        return answer, log
+    except Exception as e:
+        print(f"Error running agent on task {task_id}: {e}")
+        return None, {"Task ID": task_id, "Question": question_text, "Submitted Answer": f"AGENT ERROR: {e}"}
+
+
+def run_questions(agent: Callable, questions_data: list[dict], max_workers: int = DEFAULT_CONCURRENCY) -> tuple[list[dict], list[dict]]:
+    """
+    Run the agent on all questions with at most `max_workers` questions in flight.
+
+    Args:
+        agent: Callable agent, called as agent(question, task_id=..., file_name=...).
+        questions_data (list[dict]): Question items from the /questions endpoint.
+        max_workers (int): Concurrency limit. Values below 1 are treated as 1.
+
+    Returns:
+        tuple: (answers_payload, results_log), both in the order of `questions_data`.
+    """
+    max_workers = max(1, min(max_workers, len(questions_data) or 1))
+    print(f"Running agent on {len(questions_data)} questions with {max_workers} worker(s)...")
+
+    if max_workers == 1:
+        outcomes = [answer_question(agent, item) for item in questions_data]
+    else:
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="question") as executor:
+            # map() yields in submission order, so the output order matches the input order
+            outcomes = list(executor.map(lambda item: answer_question(agent, item), questions_data))
+
+    answers_payload = []
+    results_log = []
+    for outcome in outcomes:
+        if outcome is None:
+            continue
+        answer, log = outcome
+        if answer is not None:
+            answers_payload.append(answer)
+        results_log.append(log)
+    return answers_payload, results_log
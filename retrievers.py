@@ -0,0 +1,259 @@
+"""
+retrievers.py
+Vector store backends for the retriever node of the agent.
+The "supabase" backend queries the remote Supabase table, the "sqlite_vec" backend
+keeps the same documents in a local sqlite-vec database so no network round-trip
+is needed per question.
+
+Usage of the ingestion command:
+    python retrievers.py --source supabase --db vector_store.sqlite
+    python retrievers.py --source jsonl --jsonl documents.jsonl --db vector_store.sqlite
+"""
+
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import sqlite3
+import threading
+from typing import Iterable, Iterator, Optional
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+DEFAULT_VECTOR_DB_PATH = os.getenv("VECTOR_DB_PATH", "vector_store.sqlite")
+DEFAULT_BATCH_SIZE = 64
+
+
+class RetrieverBackend:
+    """Base class of the retriever backends."""
+
+    def similarity_search(self, query: str, k: int = 4) -> list[Document]:
+        """Return the `k` documents most similar to `query`."""
+        raise NotImplementedError
+
+
+class SupabaseRetriever(RetrieverBackend):
+    """Retriever backed by the Supabase `documents` table (network call per query)."""
+
+    def __init__(
+            self,
+            embeddings: Embeddings,
+            supabase_url: Optional[str] = None,
+            supabase_key: Optional[str] = None,
+            table_name: str = "documents",
+            query_name: str = "match_documents_langchain"):
+        from langchain_community.vectorstores import SupabaseVectorStore
+        from supabase.client import create_client
+
+        supabase_url = supabase_url or os.environ.get("SUPABASE_URL")
+        supabase_key = supabase_key or os.environ.get("SUPABASE_SERVICE_KEY")
+        if not supabase_url or not supabase_key:
+            raise ValueError("SUPABASE_URL and SUPABASE_SERVICE_KEY are required for the supabase retriever.")
+
+        self.client = create_client(supabase_url, supabase_key)
+        self.vector_store = SupabaseVectorStore(
+            client=self.client,
+            embedding=embeddings,
+            table_name=table_name,
+            query_name=query_name,
+        )
+
+    def similarity_search(self, query: str, k: int = 4) -> list[Document]:
+        return self.vector_store.similarity_search(query, k=k)
+
+
+class SqliteVecRetriever(RetrieverBackend):
+    """Retriever backed by a local sqlite-vec database."""
+
+    def __init__(self, embeddings: Embeddings, db_path: str = DEFAULT_VECTOR_DB_PATH):
+        """
+        Open (or create) the local vector database.
+
+        Args:
+            embeddings (Embeddings): Embedding model used for documents and queries.
+            db_path (str): Path of the SQLite database file.
+        """
+        import sqlite_vec
+
+        self.embeddings = embeddings
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.enable_load_extension(True)
+        sqlite_vec.load(self._conn)
+        self._conn.enable_load_extension(False)
+        self._serialize = sqlite_vec.serialize_float32
+
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS documents (
+                    id INTEGER PRIMARY KEY,
+                    content_hash TEXT UNIQUE NOT NULL,
+                    content TEXT NOT NULL,
+                    metadata TEXT NOT NULL
+                )
+                """
+            )
+            self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+
+    def _dimension(self) -> Optional[int]:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'dimension'").fetchone()
+        return int(row[0]) if row else None
+
+    def _ensure_vector_table(self, dimension: int) -> None:
+        current = self._dimension()
+        if current is None:
+            self._conn.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS vec_documents USING vec0(embedding float[{dimension}] distance_metric=cosine)"
+            )
+            self._conn.execute("INSERT INTO meta VALUES ('dimension', ?)", (str(dimension),))
+        elif current != dimension:
+            raise ValueError(f"Embedding dimension {dimension} does not match the database dimension {current}.")
+
+    def add_texts(self, texts: Iterable[str], metadatas: Optional[Iterable[dict]] = None, batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+        """
+        Embed and insert documents in batches. Documents whose content is already
+        stored (same SHA-256 of the content) are skipped without being embedded.
+
+        Args:
+            texts (Iterable[str]): Document contents.
+            metadatas (Iterable[dict], optional): Metadata per document.
+            batch_size (int): Number of documents embedded per call of the embedding model.
+
+        Returns:
+            int: Number of newly inserted documents.
+        """
+        if metadatas is None:
+            metadatas = itertools.repeat({})
+        return self.add_documents(zip(texts, metadatas), batch_size=batch_size)
+
+    def add_documents(self, documents: Iterable[tuple[str, dict]], batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+        """Same as add_texts, for an iterable of (content, metadata) pairs. The iterable is consumed batch by batch."""
+        inserted = 0
+        batch = []
+        for text, metadata in documents:
+            batch.append((text, metadata or {}))
+            if len(batch) >= batch_size:
+                inserted += self._add_batch(batch)
+                batch = []
+        if batch:
+            inserted += self._add_batch(batch)
+        return inserted
+
+    def _add_batch(self, batch: list[tuple[str, dict]]) -> int:
+        # Deduplicate within the batch and against the database before embedding
+        unique = {}
+        for text, metadata in batch:
+            unique.setdefault(hashlib.sha256(text.encode("utf-8")).hexdigest(), (text, metadata))
+        with self._lock:
+            placeholders = ",".join("?" * len(unique))
+            existing = {row[0] for row in self._conn.execute(
+                f"SELECT content_hash FROM documents WHERE content_hash IN ({placeholders})", list(unique))}
+        new = [(h, text, metadata) for h, (text, metadata) in unique.items() if h not in existing]
+        if not new:
+            return 0
+
+        vectors = self.embeddings.embed_documents([text for _, text, _ in new])
+        with self._lock, self._conn:
+            self._ensure_vector_table(len(vectors[0]))
+            for (content_hash, text, metadata), vector in zip(new, vectors):
+                cursor = self._conn.execute(
+                    "INSERT INTO documents (content_hash, content, metadata) VALUES (?, ?, ?)",
+                    (content_hash, text, json.dumps(metadata)),
+                )
+                self._conn.execute(
+                    "INSERT INTO vec_documents (rowid, embedding) VALUES (?, ?)",
+                    (cursor.lastrowid, self._serialize(vector)),
+                )
+        return len(new)
+
+    def similarity_search(self, query: str, k: int = 4) -> list[Document]:
+        vector = self.embeddings.embed_query(query)
+        with self._lock:
+            if self._dimension() is None:
+                return []
+            rows = self._conn.execute(
+                """
+                SELECT d.content, d.metadata, v.distance
+                FROM (SELECT rowid, distance FROM vec_documents WHERE embedding MATCH ? AND k = ?) AS v
+                JOIN documents AS d ON d.id = v.rowid
+                ORDER BY v.distance
+                """,
+                (self._serialize(vector), k),
+            ).fetchall()
+        return [Document(page_content=content, metadata=json.loads(metadata)) for content, metadata, _ in rows]
+
+    def count(self) -> int:
+        """Return the number of stored documents."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+
+def create_retriever_backend(name: str, embeddings: Embeddings, **kwargs) -> RetrieverBackend:
+    """
+    Create a retriever backend by name.
+
+    Args:
+        name (str): "supabase" or "sqlite_vec".
+        embeddings (Embeddings): Embedding model.
+        **kwargs: Backend specific arguments (e.g. db_path for sqlite_vec).
+
+    Returns:
+        RetrieverBackend: The backend instance.
+    """
+    if name == "supabase":
+        return SupabaseRetriever(embeddings, **kwargs)
+    if name == "sqlite_vec":
+        return SqliteVecRetriever(embeddings, **kwargs)
+    raise ValueError(f"Unknown retriever backend: {name}. Use 'supabase' or 'sqlite_vec'.")
+
+
+def iter_supabase_documents(table_name: str = "documents", page_size: int = 1000) -> Iterator[tuple[str, dict]]:
+    """Yield (content, metadata) of all rows of the Supabase documents table, page by page."""
+    from supabase.client import create_client
+
+    client = create_client(os.environ.get("SUPABASE_URL"), os.environ.get("SUPABASE_SERVICE_KEY"))
+    start = 0
+    while True:
+        rows = client.table(table_name).select("content, metadata").range(start, start + page_size - 1).execute().data
+        for row in rows:
+            yield row["content"], row.get("metadata") or {}
+        if len(rows) < page_size:
+            break
+        start += page_size
+
+
+def iter_jsonl_documents(path: str) -> Iterator[tuple[str, dict]]:
+    """Yield (content, metadata) from a JSONL file with 'content' and optional 'metadata' per line."""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                row = json.loads(line)
+                yield row["content"], row.get("metadata") or {}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Embed the documents corpus and load it into the local sqlite-vec database.")
+    parser.add_argument("--source", choices=["supabase", "jsonl"], default="supabase")
+    parser.add_argument("--jsonl", help="Path of the JSONL file (for --source jsonl).")
+    parser.add_argument("--db", default=DEFAULT_VECTOR_DB_PATH, help="Path of the local vector database.")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    from langchain_community.embeddings import HuggingFaceEmbeddings
+
+    embeddings = HuggingFaceEmbeddings(model_name="sentence-transformers/all-mpnet-base-v2")
+    retriever = SqliteVecRetriever(embeddings, db_path=args.db)
+
+    if args.source == "supabase":
+        documents = iter_supabase_documents()
+    else:
+        if not args.jsonl:
+            parser.error("--jsonl is required for --source jsonl")
+        documents = iter_jsonl_documents(args.jsonl)
+
+    added = retriever.add_documents(documents, batch_size=args.batch_size)
+    print(f"Added {added} new documents, {retriever.count()} documents in {args.db}.")
@@ -4,9 +4,13 @@ Test script for the GAIA agent using real API keys.
 This script simulates GAIA benchmark questions and helps debug/improve the agent.
 """
 
+import argparse
 import os
+import tempfile
 from core_agent import AIAgent
 from langchain_core.messages import HumanMessage
+from llm_cache import LlmCache
+from tools import cassette, tool_cache
 
 SAMPLE_QUESTIONS = [
     # {
@@ -109,17 +113,45 @@ SAMPLE_QUESTIONS = [
 ]
 
 
+def use_cassette(path: str, mode: str, zero_latency: bool = False) -> LlmCache:
+    """
+    Record or replay a run: HTTP calls of the tools go to the cassette, model calls to llm.sqlite in it.
+
+    The disk caches of the tools start empty, so a replay makes the same requests as the recording.
+
+    Returns:
+        LlmCache: The response cache for the agent.
+    """
+    cold_caches = tempfile.mkdtemp(prefix="agent_cassette_run_")
+    for name in ("FILE_CACHE_DIR", "YOUTUBE_AUDIO_CACHE_DIR", "TRANSCRIPT_CACHE_DIR"):
+        os.environ[name] = os.path.join(cold_caches, name.lower())
+    tool_cache.TOOL_CACHE_ENABLED = False
+    cassette.install(path, mode, latency="zero" if zero_latency else "original")
+    return LlmCache(os.path.join(path, "llm.sqlite"), mode)
+
+
 # Beispiel für die Verwendung des Agenten
 if __name__ == "__main__":
-    # API-Schlüssel und Modellname angeben
-    api_key = os.getenv("OPENAI_API_KEY")
+    parser = argparse.ArgumentParser(description="Run the sample questions")
+    parser.add_argument("--record", metavar="CASSETTE", help="record all HTTP and model calls into this directory")
+    parser.add_argument("--replay", metavar="CASSETTE", help="answer all HTTP and model calls from this directory (no network)")
+    parser.add_argument("--zero-latency", action="store_true", help="replay without the recorded latency")
+    args = parser.parse_args()
+
+    llm_cache = None
+    if args.record or args.replay:
+        llm_cache = use_cassette(args.record or args.replay, "record" if args.record else "replay", args.zero_latency)
+
+    # API-Schlüssel und Modellname angeben (beim Replay genügt ein beliebiger Schlüssel)
+    api_key = os.getenv("OPENAI_API_KEY") or ("replay" if args.replay else None)
     #model_name = "gpt-4.1-nano-2025-04-14"
     model_name = "gpt-4.1"
 
     # Agent initialisieren
     agent = AIAgent(api_key=api_key,
                     model_name=model_name,
-                    system_prompt_file_name="system_prompt.txt")
+                    system_prompt_file_name="system_prompt.txt",
+                    llm_cache=llm_cache)
 
     # Fragen durchlaufen und Agenten ausführen
 
@@ -170,3 +202,7 @@ if __name__ == "__main__":
         with open("results.txt", "a") as f:
             f.write(f"Task {task_id}: {answer[14:]}\n")
         # Optional: Add a delay between questions to avoid hitting API rate limits
+
+    if cassette.active_cassette() is not None:
+        print("Cassette: " + cassette.active_cassette().format_stats())
+        print("LLM cache: " + llm_cache.format_stats())
@@ -0,0 +1,54 @@
+import threading
+
+import pytest
+
+from agent_holder import AgentHolder
+
+
+def test_agent_is_built_once():
+    """All callers get the same instance and the factory runs only once."""
+    calls = []
+
+    def factory():
+        calls.append(1)
+        return object()
+
+    holder = AgentHolder(factory)
+    assert holder.status() == "Agent not started."
+    first = holder.get()
+    assert holder.get() is first
+    assert calls == [1]
+    assert holder.is_ready
+    assert holder.status().startswith("Agent ready")
+
+def test_background_start_and_wait():
+    """get() waits for a build started in the background."""
+    release = threading.Event()
+
+    def factory():
+        release.wait(5)
+        return "agent"
+
+    holder = AgentHolder(factory)
+    holder.start()
+    assert holder.status() == "Agent is loading..."
+    with pytest.raises(TimeoutError):
+        holder.get(timeout=0.01)
+    release.set()
+    assert holder.get(timeout=5) == "agent"
+
+def test_failed_build_is_reported_and_retried():
+    """A failing factory raises its error and is retried on the next get()."""
+    attempts = []
+
+    def factory():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("no api key")
+        return "agent"
+
+    holder = AgentHolder(factory)
+    with pytest.raises(RuntimeError):
+        holder.get()
+    assert "no api key" in holder.status()
+    assert holder.get() == "agent"
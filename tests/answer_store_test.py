@@ -0,0 +1,77 @@
+from answer_store import AnswerStore, FailedAnswer, StoredAgent, extract_final_answer, text_hash
+
+
+QUESTIONS = [
+    {"task_id": "task_1", "question": "What is 2 + 2?"},
+    {"task_id": "task_2", "question": "What is the capital of France?"},
+]
+
+
+def test_put_and_get(tmp_path):
+    """A stored answer is only returned for the same task, question, model and prompt."""
+    store = AnswerStore(str(tmp_path / "answers.sqlite"))
+    store.put("task_1", "What is 2 + 2?", "gpt-4o", "p1", "4")
+
+    assert store.get("task_1", "What is 2 + 2?", "gpt-4o", "p1") == "4"
+    assert store.get("task_1", "What is 2 + 3?", "gpt-4o", "p1") is None
+    assert store.get("task_1", "What is 2 + 2?", "gpt-4.1", "p1") is None
+    assert store.get("task_1", "What is 2 + 2?", "gpt-4o", "p2") is None
+
+def test_store_survives_reopen(tmp_path):
+    """Answers are persisted on disk."""
+    path = str(tmp_path / "answers.sqlite")
+    store = AnswerStore(path)
+    store.put("task_1", "What is 2 + 2?", "gpt-4o", "p1", "4")
+    store.close()
+
+    assert AnswerStore(path).get("task_1", "What is 2 + 2?", "gpt-4o", "p1") == "4"
+
+def test_answers_for(tmp_path):
+    """Only questions with a stored answer end up in the payload."""
+    store = AnswerStore(str(tmp_path / "answers.sqlite"))
+    store.put("task_2", "What is the capital of France?", "gpt-4o", "p1", "Paris")
+
+    answers, log = store.answers_for(QUESTIONS, "gpt-4o", "p1")
+    assert answers == [{"task_id": "task_2", "submitted_answer": "Paris"}]
+    assert log[0]["Submitted Answer"] == "Paris"
+
+def test_stored_agent_skips_answered_questions(tmp_path):
+    """The wrapped agent is only called for questions without a stored answer."""
+    calls = []
+
+    def agent(question, task_id=None, file_name=None):
+        calls.append(task_id)
+        return f"answer {task_id}"
+
+    store = AnswerStore(str(tmp_path / "answers.sqlite"))
+    stored_agent = StoredAgent(agent, store, "gpt-4o", text_hash("prompt"))
+
+    assert stored_agent("What is 2 + 2?", task_id="task_1") == "answer task_1"
+    assert stored_agent("What is 2 + 2?", task_id="task_1") == "answer task_1"
+    assert calls == ["task_1"]
+
+
+def test_final_answer_is_extracted():
+    assert extract_final_answer("Thinking...\nFINAL ANSWER: 42 ") == "42"
+    missing = extract_final_answer("I could not find the album list.")
+    assert isinstance(missing, FailedAnswer) and missing == "I could not find the album list."
+
+
+def test_failed_answers_are_not_stored(tmp_path):
+    """Errors and answers without the FINAL ANSWER marker are submitted, but asked again in the next run."""
+    calls = []
+
+    def agent(question, task_id=None, file_name=None):
+        calls.append(task_id)
+        if len(calls) == 1:
+            return FailedAnswer("Error downloading file: 503 Server Error")
+        return extract_final_answer("FINAL ANSWER: Paris")
+
+    store = AnswerStore(str(tmp_path / "answers.sqlite"))
+    stored_agent = StoredAgent(agent, store, "gpt-4o", text_hash("prompt"))
+
+    assert stored_agent("Capital of France?", task_id="task_2").startswith("Error downloading file")
+    assert store.get("task_2", "Capital of France?", "gpt-4o", text_hash("prompt")) is None
+    assert stored_agent("Capital of France?", task_id="task_2") == "Paris"
+    assert stored_agent("Capital of France?", task_id="task_2") == "Paris"
+    assert calls == ["task_2", "task_2"]
@@ -0,0 +1,101 @@
+import time
+
+import pytest
+
+from tools.calculator import calculate
+
+
+def test_multi_step_calculation_in_one_call():
+    """Assignments are available to the following expressions."""
+    result = calculate([
+        "subtotal = burgers * 4.5 + fries * 2.25",
+        "tax = subtotal * 0.19",
+        "total = subtotal + tax",
+        "round(total, 2)",
+    ], variables={"burgers": 12, "fries": 8})
+    assert result.splitlines()[-1] == "round(total, 2) = 85.68"
+
+
+def test_lists_are_evaluated_elementwise():
+    result = calculate(["prices * 2", "sum(prices)", "mean(prices)", "prices > 3"],
+                       variables={"prices": [1.5, 3.5, 4.0]})
+    assert result.splitlines() == [
+        "prices * 2 = [3, 7, 8]",
+        "sum(prices) = 9",
+        "mean(prices) = 3",
+        "prices > 3 = [False, True, True]",
+    ]
+
+
+def test_big_integers_do_not_overflow():
+    assert calculate(["2 ** 64 * 3", "factorial(25)", "[2 ** 62, 3] * 4"]).splitlines() == [
+        "2 ** 64 * 3 = 55340232221128654848",
+        "factorial(25) = 15511210043330985984000000",
+        "[2 ** 62, 3] * 4 = [18446744073709551616, 12]",
+    ]
+
+
+def test_exact_modes():
+    assert calculate(["0.1 + 0.2 == 0.3", "1/3 + 1/6"], mode="fraction").splitlines() == [
+        "0.1 + 0.2 == 0.3 = True",
+        "1/3 + 1/6 = 1/2 (= 0.5)",
+    ]
+    assert calculate(["1/7"], mode="decimal") == "1/7 = 0.14285714285714285714285714285714285714285714285714"
+    assert calculate(["0.1 + 0.2"]) == "0.1 + 0.2 = 0.30000000000000004"
+
+
+@pytest.mark.parametrize("expression", [
+    "__import__('os').system('ls')",
+    "(1).__class__",
+    "[x for x in [1, 2]]",
+    "lambda: 1",
+    "open('/etc/passwd')",
+    "'text' * 3",
+    "9 ** 9 ** 9",
+    "perm(300000)",
+    "comb(10 ** 7, 5 * 10 ** 6)",
+    "lcm(2 ** 60000 + 1, 2 ** 60000 + 3)",
+])
+def test_unsafe_or_unbounded_expressions_are_rejected(expression):
+    assert f"{expression}: Error" in calculate([expression])
+
+
+@pytest.mark.parametrize("expression, mode", [
+    ("round(2, -100000000)", "float"),
+    ("round(1/3, 100000000)", "fraction"),
+    ("round(1/3, 100000000)", "decimal"),
+    ("round(2.5, 0.5)", "float"),
+])
+def test_round_digits_are_limited(expression, mode):
+    """round() would compute 10 ** ndigits before any result check."""
+    start = time.perf_counter()
+    assert f"{expression}: Error" in calculate([expression], mode=mode)
+    assert time.perf_counter() - start < 1
+
+
+def test_round():
+    assert calculate(["round(1234, -2)", "round(2.5)", "round(1/3, 2)"]).splitlines() == [
+        "round(1234, -2) = 1200", "round(2.5) = 2", "round(1/3, 2) = 0.33"]
+
+
+def test_errors_do_not_stop_the_batch():
+    assert calculate(["1 / 0", "unknown + 1", "2 + 2"]).splitlines() == [
+        "1 / 0: Error ZeroDivisionError: division by zero",
+        "unknown + 1: Error CalculationError: unknown name 'unknown'",
+        "2 + 2 = 4",
+    ]
+
+
+def test_chained_products_are_bounded():
+    """Repeated squaring hits the integer limit instead of running for minutes."""
+    import time
+
+    start = time.perf_counter()
+    lines = calculate(["x = 3 ** 20000"] + ["x = x * x"] * 10).splitlines()
+    assert time.perf_counter() - start < 5
+    assert "too large" in lines[-1] or "limited to" in lines[-1]
+    assert calculate(["comb(50, 25)", "perm(10, 3)"]).splitlines() == ["comb(50, 25) = 126410606437752", "perm(10, 3) = 720"]
+
+
+def test_number_of_expressions_is_limited():
+    assert calculate(["1 + 1"] * 101).startswith("Error in calculation: at most 100 expressions")
@@ -0,0 +1,113 @@
+import json
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from tools import cassette
+from tools.cassette import CassetteMiss, use_cassette
+
+
+class _Handler(BaseHTTPRequestHandler):
+    counter = 0
+
+    def do_GET(self):
+        _Handler.counter += 1
+        if self.path.startswith("/missing"):
+            self._reply(404, b"not found")
+        elif self.path.startswith("/slow"):
+            time.sleep(0.3)
+            self._reply(200, b"slow answer")
+        else:
+            self._reply(200, json.dumps({"path": self.path, "call": _Handler.counter}).encode())
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self._reply(200, json.dumps({"query": body["query"]}).encode())
+
+    def _reply(self, status, body):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_record_then_replay_without_server(server, tmp_path):
+    path = str(tmp_path / "cassette")
+    session = requests.Session()
+    with use_cassette(path, "record") as recording:
+        first = session.get(f"{server}/page?title=Mercedes_Sosa&api_key=secret").json()
+        second = session.get(f"{server}/page?title=Mercedes_Sosa&api_key=secret").json()
+        search = requests.post(f"{server}/search", json={"query": "arXiv", "api_key": "secret"},
+                               headers={"Authorization": "Bearer secret"}).json()
+        with urllib.request.urlopen(f"{server}/video") as response:
+            video = response.read()
+    assert recording.stats()["recorded"] == 4
+    with open(os.path.join(path, "interactions.jsonl")) as f:
+        assert "secret" not in f.read()
+
+    calls = _Handler.counter
+    with use_cassette(path, "replay", latency="zero") as replay:
+        # query parameters in another order and another key still match
+        assert session.get(f"{server}/page?api_key=other&title=Mercedes_Sosa").json() == first
+        assert session.get(f"{server}/page?title=Mercedes_Sosa").json() == second
+        assert requests.post(f"{server}/search", json={"api_key": "other", "query": "arXiv"}).json() == search
+        with urllib.request.urlopen(f"{server}/video") as response:
+            assert response.read() == video and response.status == 200
+        with pytest.raises(CassetteMiss):
+            session.get(f"{server}/never-recorded")
+    assert _Handler.counter == calls  # nothing reached the server
+    assert replay.stats() == {"mode": "replay", "recorded": 0, "played": 4, "misses": 1}
+    assert cassette.active_cassette() is None
+
+
+def test_errors_and_streaming_are_replayed(server, tmp_path):
+    path = str(tmp_path / "cassette")
+    with use_cassette(path, "record"):
+        assert requests.get(f"{server}/missing").status_code == 404
+        with pytest.raises(urllib.error.HTTPError):
+            urllib.request.urlopen(f"{server}/missing")
+        streamed = b"".join(requests.get(f"{server}/file", stream=True).iter_content(4))
+
+    with use_cassette(path, "replay", latency="zero"):
+        response = requests.get(f"{server}/missing")
+        assert response.status_code == 404 and response.text == "not found"
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(f"{server}/missing")
+        assert error.value.code == 404
+        assert b"".join(requests.get(f"{server}/file", stream=True).iter_content(4)) == streamed
+
+
+def test_replay_latency(server, tmp_path):
+    path = str(tmp_path / "cassette")
+    with use_cassette(path, "record"):
+        requests.get(f"{server}/slow")
+    for latency, check in (("original", lambda s: s >= 0.25), ("zero", lambda s: s < 0.2)):
+        with use_cassette(path, "replay", latency=latency):
+            start = time.perf_counter()
+            assert requests.get(f"{server}/slow").text == "slow answer"
+            assert check(time.perf_counter() - start)
+
+
+def test_replay_needs_a_recording(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        cassette.Cassette(str(tmp_path / "empty"), "replay")
@@ -0,0 +1,65 @@
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langgraph.graph import END, START, MessagesState, StateGraph
+
+import compaction
+from compaction import budget_for_model, compact_messages, make_compaction_node, message_tokens
+
+
+def _history(results: list[str]) -> list:
+    """Question followed by one tool call and result per entry of `results`."""
+    messages = [HumanMessage(content="How many albums?", id="question")]
+    for n, result in enumerate(results):
+        messages.append(AIMessage(content="", id=f"call-{n}",
+                                  tool_calls=[{"name": "wiki", "args": {"q": str(n)}, "id": f"tc-{n}"}]))
+        messages.append(ToolMessage(content=result, tool_call_id=f"tc-{n}", name="wiki", id=f"result-{n}"))
+    return messages
+
+
+def test_under_budget_nothing_changes():
+    replacements, before, saved = compact_messages(_history(["short"] * 3), budget=10000)
+    assert replacements == [] and saved == 0 and before > 0
+
+
+def test_stale_results_are_shortened_and_recent_ones_kept():
+    results = [f"page {n} " + "x" * 40000 for n in range(5)]
+    messages = _history(results)
+    replacements, before, saved = compact_messages(messages, budget=40000, keep_recent=2)
+    shortened = {message.id: message for message in replacements}
+    assert set(shortened) <= {"result-0", "result-1", "result-2"}
+    assert "result-3" not in shortened and "result-4" not in shortened
+    first = shortened["result-0"]
+    assert first.content.startswith("page 0 ") and "tokens of this earlier tool result were removed" in first.content
+    assert first.tool_call_id == "tc-0" and first.name == "wiki"
+    after = sum(message_tokens(shortened.get(message.id, message)) for message in messages)
+    assert after <= 40000 and before - after == saved
+
+
+def test_recent_results_are_cut_when_they_alone_exceed_the_budget():
+    messages = _history(["y" * 400000])
+    replacements, _, saved = compact_messages(messages, budget=20000, keep_recent=3)
+    assert len(replacements) == 1 and saved > 0
+    assert message_tokens(replacements[0]) <= 20000 // 4 + 100
+
+
+def test_node_replaces_messages_in_the_graph_state():
+    """The shortened messages replace the originals (same ids) instead of being appended."""
+    compaction.reset_metrics()
+    builder = StateGraph(MessagesState)
+    builder.add_node("compact", make_compaction_node(budget=20000, keep_recent=1))
+    builder.add_edge(START, "compact")
+    builder.add_edge("compact", END)
+    messages = _history(["z" * 120000, "recent result"])
+    state = builder.compile().invoke({"messages": messages})
+    assert [message.id for message in state["messages"]] == [message.id for message in messages]
+    assert len(state["messages"][2].content) < 5000
+    assert state["messages"][4].content == "recent result"
+    metrics = compaction.compaction_metrics()
+    assert metrics["compactions"] == 1 and metrics["tokens_saved"] > 10000
+
+
+def test_budget_per_model(monkeypatch):
+    assert budget_for_model("gpt-4.1-nano-2025-04-14") == compaction.MODEL_TOKEN_BUDGETS["gpt-4.1-nano"]
+    assert budget_for_model("gpt-4.1") == compaction.MODEL_TOKEN_BUDGETS["gpt-4.1"]
+    assert budget_for_model("some-other-model") == compaction.DEFAULT_TOKEN_BUDGET
+    monkeypatch.setattr(compaction, "COMPACTION_TOKEN_BUDGET", 12345)
+    assert budget_for_model("gpt-4o") == 12345
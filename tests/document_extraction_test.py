@@ -0,0 +1,145 @@
+import zipfile
+
+import pytest
+from PIL import Image, ImageDraw
+
+import tools.document_extraction as documents
+from tools.extract_text_from_document_tool import extract_text_from_document
+
+pypdf = pytest.importorskip("pypdf")
+
+
+def _text_pdf(path, pages: list[str]) -> None:
+    """Minimal PDF with one line of Helvetica text per page."""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None,
+               "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for text in pages:
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>")
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+    data, offsets = b"%PDF-1.4\n", []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(data))
+        data += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(data)
+    data += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    data += b"".join(f"{offset:010d} 00000 n \n".encode() for offset in offsets)
+    data += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    path.write_bytes(data)
+
+
+def _docx(path, body: str) -> None:
+    document = ('<?xml version="1.0" encoding="UTF-8"?>'
+                '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+                f"<w:body>{body}</w:body></w:document>")
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr("word/document.xml", document)
+
+
+@pytest.fixture(autouse=True)
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(documents, "_cache", documents.DocumentCache(str(tmp_path / "document_cache")))
+
+
+@pytest.fixture
+def report_pdf(tmp_path):
+    path = tmp_path / "report.pdf"
+    _text_pdf(path, [f"This is page number {n} of the annual report" for n in range(1, 11)])
+    return path
+
+
+def test_parse_page_range():
+    assert documents.parse_page_range("3-5", 10) == [3, 4, 5]
+    assert documents.parse_page_range("1, 4,7-9,8", 10) == [1, 4, 7, 8, 9]
+    assert documents.parse_page_range("9-", 10) == [9, 10]
+    assert documents.parse_page_range(None, 3) == [1, 2, 3]
+    for invalid in ("0", "5-3", "11", "a-b"):
+        with pytest.raises(ValueError):
+            documents.parse_page_range(invalid, 10)
+
+
+def test_only_requested_pages_are_extracted(report_pdf, monkeypatch):
+    extracted = []
+    original = documents._extract_pdf_pages
+    monkeypatch.setattr(documents, "_extract_pdf_pages",
+                        lambda path, pages: extracted.extend(pages) or original(path, pages))
+    result = extract_text_from_document(str(report_pdf), pages="3-5")
+    assert extracted == [3, 4, 5]
+    assert result.startswith("Document with 10 pages, pages 3-5:")
+    assert "## Page 4\nThis is page number 4 of the annual report" in result
+    assert "page number 6" not in result
+
+
+def test_format_page_range():
+    assert documents.format_page_range([1, 4, 7, 8, 9]) == "1,4,7-9"
+    assert documents.format_page_range([5, 3, 4, 3]) == "3-5"
+    assert documents.format_page_range([]) == ""
+
+
+def test_truncation_hint_names_only_selected_pages(report_pdf, monkeypatch):
+    """The hint asks for the rest of the selection, not for all following pages."""
+    monkeypatch.setattr("tools.extract_text_from_document_tool.DOCUMENT_MAX_CHARS", 100)
+    result = extract_text_from_document(str(report_pdf), pages="1,4,7-9")
+    assert "## Page 1\n" in result
+    assert "request the remaining pages with pages='4,7-9'" in result
+
+
+def test_pages_are_cached(report_pdf, monkeypatch):
+    documents.extract_document(str(report_pdf), "1-2")
+    monkeypatch.setattr(documents, "_extract_pdf_pages", lambda *args: pytest.fail("page extracted twice"))
+    pages = documents.extract_document(str(report_pdf), "2,1")["pages"]
+    assert [page["page"] for page in pages] == [1, 2]
+
+
+def test_process_pool_for_many_pages(report_pdf, monkeypatch):
+    monkeypatch.setattr(documents, "DOCUMENT_WORKERS", 2)
+    monkeypatch.setattr(documents, "DOCUMENT_PARALLEL_MIN_PAGES", 4)
+    monkeypatch.setattr(documents, "_executor", None)
+    try:
+        pages = documents.extract_document(str(report_pdf))["pages"]
+    finally:
+        documents._executor.shutdown()
+        monkeypatch.setattr(documents, "_executor", None)
+    assert [page["source"] for page in pages] == ["text"] * 10
+    assert pages[9]["text"] == "This is page number 10 of the annual report"
+
+
+def test_only_scanned_pages_go_to_ocr(tmp_path, monkeypatch):
+    text_path, scan_path = tmp_path / "text.pdf", tmp_path / "scan.pdf"
+    _text_pdf(text_path, ["A page with a real text layer on it"])
+    scan = Image.new("RGB", (600, 800), "white")
+    ImageDraw.Draw(scan).rectangle([50, 50, 550, 70], fill="black")
+    scan.save(scan_path)
+    writer = pypdf.PdfWriter()
+    writer.append(str(text_path))
+    writer.append(str(scan_path))
+    path = tmp_path / "mixed.pdf"
+    writer.write(str(path))
+
+    recognized = []
+    monkeypatch.setattr("tools.ocr_pipeline.recognize_images",
+                        lambda images: recognized.extend(images) or ["scanned text"] * len(images))
+    pages = documents.extract_document(str(path))["pages"]
+    assert [(page["source"], page["text"]) for page in pages] == [
+        ("text", "A page with a real text layer on it"), ("ocr", "scanned text")]
+    assert len(recognized) == 1 and recognized[0].size == (600, 800)
+
+
+def test_docx_pages_and_tables(tmp_path):
+    path = tmp_path / "minutes.docx"
+    _docx(path,
+          "<w:p><w:r><w:t>Meeting minutes</w:t></w:r></w:p>"
+          "<w:tbl><w:tr><w:tc><w:p><w:r><w:t>Name</w:t></w:r></w:p></w:tc>"
+          "<w:tc><w:p><w:r><w:t>Role</w:t></w:r></w:p></w:tc></w:tr>"
+          "<w:tr><w:tc><w:p><w:r><w:t>Ada</w:t></w:r></w:p></w:tc>"
+          "<w:tc><w:p><w:r><w:t>Chair</w:t></w:r></w:p></w:tc></w:tr></w:tbl>"
+          '<w:p><w:r><w:br w:type="page"/><w:t>Second page</w:t></w:r></w:p>')
+    result = extract_text_from_document(str(path))
+    assert "Document with 2 pages" in result
+    assert "## Page 1\nMeeting minutes\nName,Role\nAda,Chair" in result
+    assert "## Page 2\nSecond page" in result
+    assert "## Page 2\nSecond page" in extract_text_from_document(str(path), pages="2")
@@ -0,0 +1,67 @@
+import pandas as pd
+import pytest
+
+import tools.excel_loader as excel_loader
+from tools.analyse_excel_file_tool import analyse_excel_file
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(excel_loader, "EXCEL_CACHE_DIR", str(tmp_path / "excel_cache"))
+    monkeypatch.setattr(excel_loader, "_sheet_lists", {})
+
+
+@pytest.fixture
+def workbook(tmp_path):
+    path = tmp_path / "sales.xlsx"
+    with pd.ExcelWriter(path) as writer:
+        pd.DataFrame({"Location": ["Pinebrook", "Wharvton", "Sagrada"], "Burgers": [1594, 1983, 2019],
+                      "Soda": [1980, 1919, 1820]}).to_excel(writer, sheet_name="Sales", index=False)
+        pd.DataFrame({"Note": ["closed on Mondays"]}).to_excel(writer, sheet_name="Notes", index=False)
+    return str(path)
+
+
+def test_list_sheets_with_dimensions(workbook):
+    sheets = excel_loader.list_sheets(workbook)
+    assert [(sheet["name"], sheet["dimensions"]) for sheet in sheets] == [("Sales", "A1:C4"), ("Notes", "A1:A2")]
+
+
+def test_load_sheet_matches_pandas(workbook):
+    for sheet in ("Sales", "Notes"):
+        expected = pd.read_excel(workbook, sheet_name=sheet)
+        pd.testing.assert_frame_equal(excel_loader.load_sheet(workbook, sheet), expected)
+    pd.testing.assert_frame_equal(excel_loader.load_sheet(workbook), pd.read_excel(workbook))
+
+
+def test_column_range(workbook):
+    df = excel_loader.load_sheet(workbook, "Sales", usecols="B:C")
+    assert list(df.columns) == ["Burgers", "Soda"]
+    assert df["Burgers"].sum() == 5596
+
+
+def test_second_load_skips_parsing(workbook, monkeypatch):
+    first = excel_loader.load_sheet(workbook, "Sales")
+    monkeypatch.setattr(excel_loader, "_parse_sheet", lambda *args: pytest.fail("workbook parsed twice"))
+    pd.testing.assert_frame_equal(excel_loader.load_sheet(workbook, "Sales"), first)
+    pd.testing.assert_frame_equal(excel_loader.load_sheet(workbook), first)
+
+
+def test_analyse_excel_file(workbook):
+    result = analyse_excel_file(workbook, sheet_name="Sales", columns="B:C")
+    assert result.startswith("Sheets: Sales (A1:C4), Notes (A1:A2)\n")
+    assert "3 rows and 2 columns" in result
+    assert "Error" in analyse_excel_file(workbook, sheet_name="Missing")
+
+
+def test_sidecar_is_not_a_pickle(tmp_path):
+    """The shared cache holds only data formats (Parquet or JSON), and the dtypes survive the round trip."""
+    path = str(tmp_path / "dates.xlsx")
+    pd.DataFrame({"Day": pd.to_datetime(["2024-01-01", "2024-01-02"]), "Count": [3, 4],
+                  "Share": [0.5, None]}).to_excel(path, index=False)
+    first = excel_loader.load_sheet(path)
+    cached = excel_loader.load_sheet(path)
+    pd.testing.assert_frame_equal(cached, first)
+    sidecar = excel_loader._sidecar_path(path, "Sheet1", None)
+    assert sidecar.endswith((".parquet", ".json")) and not sidecar.endswith(".pkl")
+    with open(sidecar, "rb") as f:
+        assert not f.read(2).startswith(b"\x80")  # pickle protocol header
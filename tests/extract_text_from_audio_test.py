@@ -0,0 +1,82 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+import tools.extract_text_from_audio_tool as audio_tool
+from tools.extract_text_from_audio_tool import SAMPLE_RATE, split_on_silence
+
+
+class FakeWhisperModel:
+    """Returns one segment per call and counts the calls."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def transcribe(self, samples):
+        self.calls += 1
+        seconds = len(samples) / SAMPLE_RATE
+        return {"text": f"transcript {self.calls}",
+                "segments": [{"start": 0.0, "end": seconds, "text": f" part {self.calls} "}]}
+
+
+@pytest.fixture
+def fake_model(tmp_path, monkeypatch):
+    model = FakeWhisperModel()
+    monkeypatch.setattr(audio_tool, "TRANSCRIPT_CACHE_DIR", str(tmp_path / "transcripts"))
+    monkeypatch.setattr(audio_tool, "_transcripts", {})
+    monkeypatch.setitem(audio_tool._models, "fake", model)
+    monkeypatch.setitem(audio_tool._transcribe_locks, "fake", audio_tool.threading.Lock())
+    return model
+
+
+def _speech_with_pauses(seconds_per_part: list[float]) -> np.ndarray:
+    """Tone bursts of the given lengths, separated by one second of silence."""
+    parts = []
+    for seconds in seconds_per_part:
+        t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+        parts += [0.5 * np.sin(2 * np.pi * 220 * t), np.zeros(SAMPLE_RATE)]
+    return np.concatenate(parts).astype(np.float32)
+
+
+def test_split_on_silence_cuts_in_pauses():
+    audio = _speech_with_pauses([25, 25, 25, 25])
+    segments = split_on_silence(audio)
+    assert segments[0][0] == 0 and segments[-1][1] == len(audio)
+    assert all(end == next_start for (_, end), (next_start, _) in zip(segments, segments[1:]))
+    for start, end in segments:
+        assert (end - start) / SAMPLE_RATE <= audio_tool.MAX_SEGMENT_SECONDS
+    # every cut lies in a pause, not in a tone
+    for _, end in segments[:-1]:
+        assert np.abs(audio[end - 100:end + 100]).max() == 0
+
+
+def test_split_without_pauses_uses_the_maximum_length():
+    audio = _speech_with_pauses([150])[:150 * SAMPLE_RATE]
+    segments = split_on_silence(audio)
+    assert [end - start for start, end in segments[:-1]] == [int(audio_tool.MAX_SEGMENT_SECONDS * SAMPLE_RATE)] * 2
+    assert split_on_silence(np.zeros(10, dtype=np.float32)) == [(0, 10)]
+
+
+def test_transcript_is_cached_by_file_hash(tmp_path, fake_model, monkeypatch):
+    audio_file = tmp_path / "memo.mp3"
+    audio_file.write_bytes(b"fake mp3 data")
+    monkeypatch.setattr(audio_tool, "load_audio", lambda path: np.zeros(SAMPLE_RATE, dtype=np.float32))
+
+    assert audio_tool.transcribe_audio(str(audio_file), size="fake") == "transcript 1"
+    assert audio_tool.transcribe_audio(str(audio_file), size="fake") == "transcript 1"
+    # a new process only has the file cache
+    monkeypatch.setattr(audio_tool, "_transcripts", {})
+    assert audio_tool.transcribe_audio(str(audio_file), size="fake") == "transcript 1"
+    assert fake_model.calls == 1
+
+
+def test_long_audio_is_transcribed_in_segments(fake_model, monkeypatch):
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        monkeypatch.setattr(audio_tool, "_get_pool", lambda size, workers: pool)
+        text = audio_tool.transcribe_long_audio(_speech_with_pauses([40, 40, 40]), size="fake")
+    lines = text.splitlines()
+    assert len(lines) == fake_model.calls >= 2
+    assert lines[0].startswith("[00:00 - ")
+    # timestamps of later segments continue after the earlier ones
+    assert lines[-1] > lines[0] and not lines[-1].startswith("[00:00 ")
@@ -0,0 +1,149 @@
+import hashlib
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from tools import http_client
+from tools.file_cache import DownloadTooLarge, FileCache
+
+FILES = {
+    "/files/task.csv": b"a,b\n" + b"1,2\n" * 50000,
+    "/files/copy.csv": b"a,b\n" + b"1,2\n" * 50000,
+    "/files/other.bin": os.urandom(150000),
+}
+ETAG = '"v1"'
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    requests_seen = []
+
+    def do_GET(self):
+        body = FILES[self.path]
+        Handler.requests_seen.append((self.path, dict(self.headers)))
+        if self.headers.get("If-None-Match") == ETAG:
+            self.send_response(304)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        status, start = 200, 0
+        range_header = self.headers.get("Range")
+        if range_header and self.headers.get("If-Range") == ETAG:
+            status, start = 206, int(range_header.split("=")[1].rstrip("-"))
+            if start >= len(body):
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{len(body)}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+        self.send_response(status)
+        self.send_header("ETag", ETAG)
+        self.send_header("Content-Length", str(len(body) - start))
+        if status == 206:
+            self.send_header("Content-Range", f"bytes {start}-{len(body) - 1}/{len(body)}")
+        self.end_headers()
+        self.wfile.write(body[start:])
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_port}"
+    httpd.shutdown()
+
+
+@pytest.fixture
+def make_cache(tmp_path):
+    Handler.requests_seen = []
+    session = http_client.create_session(retries=0)
+
+    def make(**kwargs):
+        kwargs.setdefault("fresh_seconds", 0)
+        return FileCache(str(tmp_path / "cache"), session=session, **kwargs)
+    return make
+
+
+def test_download_is_content_addressed(server, make_cache):
+    """The file is stored under its SHA-256 with the original extension; equal content is stored once."""
+    cache = make_cache()
+    path = cache.fetch(f"{server}/files/task.csv")
+    digest = hashlib.sha256(FILES["/files/task.csv"]).hexdigest()
+    assert os.path.basename(path) == f"{digest}.csv"
+    with open(path, "rb") as f:
+        assert f.read() == FILES["/files/task.csv"]
+
+    assert cache.fetch(f"{server}/files/copy.csv") == path
+    assert cache.total_bytes() == len(FILES["/files/task.csv"])
+
+
+def test_cached_url_is_revalidated(server, make_cache):
+    """A cached URL is revalidated with its ETag and not downloaded again."""
+    cache = make_cache()
+    first = cache.fetch(f"{server}/files/task.csv")
+    second = cache.fetch(f"{server}/files/task.csv")
+    assert first == second
+    assert Handler.requests_seen[1][1].get("If-None-Match") == ETAG
+
+
+def test_fresh_url_is_not_requested(server, make_cache):
+    cache = make_cache(fresh_seconds=3600)
+    cache.fetch(f"{server}/files/task.csv")
+    cache.fetch(f"{server}/files/task.csv")
+    assert len(Handler.requests_seen) == 1
+
+
+def test_partial_download_is_resumed(server, make_cache):
+    """An interrupted download continues with a Range request."""
+    cache = make_cache()
+    url = f"{server}/files/other.bin"
+    with open(cache._partial_path(url), "wb") as f:
+        f.write(FILES["/files/other.bin"][:100000])
+    cache._execute("INSERT INTO partials VALUES (?, ?, ?)", (url, ETAG, None))
+
+    path = cache.fetch(url, filename="other.bin")
+    assert Handler.requests_seen[-1][1].get("Range") == "bytes=100000-"
+    with open(path, "rb") as f:
+        assert f.read() == FILES["/files/other.bin"]
+    assert os.path.basename(path) == hashlib.sha256(FILES["/files/other.bin"]).hexdigest() + ".bin"
+
+
+def test_complete_partial_is_downloaded_again(server, make_cache):
+    """A partial file that is already complete gets 416 on resume; it is dropped and the file fetched whole."""
+    cache = make_cache()
+    url = f"{server}/files/other.bin"
+    with open(cache._partial_path(url), "wb") as f:
+        f.write(FILES["/files/other.bin"])
+    cache._execute("INSERT INTO partials VALUES (?, ?, ?)", (url, ETAG, None))
+
+    path = cache.fetch(url, filename="other.bin")
+    assert [headers.get("Range") for _, headers in Handler.requests_seen] == [f"bytes={len(FILES['/files/other.bin'])}-", None]
+    with open(path, "rb") as f:
+        assert f.read() == FILES["/files/other.bin"]
+    assert cache.fetch(url, filename="other.bin") == path
+
+
+def test_size_limit(server, make_cache):
+    """Downloads above the limit are aborted and leave nothing behind."""
+    cache = make_cache(max_download_bytes=1000)
+    with pytest.raises(DownloadTooLarge):
+        cache.fetch(f"{server}/files/task.csv")
+    assert cache.total_bytes() == 0
+    assert os.listdir(cache.partial_dir) == []
+
+
+def test_lru_eviction(server, make_cache):
+    """The least recently used file is evicted when the cache is full."""
+    cache = make_cache(max_bytes=250000)
+    first = cache.fetch(f"{server}/files/task.csv")
+    second = cache.fetch(f"{server}/files/other.bin")
+    assert not os.path.exists(first)
+    assert os.path.exists(second)
+    assert cache.total_bytes() == len(FILES["/files/other.bin"])
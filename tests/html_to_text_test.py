@@ -0,0 +1,42 @@
+import os
+
+from tools.html_to_text import convert_page, html_to_text
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "wikipedia", "mercedes_sosa.html")
+
+
+def test_markup_and_noise_are_dropped():
+    """Styles, edit links, reference marks, reference lists and navboxes do not reach the text."""
+    with open(FIXTURE, "r", encoding="utf-8") as f:
+        page = convert_page(f.read())
+    text = page["text"]
+    assert "## Life" in text and "### Exile and return" in text
+    assert "mw-parser-output" not in text
+    assert "edit" not in text.split()
+    assert "[1]" not in text
+    assert "Christensen" not in text  # reference list
+    assert "Authority control" not in text  # navbox
+    assert "- 2006, Latin Grammy Award for Best Folk Album: Corazón Libre" in text
+
+
+def test_wikitables_become_csv_rows():
+    """Tables are returned separately as CSV and referenced in the text."""
+    with open(FIXTURE, "r", encoding="utf-8") as f:
+        page = convert_page(f.read())
+    assert "[Table 2]" in page["text"]
+    studio = page["tables"][1]["csv"].splitlines()
+    assert studio[0] == "Year,Album details"
+    assert "2005,Corazón Libre; Label: Edge" in studio
+    assert "Years active,1950–2009" in page["tables"][0]["csv"]
+
+
+def test_rowspan_colspan_and_caption():
+    """Spanning cells are repeated, so every row stays complete."""
+    text = html_to_text(
+        "<table class='wikitable'><caption>Results</caption>"
+        "<tr><th>Year</th><th>Title</th><th>Rank</th></tr>"
+        "<tr><td rowspan='2'>2001</td><td>A</td><td>1</td></tr>"
+        "<tr><td colspan='2'>B, tied</td></tr>"
+        "</table>"
+    )
+    assert text.splitlines() == ["[Table: Results]", "Year,Title,Rank", "2001,A,1", '2001,"B, tied","B, tied"']
@@ -0,0 +1,74 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from tools import http_client
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    failures_left = 0
+
+    def do_GET(self):
+        if self.path == "/flaky" and Handler.failures_left > 0:
+            Handler.failures_left -= 1
+            status, body = 503, b"busy"
+        elif self.path == "/slow":
+            threading.Event().wait(0.5)
+            status, body = 200, b"slow"
+        else:
+            status, body = 200, b"ok"
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_port}"
+    httpd.shutdown()
+
+
+@pytest.fixture
+def session():
+    http_client.reset_metrics()
+    return http_client.create_session(retries=2, backoff_factor=0)
+
+
+def test_connections_are_reused(server, session):
+    """Sequential requests to the same host share one keep-alive connection."""
+    for _ in range(5):
+        assert session.get(f"{server}/ok").text == "ok"
+
+    host = server.split("://")[1]
+    metrics = http_client.http_metrics(session)[host]
+    assert metrics["requests"] == 5
+    assert metrics["connections"] == 1
+    assert metrics["reuse_rate"] == pytest.approx(0.8)
+
+def test_retry_on_503(server, session):
+    """A 503 response is retried and the final 200 is returned."""
+    Handler.failures_left = 2
+    response = session.get(f"{server}/flaky")
+    assert response.status_code == 200
+    assert Handler.failures_left == 0
+
+def test_default_timeout(server):
+    """Calls without an explicit timeout use the session default."""
+    session = http_client.create_session(retries=0, timeout=(1, 0.1))
+    with pytest.raises(requests.exceptions.ConnectionError):
+        session.get(f"{server}/slow")
+
+def test_format_metrics(server, session):
+    session.get(f"{server}/ok")
+    table = http_client.format_http_metrics(session)
+    assert server.split("://")[1] in table
@@ -0,0 +1,80 @@
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+from langchain_core.tools import StructuredTool
+
+from llm_cache import CachedChatModel, LlmCache, LlmReplayMiss, prompt_key
+
+
+class _FakeModel:
+    """Answers every prompt with a tool call and counts the calls."""
+    model_name = "fake-model"
+    temperature = 0.1
+
+    def __init__(self):
+        self.calls = 0
+
+    def invoke(self, messages, **kwargs):
+        self.calls += 1
+        return AIMessage(content=f"answer {self.calls}", id=f"run-{self.calls}",
+                         tool_calls=[{"name": "web_search", "args": {"query": "Mercedes Sosa"}, "id": f"call_{self.calls}"}])
+
+
+def _search(query: str) -> str:
+    return query
+
+
+_TOOLS = [StructuredTool.from_function(_search, name="web_search", description="Search the web.")]
+_PARAMS = {"model_name": "fake-model", "temperature": 0.1}
+
+
+def _prompt(question="How many albums?"):
+    return [SystemMessage(content="You are a helpful agent."), HumanMessage(content=question)]
+
+
+def test_key_ignores_message_and_tool_call_ids():
+    first = _prompt() + [AIMessage(content="", id="a", tool_calls=[{"name": "web_search", "args": {"query": "x"}, "id": "call_1"}]),
+                         ToolMessage(content="result", tool_call_id="call_1", id="b")]
+    second = _prompt() + [AIMessage(content="", id="c", tool_calls=[{"name": "web_search", "args": {"query": "x"}, "id": "call_9"}]),
+                          ToolMessage(content="result", tool_call_id="call_9", id="d")]
+    assert prompt_key(first, [], _PARAMS) == prompt_key(second, [], _PARAMS)
+    assert prompt_key(first, [], _PARAMS) != prompt_key(first, [], {**_PARAMS, "temperature": 0.7})
+    assert prompt_key(_prompt(), [], _PARAMS) != prompt_key(_prompt("How many songs?"), [], _PARAMS)
+
+
+def test_read_through_calls_the_model_once(tmp_path):
+    model = _FakeModel()
+    cached = CachedChatModel(model, _TOOLS, _PARAMS, LlmCache(str(tmp_path / "llm.sqlite"), "read_through"))
+    first = cached.invoke(_prompt())
+    second = cached.invoke(_prompt())
+    assert model.calls == 1
+    assert second.content == first.content and second.tool_calls == first.tool_calls
+    assert cached.cache.stats()["hits"] == 1 and cached.cache.stats()["recorded"] == 1
+
+
+def test_record_then_strict_replay(tmp_path):
+    path = str(tmp_path / "llm.sqlite")
+    model = _FakeModel()
+    recorder = CachedChatModel(model, _TOOLS, _PARAMS, LlmCache(path, "record"))
+    recorder.invoke(_prompt())
+    recorder.invoke(_prompt())
+    assert model.calls == 2  # record mode always calls the model, the last response wins
+
+    offline = _FakeModel()
+    replay = CachedChatModel(offline, _TOOLS, _PARAMS, LlmCache(path, "replay"))
+    assert replay.invoke(_prompt()).content == "answer 2"
+    with pytest.raises(LlmReplayMiss):
+        replay.invoke(_prompt("A question that was never recorded"))
+    assert offline.calls == 0
+
+
+def test_changed_tool_schemas_miss(tmp_path):
+    path = str(tmp_path / "llm.sqlite")
+    CachedChatModel(_FakeModel(), _TOOLS, _PARAMS, LlmCache(path, "record")).invoke(_prompt())
+    other_tools = [StructuredTool.from_function(_search, name="search_arxiv", description="Search arXiv.")]
+    with pytest.raises(LlmReplayMiss):
+        CachedChatModel(_FakeModel(), other_tools, _PARAMS, LlmCache(path, "replay")).invoke(_prompt())
+
+
+def test_unknown_mode_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        LlmCache(str(tmp_path / "llm.sqlite"), "sometimes")
@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+from PIL import Image, ImageDraw
+
+import tools.ocr_pipeline as ocr
+from tools.extract_text_from_image_tool import extract_text_from_image
+
+
+class FakeEngine:
+    """Stands in for Tesseract: reports the size of the preprocessed image."""
+    name = "fake"
+
+    def __init__(self):
+        self.calls = 0
+
+    def recognize(self, image):
+        self.calls += 1
+        return f"text {image.width}x{image.height} {image.mode}"
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    fake = FakeEngine()
+    monkeypatch.setattr(ocr, "get_engine", lambda lang=None, psm=None: fake)
+    monkeypatch.setattr(ocr, "_cache", ocr.OcrCache(str(tmp_path / "ocr_cache")))
+    return fake
+
+
+def _page(angle: float = 0.0, size=(1200, 900)) -> Image.Image:
+    """White page with dark text-like lines, rotated by `angle` degrees."""
+    image = Image.new("L", size, 235)
+    draw = ImageDraw.Draw(image)
+    for y in range(100, size[1] - 100, 40):
+        draw.rectangle([100, y, size[0] - 100, y + 12], fill=20)
+    return image.rotate(angle, fillcolor=235, resample=Image.BILINEAR)
+
+
+def test_otsu_threshold_separates_two_levels():
+    pixels = np.array([30] * 500 + [220] * 500, dtype=np.uint8)
+    assert 30 < ocr.otsu_threshold(pixels) <= 220
+
+
+@pytest.mark.parametrize("angle", [-4.0, 0.0, 2.5])
+def test_estimate_skew(angle):
+    binary = Image.fromarray(np.where(np.asarray(_page(angle)) < 128, 255, 0).astype(np.uint8))
+    assert abs(ocr.estimate_skew(binary) + angle) <= 0.3
+
+
+def test_preprocess_binarises_and_scales():
+    image = _page(size=(6000, 4000)).convert("RGB")
+    result = ocr.preprocess(image)
+    assert result.mode == "L"
+    assert max(result.size) == ocr.OCR_MAX_SIDE
+    assert set(np.unique(np.asarray(result))) <= {0, 255}
+    # text stays dark on white
+    assert np.asarray(result).mean() > 128
+
+
+def test_results_are_cached(engine, tmp_path):
+    path = tmp_path / "page.png"
+    _page().save(path)
+    first = ocr.ocr_images([str(path)])
+    second = ocr.ocr_images([str(path)])
+    assert engine.calls == 1
+    assert first[0]["text"] == second[0]["text"] and second[0]["cached"]
+    ocr.ocr_images([str(path)], lang="deu")
+    assert engine.calls == 2
+
+
+def test_batch_with_multi_page_tiff(engine, tmp_path):
+    tiff = tmp_path / "scan.tiff"
+    _page().save(tiff, save_all=True, append_images=[_page(), _page()])
+    png = tmp_path / "note.png"
+    _page(size=(800, 600)).save(png)
+    result = extract_text_from_image([str(tiff), str(png)])
+    assert result.count("## ") == 4
+    assert f"## {tiff} (page 3)\n" in result
+    assert f"## {png}\ntext" in result
+    assert result.endswith("[END OF TEXT]")
+
+
+def test_missing_file(engine):
+    assert extract_text_from_image("/no/such/image.png") == "Error: The file /no/such/image.png was not found."
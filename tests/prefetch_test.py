@@ -0,0 +1,70 @@
+import time
+
+import pytest
+
+from prefetch import prefetch_task_files, start_prefetch, task_file_url
+from question_runner import run_questions
+from scoring_api_stub import ScoringApiStub
+from tools import http_client
+from tools.file_cache import FileCache
+
+TASKS = [
+    {"task_id": f"task-{i}", "question": f"Question {i}?", "file_name": f"data_{i}.csv", "answer": str(i),
+     "file": f"value\n{i}\n".encode()}
+    for i in range(6)
+] + [{"task_id": "task-nofile", "question": "No file?", "file_name": "", "answer": "x"}]
+
+
+@pytest.fixture
+def stub():
+    stub = ScoringApiStub(TASKS, file_delay=0.3).start()
+    yield stub
+    stub.stop()
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return FileCache(str(tmp_path / "cache"), session=http_client.create_session(retries=0))
+
+
+def test_files_are_downloaded_concurrently(stub, cache):
+    """All attachments are fetched at once instead of one after the other."""
+    questions = http_client.get(f"{stub.url}/questions").json()
+    start = time.perf_counter()
+    paths = prefetch_task_files(questions, stub.url, cache=cache, max_workers=6)
+    elapsed = time.perf_counter() - start
+
+    assert sorted(paths) == [f"task-{i}" for i in range(6)]
+    for i in range(6):
+        with open(paths[f"task-{i}"], "rb") as f:
+            assert f.read() == f"value\n{i}\n".encode()
+        assert paths[f"task-{i}"].endswith(".csv")
+    assert elapsed < 6 * 0.3 / 2
+    assert stub.count("/files/") == 6
+
+
+def test_agent_finds_prefetched_files(stub, cache):
+    """The agent's own download of a task file is served from the cache."""
+    questions = http_client.get(f"{stub.url}/questions").json()
+    prefetch = start_prefetch(questions, stub.url, cache=cache)
+
+    def agent(question, task_id=None, file_name=None):
+        if not file_name:
+            return "x"
+        with open(cache.fetch(task_file_url(stub.url, task_id), filename=file_name)) as f:
+            return f.read().split()[-1]
+
+    answers, _ = run_questions(agent, questions, max_workers=4)
+    prefetch.result()
+
+    assert [a["submitted_answer"] for a in answers] == [str(i) for i in range(6)] + ["x"]
+    assert stub.count("/files/") == 6
+    result = http_client.post(f"{stub.url}/submit", json={"username": "me", "answers": answers}).json()
+    assert result["correct_count"] == 7
+
+
+def test_failed_download_does_not_stop_the_others(stub, cache):
+    questions = [{"task_id": "missing", "file_name": "gone.pdf"}, {"task_id": "task-1", "file_name": "data_1.csv"}]
+    paths = prefetch_task_files(questions, stub.url, cache=cache)
+    assert paths["missing"].startswith("Error")
+    assert paths["task-1"].endswith(".csv")
@@ -0,0 +1,85 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from tools.python_sandbox import SandboxPool, format_outcome
+
+
+@pytest.fixture(scope="module")
+def pool():
+    pool = SandboxPool(size=2, max_runs=3, cpu_seconds=2, wall_seconds=5, memory_mb=1024)
+    yield pool
+    pool.close()
+
+
+def test_stdout_stderr_and_result_are_separate(pool):
+    outcome = pool.run("import sys\nprint('out')\nprint('err', file=sys.stderr)\n6 * 7")
+    assert outcome == {"stdout": "out\n", "stderr": "err\n", "result": "42", "error": None}
+
+
+def test_preloaded_modules_and_fresh_globals(pool):
+    """pandas is ready to use; variables do not leak from one run into the next."""
+    outcome = pool.run("import pandas as pd\nsecret = 1\npd.DataFrame({'a': [1, 2]})['a'].sum()")
+    assert outcome["result"] == "3" or outcome["result"].endswith("(3)")
+    assert "NameError" in pool.run("secret")["error"]
+
+
+def test_error_reports_line(pool):
+    outcome = pool.run("x = 1\n1 / 0")
+    assert outcome["error"] == "ZeroDivisionError: division by zero (line 2)"
+
+
+def test_cpu_limit(pool):
+    start = time.perf_counter()
+    outcome = pool.run("while True:\n    pass", cpu_seconds=1)
+    assert outcome["error"].startswith("TimeoutError")
+    assert time.perf_counter() - start < 5
+
+
+def test_wall_clock_limit_kills_worker(pool):
+    """Code that sleeps does not use CPU time, the wall-clock limit still stops it."""
+    outcome = pool.run("import time\ntime.sleep(60)", wall_seconds=1)
+    assert outcome["error"].startswith("TimeoutError")
+    assert pool.run("1 + 1")["result"] == "2"
+
+
+def test_memory_limit(pool):
+    outcome = pool.run("x = bytearray(4 * 1024 ** 3)")
+    assert outcome["error"].startswith("MemoryError")
+    assert pool.run("'still' + ' working'")["result"] == "'still working'"
+
+
+def test_concurrent_runs(pool):
+    """Runs from several threads keep their output apart."""
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        outcomes = list(executor.map(lambda i: pool.run(f"print({i})"), range(10)))
+    assert [outcome["stdout"] for outcome in outcomes] == [f"{i}\n" for i in range(10)]
+
+
+def test_format_outcome():
+    assert format_outcome({"stdout": "a\n", "stderr": "", "result": "1", "error": None}) == "a\nResult: 1"
+    assert "Error executing code: ValueError: x" in format_outcome({"stdout": "", "stderr": "", "result": None, "error": "ValueError: x"})
+
+
+def test_session_keeps_namespace(pool):
+    """Runs of one session share their variables; other sessions and stateless runs do not see them."""
+    pool.run("import pandas as pd\ndf = pd.DataFrame({'a': range(10)})", session_id="q1")
+    assert pool.run("int(df['a'].sum())", session_id="q1")["result"] == "45"
+    assert "NameError" in pool.run("df", session_id="q2")["error"]
+    assert "NameError" in pool.run("df")["error"]
+    assert pool.session_count() == 2
+
+    pool.close_session("q1")
+    pool.close_session("q2")
+    assert pool.session_count() == 0
+    assert "NameError" in pool.run("df", session_id="q1")["error"]
+    pool.close_session("q1")
+
+
+def test_session_reset_after_timeout(pool):
+    pool.run("x = 1", session_id="slow")
+    outcome = pool.run("import time\ntime.sleep(60)", session_id="slow", wall_seconds=1)
+    assert "session was reset" in outcome["error"]
+    assert "NameError" in pool.run("x", session_id="slow")["error"]
+    pool.close_session("slow")
@@ -0,0 +1,58 @@
+import threading
+import time
+
+from question_runner import run_questions
+
+
+def make_questions(n):
+    return [{"task_id": f"task_{i}", "question": f"question {i}", "file_name": ""} for i in range(n)]
+
+
+def test_run_questions_keeps_order():
+    """Answers come back in question order even if later questions finish first."""
+    def agent(question, task_id=None, file_name=None):
+        # earlier tasks take longer
+        time.sleep(0.05 * (5 - int(task_id.split("_")[1])))
+        return f"answer to {question}"
+
+    answers, log = run_questions(agent, make_questions(5), max_workers=5)
+    assert [a["task_id"] for a in answers] == [f"task_{i}" for i in range(5)]
+    assert [row["Task ID"] for row in log] == [f"task_{i}" for i in range(5)]
+    assert answers[2]["submitted_answer"] == "answer to question 2"
+
+def test_run_questions_respects_concurrency_limit():
+    """Never more than max_workers questions run at the same time."""
+    lock = threading.Lock()
+    running = 0
+    peak = 0
+
+    def agent(question, task_id=None, file_name=None):
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.02)
+        with lock:
+            running -= 1
+        return "ok"
+
+    run_questions(agent, make_questions(10), max_workers=3)
+    assert peak <= 3
+
+def test_run_questions_isolates_errors():
+    """A failing task is logged as an error and does not stop the other tasks."""
+    def agent(question, task_id=None, file_name=None):
+        if task_id == "task_1":
+            raise RuntimeError("boom")
+        return "ok"
+
+    answers, log = run_questions(agent, make_questions(3), max_workers=2)
+    assert [a["task_id"] for a in answers] == ["task_0", "task_2"]
+    assert log[1]["Submitted Answer"] == "AGENT ERROR: boom"
+
+def test_run_questions_skips_invalid_items():
+    """Items without task_id or question are skipped."""
+    questions = make_questions(2) + [{"task_id": None, "question": "x"}]
+    answers, log = run_questions(lambda q, **kw: "ok", questions, max_workers=1)
+    assert len(answers) == 2
+    assert len(log) == 2
@@ -0,0 +1,75 @@
+import importlib
+import inspect
+import subprocess
+import sys
+
+import pytest
+from langchain_core.tools import BaseTool
+
+from tools.registry import TOOL_SPECS, LazyFunction, load_tools
+
+
+def test_load_tools_does_not_import_tool_modules():
+    """Building the tools only needs the registry, not the tool modules."""
+    code = (
+        "import sys\n"
+        "from tools.registry import load_tools\n"
+        "tools = load_tools()\n"
+        "print(sorted(m for m in sys.modules if m.startswith('tools.') and m != 'tools.registry'))\n"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "[]"
+
+def test_tool_names_are_unique():
+    names = [spec.name for spec in TOOL_SPECS]
+    assert len(names) == len(set(names))
+
+def test_lazy_tool_imports_on_first_call():
+    """The implementation is imported on the first invocation."""
+    tools = {tool.name: tool for tool in load_tools()}
+    assert "Aktuelle Zeit in UTC:" in tools["current_time"].invoke("UTC")
+    assert tools["calculate"].invoke({"expressions": ["2 + 3"]}) == "2 + 3 = 5"
+    assert tools["current_time"].func.loaded
+
+def test_lazy_function_resolves_once():
+    func = LazyFunction("tools.math_tools", "multiply")
+    assert not func.loaded
+    assert func(3, 4) == 12
+    assert func.load() is func.load()
+
+@pytest.mark.parametrize("spec", TOOL_SPECS, ids=lambda spec: spec.name)
+def test_spec_matches_implementation(spec):
+    """Every spec points to an existing function with the declared arguments and the module's Tool description."""
+    try:
+        module = importlib.import_module(spec.module)
+    except ImportError as e:
+        pytest.skip(f"dependency of {spec.module} not installed: {e}")
+    func = getattr(module, spec.function)
+    assert callable(func)
+
+    parameters = {name: param for name, param in inspect.signature(func).parameters.items() if name != "config"}
+    assert ("config" in inspect.signature(func).parameters) == spec.needs_config
+    if spec.args is None:
+        # single text input: the first parameter gets it, all others need defaults
+        assert parameters
+        assert all(param.default is not inspect.Parameter.empty for param in list(parameters.values())[1:])
+    else:
+        assert set(spec.args) == set(parameters)
+        for name, (_, default, _) in spec.args.items():
+            assert (default is ...) == (parameters[name].default is inspect.Parameter.empty), name
+
+    for tool in vars(module).values():
+        if isinstance(tool, BaseTool) and tool.name == spec.name:
+            assert tool.description == spec.description
+
+def test_config_is_passed_to_session_tools():
+    """Code tools get the session ID of the run from the RunnableConfig."""
+    from tools.python_sandbox import close_session
+
+    tool = {tool.name: tool for tool in load_tools()}["execute_python_code"]
+    config = {"configurable": {"session_id": "registry-test"}}
+    try:
+        tool.invoke("answer = 41", config=config)
+        assert tool.invoke("answer + 1", config=config) == "Result: 42"
+    finally:
+        close_session("registry-test")
@@ -0,0 +1,139 @@
+import numpy as np
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.tools import tool
+from langgraph.graph import END, START, MessagesState, StateGraph
+from langgraph.prebuilt import ToolNode
+
+from tools import result_store
+from tools.result_store import ResultStore, chunk_text, make_spilling_tool_node, read_result, spill_message
+
+
+def _report() -> str:
+    lines = [f"Row {n}: station {n} measured {n * 3} millimetres of rain." for n in range(600)]
+    lines[412] = "Row 412: the museum of volcanology opened in 1987."
+    return "\n".join(lines)
+
+
+def _config(session_id: str) -> dict:
+    return {"configurable": {"session_id": session_id}}
+
+
+def test_chunk_text_respects_the_limit():
+    text = _report() + "\n" + "z" * 4000
+    chunks = chunk_text(text, max_chars=500)
+    assert all(len(chunk) <= 500 for chunk in chunks)
+    assert "".join(chunks) == text
+
+
+def test_small_results_are_not_spilled():
+    store = ResultStore(threshold=1000)
+    message = ToolMessage(content="short", tool_call_id="tc-1", name="wiki", id="m-1")
+    assert spill_message(message, "run", store) is message
+    assert store.run_count() == 0
+
+
+def test_spilled_result_keeps_id_and_gets_a_handle():
+    store = ResultStore(threshold=1000)
+    message = ToolMessage(content=_report(), tool_call_id="tc-1", name="wiki", id="m-1")
+    spilled = spill_message(message, "run", store)
+    assert spilled.id == "m-1" and spilled.tool_call_id == "tc-1" and spilled.name == "wiki"
+    assert spilled.content.startswith("Row 0:") and "result-1" in spilled.content
+    assert len(spilled.content) < 2000
+    assert store.get("run", "result-1").text == message.content
+
+
+def test_read_result_by_query_and_by_chunks(monkeypatch):
+    store = ResultStore(threshold=1000)
+    monkeypatch.setattr(result_store, "_store", store)
+    spill_message(ToolMessage(content=_report(), tool_call_id="tc-1", name="wiki"), "q-1", store)
+
+    found = read_result("result-1", query="volcanology museum", config=_config("q-1"))
+    assert "opened in 1987" in found.split("### Chunk")[1]
+
+    first = read_result("result-1", chunks="1-2", config=_config("q-1"))
+    assert first.startswith("### Chunk 1/") and "### Chunk 2/" in first and "Row 0:" in first
+    assert read_result("result-1", chunks="999", config=_config("q-1")).startswith("Error")
+    # results are per run
+    assert read_result("result-1", query="volcanology", config=_config("q-2")).startswith("Error")
+    result_store.close_run("q-1")
+    assert store.run_count() == 0
+
+
+class _KeywordEmbeddings:
+    """Embeds a text as counts of a few keywords, enough to rank chunks by meaning."""
+    words = ["rain", "museum", "volcano"]
+
+    def embed_documents(self, texts):
+        return [self.embed_query(text) for text in texts]
+
+    def embed_query(self, text):
+        return [text.lower().count(word) + 0.01 for word in self.words]
+
+
+def test_search_fuses_embedding_ranks():
+    stored = result_store.StoredResult("result-1", "wiki", _report(), embeddings=_KeywordEmbeddings())
+    # no word of the query occurs in the text, only the embeddings find the chunk
+    best = stored.search("volcano exhibition", top_k=1)[0]
+    assert "volcanology" in stored.chunks[best]
+    assert isinstance(stored._vectors, np.ndarray)
+
+
+@tool
+def fetch_report(station: str) -> str:
+    """Return the full rain report."""
+    return _report()
+
+
+def test_spilling_tool_node_in_a_graph():
+    store = ResultStore(threshold=1000)
+    node = make_spilling_tool_node(ToolNode([fetch_report]), store=store)
+
+    def assistant(state):
+        return {"messages": [AIMessage(content="", id="call",
+                                       tool_calls=[{"name": "fetch_report", "args": {"station": "x"}, "id": "tc"}])]}
+
+    builder = StateGraph(MessagesState)
+    builder.add_node("assistant", assistant)
+    builder.add_node("tools", node)
+    builder.add_edge(START, "assistant")
+    builder.add_edge("assistant", "tools")
+    builder.add_edge("tools", END)
+    state = builder.compile().invoke({"messages": [HumanMessage(content="rain?")]}, config=_config("graph-run"))
+
+    result = state["messages"][-1]
+    assert isinstance(result, ToolMessage) and result.tool_call_id == "tc"
+    assert "read_result" in result.content and len(result.content) < 2000
+    assert store.get("graph-run", "result-1").text == _report()
+
+
+def test_read_result_uses_the_store_of_the_spilling_node():
+    """read_result finds results in the store passed to make_spilling_tool_node, not only in the default store."""
+    from langgraph.prebuilt import tools_condition
+
+    from tools.registry import load_tools
+
+    store = ResultStore(threshold=1000)
+    read_tool = {tool.name: tool for tool in load_tools()}["read_result"]
+    node = make_spilling_tool_node(ToolNode([fetch_report, read_tool]), store=store)
+
+    def assistant(state):
+        last = state["messages"][-1]
+        if isinstance(last, HumanMessage):
+            call = {"name": "fetch_report", "args": {"station": "x"}, "id": "tc-1"}
+        elif last.name == "fetch_report":
+            call = {"name": "read_result", "args": {"handle": "result-1", "query": "volcanology"}, "id": "tc-2"}
+        else:
+            return {"messages": [AIMessage(content="done")]}
+        return {"messages": [AIMessage(content="", tool_calls=[call])]}
+
+    builder = StateGraph(MessagesState)
+    builder.add_node("assistant", assistant)
+    builder.add_node("tools", node)
+    builder.add_edge(START, "assistant")
+    builder.add_conditional_edges("assistant", tools_condition)
+    builder.add_edge("tools", "assistant")
+    state = builder.compile().invoke({"messages": [HumanMessage(content="rain?")]}, config=_config("own-store"))
+
+    read = [m for m in state["messages"] if isinstance(m, ToolMessage) and m.name == "read_result"][0]
+    assert "opened in 1987" in read.content
+    assert result_store.get_result_store().get("own-store", "result-1") is None
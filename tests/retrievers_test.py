@@ -0,0 +1,60 @@
+import hashlib
+import sqlite3
+
+import pytest
+
+pytest.importorskip("sqlite_vec")
+if not hasattr(sqlite3.Connection, "enable_load_extension"):
+    pytest.skip("sqlite3 was built without extension loading", allow_module_level=True)
+
+from retrievers import SqliteVecRetriever, create_retriever_backend
+
+
+class FakeEmbeddings:
+    """Deterministic bag-of-letters embeddings, counts the embedded texts."""
+
+    def __init__(self):
+        self.embedded = 0
+
+    def _embed(self, text):
+        vector = [0.0] * 26
+        for char in text.lower():
+            if "a" <= char <= "z":
+                vector[ord(char) - ord("a")] += 1.0
+        return vector
+
+    def embed_documents(self, texts):
+        self.embedded += len(texts)
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text):
+        return self._embed(text)
+
+
+def test_similarity_search_returns_closest_document(tmp_path):
+    """The most similar stored document is returned first, with its metadata."""
+    retriever = SqliteVecRetriever(FakeEmbeddings(), db_path=str(tmp_path / "vec.sqlite"))
+    retriever.add_texts(["aaaa bbbb", "zzzz yyyy", "cccc dddd"], [{"id": 1}, {"id": 2}, {"id": 3}])
+
+    results = retriever.similarity_search("zzz yy", k=2)
+    assert results[0].page_content == "zzzz yyyy"
+    assert results[0].metadata == {"id": 2}
+    assert len(results) == 2
+
+def test_add_texts_deduplicates_by_content_hash(tmp_path):
+    """Documents already in the database are neither embedded nor inserted again."""
+    embeddings = FakeEmbeddings()
+    retriever = SqliteVecRetriever(embeddings, db_path=str(tmp_path / "vec.sqlite"))
+
+    assert retriever.add_texts(["one", "two", "one"], batch_size=2) == 2
+    assert retriever.add_texts(["two", "three"]) == 1
+    assert retriever.count() == 3
+    assert embeddings.embedded == 3
+
+def test_empty_database_returns_no_documents(tmp_path):
+    retriever = create_retriever_backend("sqlite_vec", FakeEmbeddings(), db_path=str(tmp_path / "vec.sqlite"))
+    assert retriever.similarity_search("anything") == []
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        create_retriever_backend("faiss", FakeEmbeddings())
@@ -0,0 +1,136 @@
+"""
+scoring_api_stub.py
+Local stand-in for the scoring API (/questions, /files/{task_id}, /submit), for
+offline tests and for running the app without the course server:
+
+    python tests/scoring_api_stub.py --port 8765
+    SCORING_API_URL=http://127.0.0.1:8765 python app.py
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SAMPLE_TASKS = [
+    {"task_id": "stub-1", "question": "What is the sum of column b in the attached file?", "file_name": "numbers.csv",
+     "answer": "6", "file": b"a,b\nx,1\ny,2\nz,3\n"},
+    {"task_id": "stub-2", "question": "What is the first word of the attached text?", "file_name": "notes.txt",
+     "answer": "Hello", "file": b"Hello from the stub.\n"},
+    {"task_id": "stub-3", "question": "What is the capital of France?", "file_name": "", "answer": "Paris"},
+]
+
+
+class ScoringApiStub:
+    """Scoring API on a local port, serving a fixed task list."""
+
+    def __init__(self, tasks: list[dict] = None, file_delay: float = 0.0, host: str = "127.0.0.1", port: int = 0):
+        """
+        Args:
+            tasks (list[dict]): Tasks with task_id, question, file_name, answer and optional file bytes.
+            file_delay (float): Seconds every file download takes, to simulate a slow server.
+            host (str): Interface to bind.
+            port (int): Port to bind, 0 for a free one.
+        """
+        self.tasks = tasks if tasks is not None else SAMPLE_TASKS
+        self.file_delay = file_delay
+        self.requests = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "ScoringApiStub":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def count(self, path_prefix: str) -> int:
+        """Number of requests whose path starts with `path_prefix`."""
+        with self._lock:
+            return sum(path.startswith(path_prefix) for path in self.requests)
+
+    def questions(self) -> list[dict]:
+        return [{key: task[key] for key in ("task_id", "question", "file_name")} for task in self.tasks]
+
+    def score(self, submission: dict) -> dict:
+        expected = {task["task_id"]: task["answer"] for task in self.tasks}
+        answers = submission.get("answers", [])
+        correct = sum(str(a.get("submitted_answer", "")).strip() == expected.get(a.get("task_id")) for a in answers)
+        return {
+            "username": submission.get("username"),
+            "score": round(100 * correct / len(self.tasks), 1) if self.tasks else 0,
+            "correct_count": correct,
+            "total_attempted": len(answers),
+            "message": "Scored by the local stub.",
+        }
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _send(self, status: int, body: bytes, content_type: str = "application/json", headers: dict = None):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                with stub._lock:
+                    stub.requests.append(self.path)
+                if self.path == "/questions":
+                    self._send(200, json.dumps(stub.questions()).encode())
+                elif self.path.startswith("/files/"):
+                    task_id = self.path[len("/files/"):]
+                    task = next((t for t in stub.tasks if t["task_id"] == task_id and t.get("file")), None)
+                    if task is None:
+                        self._send(404, json.dumps({"detail": "No file for this task."}).encode())
+                        return
+                    time.sleep(stub.file_delay)
+                    self._send(200, task["file"], "application/octet-stream",
+                               {"Content-Disposition": f'attachment; filename="{task["file_name"]}"',
+                                "ETag": f'"{task_id}"'})
+                else:
+                    self._send(404, b'{"detail": "Not found"}')
+
+            def do_POST(self):
+                with stub._lock:
+                    stub.requests.append(self.path)
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                if self.path == "/submit":
+                    self._send(200, json.dumps(stub.score(json.loads(body))).encode())
+                else:
+                    self._send(404, b'{"detail": "Not found"}')
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local stand-in for the scoring API.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--file-delay", type=float, default=0.0, help="Seconds every file download takes.")
+    args = parser.parse_args()
+
+    stub = ScoringApiStub(file_delay=args.file_delay, port=args.port).start()
+    print(f"Scoring API stub running on {stub.url} (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        stub.stop()
@@ -0,0 +1,97 @@
+import time
+
+import pandas as pd
+import pytest
+
+import tools.sql_query_tool as sql_tool
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(sql_tool, "SQL_CACHE_DIR", str(tmp_path / "sql_cache"))
+    monkeypatch.setattr(sql_tool, "_databases", {})
+
+
+@pytest.fixture
+def sales_csv(tmp_path):
+    df = pd.DataFrame({
+        "Item Type": ["Food", "Drink", "Food", "Food"] * 500,
+        "Month": ["January", "January", "February", "January"] * 500,
+        "Sales (USD)": [10.5, 3.0, 7.25, 1.0] * 500,
+    })
+    path = tmp_path / "sales.csv"
+    df.to_csv(path, index=False)
+    return str(path)
+
+
+def test_schema_lists_sanitized_columns(sales_csv):
+    schema = sql_tool.describe_table_file(sales_csv)
+    assert "Table data (2000 rows)" in schema
+    assert "sales_usd REAL  -- 'Sales (USD)'" in schema
+    assert "item_type TEXT" in schema
+
+
+def test_aggregation_in_sql(sales_csv):
+    result = sql_tool.sql_query_file(
+        sales_csv, "SELECT SUM(sales_usd) AS total FROM data WHERE item_type = 'Food' AND month = 'January';")
+    assert result == "total\n5750.0"
+
+
+def test_loaded_once_and_fast(sales_csv, monkeypatch):
+    """The file is loaded on the first query; later queries only hit the database."""
+    sql_tool.sql_query_file(sales_csv, "SELECT COUNT(*) FROM data")
+    monkeypatch.setattr(sql_tool, "_build_database", lambda *args: pytest.fail("file loaded twice"))
+    start = time.perf_counter()
+    assert sql_tool.sql_query_file(sales_csv, "SELECT COUNT(*) AS n FROM data") == "n\n2000"
+    assert time.perf_counter() - start < 0.05
+
+
+def test_row_limit(sales_csv):
+    result = sql_tool.sql_query_file(sales_csv, "SELECT * FROM data", max_rows=5)
+    lines = result.splitlines()
+    assert len(lines) == 7 and "only the first 5 rows" in lines[-1]
+
+
+@pytest.mark.parametrize("query", [
+    "DELETE FROM data",
+    "DROP TABLE data",
+    "ATTACH DATABASE '/tmp/x.sqlite' AS x",
+    "PRAGMA writable_schema = 1",
+])
+def test_only_select_is_allowed(sales_csv, query):
+    assert sql_tool.sql_query_file(sales_csv, query).startswith("Error executing SQL query")
+    assert sql_tool.sql_query_file(sales_csv, "SELECT COUNT(*) AS n FROM data") == "n\n2000"
+
+
+def test_excel_sheets_become_tables(tmp_path):
+    path = tmp_path / "menu.xlsx"
+    with pd.ExcelWriter(path) as writer:
+        pd.DataFrame({"Dish": ["Soup", "Cake"], "Price": [4.5, 3.0]}).to_excel(writer, sheet_name="Food", index=False)
+        pd.DataFrame({"Drink": ["Tea"], "Price": [2.0]}).to_excel(writer, sheet_name="Drinks 2024", index=False)
+    schema = sql_tool.describe_table_file(str(path))
+    assert "Table food (2 rows, sheet 'Food')" in schema
+    assert "Table drinks_2024" in schema
+    assert sql_tool.sql_query_file(str(path), "SELECT SUM(price) AS s FROM food") == "s\n7.5"
+
+
+def test_slow_query_does_not_block_other_queries(sales_csv, tmp_path, monkeypatch):
+    """Each call has its own connection, a long query of one question does not hold up the others."""
+    import threading
+
+    monkeypatch.setattr(sql_tool, "SQL_TIMEOUT_SECONDS", 2)
+    other = tmp_path / "other.csv"
+    pd.DataFrame({"a": [1, 2, 3]}).to_csv(other, index=False)
+    sql_tool.describe_table_file(sales_csv)
+    sql_tool.describe_table_file(str(other))
+
+    slow = "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n) SELECT COUNT(*) FROM n"
+    results = {}
+    thread = threading.Thread(target=lambda: results.setdefault("slow", sql_tool.sql_query_file(sales_csv, slow)))
+    thread.start()
+    time.sleep(0.2)
+    start = time.perf_counter()
+    assert sql_tool.sql_query_file(str(other), "SELECT SUM(a) AS total FROM data") == "total\n6"
+    assert sql_tool.sql_query_file(sales_csv, "SELECT COUNT(*) AS n FROM data") == "n\n2000"
+    assert time.perf_counter() - start < 1
+    thread.join()
+    assert "longer than 2 seconds" in results["slow"]
@@ -0,0 +1,106 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import tools.analyse_csv_file_tool as csv_tool
+from tools.streaming_stats import FrequentItems, QuantileSketch, RunningStats, stream_describe
+
+
+@pytest.fixture
+def csv_file(tmp_path):
+    rng = np.random.default_rng(7)
+    n = 50000
+    value = rng.normal(50, 10, n)
+    value[::9] = np.nan
+    df = pd.DataFrame({
+        "id": np.arange(n),
+        "value": value,
+        "city": rng.choice(["Berlin", "Paris", "Rome", "Oslo"], n, p=[0.5, 0.3, 0.15, 0.05]),
+    })
+    path = tmp_path / "data.csv"
+    df.to_csv(path, index=False)
+    return str(path)
+
+
+def test_running_stats_match_numpy():
+    """Welford updates over chunks give the same mean/std as one pass over all values."""
+    values = np.random.default_rng(1).exponential(3, 10001)
+    stats = RunningStats()
+    for chunk in np.array_split(values, 7):
+        stats.update(chunk)
+    assert stats.count == len(values)
+    assert stats.mean == pytest.approx(values.mean())
+    assert stats.std == pytest.approx(values.std(ddof=1))
+    assert (stats.min, stats.max) == (values.min(), values.max())
+
+
+def test_quantile_sketch_is_bounded_and_accurate():
+    values = np.random.default_rng(2).uniform(0, 1, 500000)
+    sketch = QuantileSketch(k=512)
+    for chunk in np.array_split(values, 50):
+        sketch.update(chunk)
+    assert sketch.size() < 512 * 20
+    for q, estimate in zip((0.1, 0.5, 0.9), sketch.quantiles((0.1, 0.5, 0.9))):
+        assert estimate == pytest.approx(q, abs=0.01)
+
+
+def test_frequent_items_keep_heavy_hitters():
+    """With few counters the frequent values survive and their counts are lower bounds."""
+    items = FrequentItems(capacity=5)
+    rng = np.random.default_rng(3)
+    for _ in range(10):
+        noise = [f"rare_{i}" for i in rng.integers(0, 10000, 500)]
+        items.update(pd.Series(["hot"] * 300 + ["warm"] * 100 + noise))
+    top = items.top(2)
+    assert [value for value, _ in top] == ["hot", "warm"]
+    assert 3000 - items.error <= top[0][1] <= 3000
+
+
+def test_stream_describe_matches_pandas(csv_file):
+    exact = pd.read_csv(csv_file).describe()
+    streamed = stream_describe(csv_file, chunk_rows=4000)
+    assert list(streamed.columns) == list(exact.columns)
+    for column in exact.columns:
+        for key in ("count", "mean", "std", "min", "max"):
+            assert streamed.loc[key, column] == pytest.approx(exact.loc[key, column])
+        spread = exact.loc["max", column] - exact.loc["min", column]
+        for key in ("25%", "50%", "75%"):
+            assert streamed.loc[key, column] == pytest.approx(exact.loc[key, column], abs=0.01 * spread)
+
+
+def test_text_column(csv_file):
+    described = stream_describe(csv_file, columns=["city"], chunk_rows=4000)["city"]
+    exact = pd.read_csv(csv_file)["city"].describe()
+    assert described["count"] == exact["count"]
+    assert described["unique"] == exact["unique"]
+    assert (described["top"], described["freq"]) == (exact["top"], exact["freq"])
+
+
+def test_column_with_text_in_a_later_chunk(tmp_path):
+    """A column that is empty or numeric in the first chunk but has text later is described as text."""
+    n = 10000
+    df = pd.DataFrame({
+        "amount": np.arange(n, dtype=float),
+        "note": [None] * 6000 + ["late", "later"] * 2000,
+        "code": [str(i % 7) for i in range(6000)] + ["A1"] * 4000,
+    })
+    path = tmp_path / "late_text.csv"
+    df.to_csv(path, index=False)
+
+    streamed = stream_describe(str(path), columns=["amount", "note", "code"], chunk_rows=4000)
+    exact = pd.read_csv(path).describe(include="all")
+    for column in ("note", "code"):
+        for key in ("count", "unique", "top", "freq"):
+            assert streamed.loc[key, column] == exact.loc[key, column], (column, key)
+    assert streamed.loc["count", "amount"] == n
+    # without columns only the numeric ones, as in pandas
+    assert list(stream_describe(str(path), chunk_rows=4000).columns) == ["amount"]
+
+
+def test_tool_uses_streaming_for_large_files(csv_file, monkeypatch):
+    monkeypatch.setattr(csv_tool, "CSV_STREAMING_BYTES", 0)
+    result = csv_tool.analyse_csv_file(csv_file, "city")
+    assert "streaming mode" in result
+    assert "Berlin" in result and "Most frequent values" in result
+    assert "does not exist" in csv_tool.analyse_csv_file(csv_file, "country")
+    assert "value" in csv_tool.analyse_csv_file(csv_file)
@@ -0,0 +1,119 @@
+from langchain_core.tools import StructuredTool, Tool
+
+from tools import tool_cache
+from tools.registry import load_tools
+from tools.tool_cache import ToolCache, cache_key, memoize_tools
+
+
+def _counting_search():
+    calls = []
+
+    def search(query: str, max_results: int = 3) -> str:
+        calls.append(query)
+        return f"{max_results} results for {query}"
+    return StructuredTool.from_function(search, name="web_search", description="search"), calls
+
+
+def test_key_ignores_whitespace_and_unset_arguments():
+    assert cache_key("web_search", (), {"query": "Mercedes  Sosa "}) == \
+        cache_key("web_search", (), {"query": "Mercedes Sosa", "page": None})
+    assert cache_key("web_search", (), {"query": "a"}) != cache_key("search_arxiv", (), {"query": "a"})
+
+
+def test_repeated_call_is_served_from_the_cache(tmp_path):
+    cache = ToolCache(str(tmp_path))
+    tool, calls = _counting_search()
+    [memoized] = memoize_tools([tool], policies={"web_search": 60}, cache=cache)
+    assert memoized.name == "web_search" and memoized.args == tool.args
+
+    first = memoized.invoke({"query": "Mercedes Sosa"})
+    assert memoized.invoke({"query": " Mercedes   Sosa"}) == first
+    assert calls == ["Mercedes Sosa"]
+    assert cache.stats() == {"web_search": {"hits": 1, "misses": 1, "expired": 0}}
+
+    # a new cache object on the same directory (next run) still has the result
+    [again] = memoize_tools([tool], policies={"web_search": 60}, cache=ToolCache(str(tmp_path)))
+    assert again.invoke({"query": "Mercedes Sosa"}) == first and len(calls) == 1
+
+
+def test_expired_results_are_fetched_again(tmp_path, monkeypatch):
+    cache = ToolCache(str(tmp_path))
+    tool, calls = _counting_search()
+    [memoized] = memoize_tools([tool], policies={"web_search": 60}, cache=cache)
+    memoized.invoke({"query": "arXiv AI regulation"})
+    now = tool_cache.time.time()
+    monkeypatch.setattr(tool_cache.time, "time", lambda: now + 61)
+    memoized.invoke({"query": "arXiv AI regulation"})
+    assert len(calls) == 2 and cache.stats()["web_search"]["expired"] == 1
+
+
+def test_uncached_tools_and_errors(tmp_path):
+    cache = ToolCache(str(tmp_path))
+    clock = Tool(name="current_time", func=lambda zone: "12:00", description="time")
+    calls = []
+
+    def lookup(title: str) -> str:
+        calls.append(title)
+        return "Error fetching page: timeout"
+    failing = Tool(name="get_wikipedia_page", func=lookup, description="page")
+
+    memoized = memoize_tools([clock, failing], policies={"get_wikipedia_page": None}, cache=cache)
+    assert memoized[0] is clock
+    memoized[1].invoke("Mercedes Sosa")
+    memoized[1].invoke("Mercedes Sosa")
+    assert len(calls) == 2  # error messages are not cached
+
+
+def test_least_recently_used_results_are_evicted(tmp_path):
+    cache = ToolCache(str(tmp_path), max_bytes=250)
+    for n in range(3):
+        cache.put("web_search", f"key-{n}", str(n) * 100)
+        if n == 1:
+            assert cache.get("web_search", "key-0", None) == "0" * 100  # key-0 is used again
+    assert cache.get("web_search", "key-1", None) is tool_cache._MISSING
+    assert cache.get("web_search", "key-0", None) is not tool_cache._MISSING
+    assert cache.total_bytes() <= 250
+
+
+def test_registry_tools_keep_the_config(tmp_path):
+    """Tools that take the RunnableConfig still get it; the session is not part of the key."""
+    from tools.python_sandbox import close_session
+
+    tools = {tool.name: tool for tool in load_tools()}
+    cache = ToolCache(str(tmp_path))
+    [code, calc] = memoize_tools([tools["execute_python_code"], tools["calculate"]],
+                                 policies={"execute_python_code": None, "calculate": None}, cache=cache)
+    config = {"configurable": {"session_id": "tool-cache-test"}}
+    try:
+        assert code.invoke("6 * 7", config=config) == "Result: 42"
+        assert code.invoke("6 * 7", config={"configurable": {"session_id": "other"}}) == "Result: 42"
+    finally:
+        close_session("tool-cache-test")
+        close_session("other")
+    assert calc.invoke({"expressions": ["2 + 3"]}) == "2 + 3 = 5"
+    assert cache.stats()["execute_python_code"] == {"hits": 1, "misses": 1, "expired": 0}
+
+
+def test_list_and_dict_results_are_memoized(tmp_path):
+    """search_wikipedia returns a list, web_search the dict of the Tavily client."""
+    calls = []
+
+    def search_wikipedia(query: str) -> list:
+        calls.append(query)
+        return [{"title": "Mercedes Sosa", "pageid": 476992}, {"title": "Cantora", "pageid": 1}]
+
+    def web_search(query: str) -> dict:
+        calls.append(query)
+        return {"query": query, "results": [{"url": "https://example.org", "score": 0.9}]}
+
+    cache = ToolCache(str(tmp_path))
+    wiki, web = memoize_tools([Tool(name="search_wikipedia", func=search_wikipedia, description="wiki"),
+                               StructuredTool.from_function(web_search, name="web_search", description="web")],
+                              policies={"search_wikipedia": None, "web_search": 60}, cache=cache)
+    first = wiki.invoke("Mercedes Sosa")
+    assert wiki.invoke("Mercedes Sosa") == first and isinstance(first, list)
+    found = web.invoke({"query": "albums"})
+    assert web.invoke({"query": "albums"}) == found and isinstance(found, dict)
+    assert len(calls) == 2
+    assert cache.stats()["search_wikipedia"] == {"hits": 1, "misses": 1, "expired": 0}
+    assert cache.stats()["web_search"]["hits"] == 1
@@ -0,0 +1,66 @@
+import os
+
+import pytest
+
+import tools.wiki_search_tool as wiki
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "wikipedia", "mercedes_sosa.html")
+
+
+@pytest.fixture
+def recorded_page(monkeypatch):
+    """Serve the recorded page instead of calling the Wikipedia API."""
+    with open(FIXTURE, "r", encoding="utf-8") as f:
+        page_html = f.read()
+    calls = []
+
+    def fetch(title):
+        calls.append(title)
+        return page_html
+
+    wiki._page_index.cache_clear()
+    monkeypatch.setattr(wiki, "_fetch_page_html", fetch)
+    yield calls
+    wiki._page_index.cache_clear()
+
+
+def test_split_sections_drops_markup():
+    """Sections keep their headings and lose styles, edit links and reference marks."""
+    with open(FIXTURE, "r", encoding="utf-8") as f:
+        sections = wiki.split_sections(f.read())
+    titles = [section["title"] for section in sections]
+    assert titles[:3] == ["(Intro)", "Life", "Exile and return"]
+    assert "Studio albums" in titles
+    text = "\n".join(section["text"] for section in sections)
+    assert "mw-parser-output" not in text
+    assert "[edit]" not in text
+    assert "[1]" not in text
+
+
+def test_toc_lists_nested_sections(recorded_page):
+    """The table of contents numbers the sections and indents subsections."""
+    toc = wiki.get_wikipedia_toc("Mercedes Sosa")
+    assert "1. Life" in toc
+    assert "  7. Studio albums" in toc
+
+
+def test_search_returns_only_matching_sections(recorded_page):
+    """A query returns the best matching sections, far smaller than the page."""
+    result = wiki.search_wikipedia_page("Mercedes Sosa", "studio albums Cantora", top_k=1)
+    assert result.startswith("## 7. Studio albums")
+    assert "Cantora 1" in result
+    assert len(result) < os.path.getsize(FIXTURE) / 10
+
+
+def test_search_by_section_number_and_title(recorded_page):
+    """Sections from the table of contents can be requested directly."""
+    assert wiki.search_wikipedia_page("Mercedes Sosa", "4").startswith("## 4. Death")
+    assert wiki.search_wikipedia_page("Mercedes Sosa", "live albums").startswith("## 8. Live albums")
+
+
+def test_page_is_fetched_once(recorded_page):
+    """Table of contents and searches on the same page share one fetch."""
+    wiki.get_wikipedia_toc("Mercedes Sosa")
+    wiki.search_wikipedia_page("Mercedes Sosa", "death")
+    wiki.search_wikipedia_page("Mercedes Sosa", "awards")
+    assert recorded_page == ["Mercedes Sosa"]
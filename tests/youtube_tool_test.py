@@ -0,0 +1,118 @@
+import os
+import shutil
+
+import pytest
+
+pytest.importorskip("pytubefix")
+from pytubefix.captions import Caption
+
+import tools.extract_audio_from_youtube_tool as youtube_tool
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "youtube")
+AUDIO_FIXTURE = os.path.join(os.path.dirname(__file__), "..", "tools", "testfiles", "sample.mp3")
+VIDEO_URL = "https://www.youtube.com/watch?v=abcdefghijk"
+
+
+class RecordedCaption(Caption):
+    """Caption track that serves a recorded timedtext XML file instead of fetching it."""
+
+    def __init__(self, code):
+        super().__init__({"baseUrl": "", "name": {"simpleText": code}, "vssId": f".{code}" if "." not in code else code})
+        self.fixture = os.path.join(FIXTURES, f"timedtext_{code}.xml")
+
+    @property
+    def xml_captions(self):
+        with open(self.fixture, "r", encoding="utf-8") as f:
+            return f.read()
+
+
+class RecordedStream:
+    """Audio stream that 'downloads' the recorded sample audio."""
+
+    downloads = 0
+
+    def filter(self, **kwargs):
+        return self
+
+    def order_by(self, attribute):
+        return self
+
+    def desc(self):
+        return self
+
+    def first(self):
+        return self
+
+    def download(self, output_path, filename):
+        RecordedStream.downloads += 1
+        path = os.path.join(output_path, filename)
+        shutil.copy(AUDIO_FIXTURE, path)
+        return path
+
+
+def fake_youtube(caption_codes):
+    class FakeYouTube:
+        def __init__(self, url):
+            self.url = url
+            self.captions = [RecordedCaption(code) for code in caption_codes]
+            self.streams = RecordedStream()
+    return FakeYouTube
+
+
+@pytest.fixture(autouse=True)
+def audio_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(youtube_tool, "YOUTUBE_AUDIO_CACHE_DIR", str(tmp_path))
+    RecordedStream.downloads = 0
+    return tmp_path
+
+
+@pytest.mark.parametrize("url", [
+    "https://www.youtube.com/watch?v=abcdefghijk",
+    "https://youtu.be/abcdefghijk?t=10",
+    "\"https://www.youtube.com/shorts/abcdefghijk\"",
+])
+def test_extract_video_id(url):
+    assert youtube_tool.extract_video_id(url) == "abcdefghijk"
+
+def test_transcript_from_manual_captions(monkeypatch):
+    """Manual English captions are preferred and returned with timestamps, without any download."""
+    monkeypatch.setattr(youtube_tool, "YouTube", fake_youtube(["a.en", "en"]))
+    result = youtube_tool.get_youtube_transcript(VIDEO_URL)
+
+    assert result.startswith("Transcript from captions (en):")
+    assert "[00:01] Welcome back to the channel." in result
+    assert "[01:04] Isn't that hot?" in result
+    assert result.endswith("[END OF TEXT]")
+    assert RecordedStream.downloads == 0
+
+def test_auto_generated_captions_are_used(monkeypatch):
+    monkeypatch.setattr(youtube_tool, "YouTube", fake_youtube(["a.en"]))
+    result = youtube_tool.get_youtube_transcript(VIDEO_URL)
+    assert "(a.en)" in result
+    assert "welcome back to the channel" in result
+
+def test_audio_is_downloaded_once_per_video(monkeypatch, audio_cache):
+    """Without captions the audio is downloaded; a second request uses the cached file."""
+    monkeypatch.setattr(youtube_tool, "YouTube", fake_youtube([]))
+
+    first = youtube_tool.extract_audio_from_youtube(VIDEO_URL)
+    second = youtube_tool.extract_audio_from_youtube("https://youtu.be/abcdefghijk")
+
+    assert first == second == f"{os.path.join(str(audio_cache), 'abcdefghijk.mp3')}."
+    assert RecordedStream.downloads == 1
+    assert os.listdir(audio_cache) == ["abcdefghijk.mp3"]
+
+def test_transcript_falls_back_to_audio(monkeypatch):
+    """Without captions the cached audio is handed to the audio transcription tool."""
+    monkeypatch.setattr(youtube_tool, "YouTube", fake_youtube([]))
+    transcribed = []
+
+    import types
+    import sys
+    fake_audio_tool = types.ModuleType("tools.extract_text_from_audio_tool")
+    fake_audio_tool.extract_text_from_audio = lambda path: transcribed.append(path) or "Extracted text: hello\n[END OF TEXT]"
+    monkeypatch.setitem(sys.modules, "tools.extract_text_from_audio_tool", fake_audio_tool)
+
+    result = youtube_tool.get_youtube_transcript(VIDEO_URL)
+    assert result == "Extracted text: hello\n[END OF TEXT]"
+    assert transcribed[0].endswith("abcdefghijk.mp3")
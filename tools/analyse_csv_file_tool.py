@@ -2,6 +2,9 @@
 analyse_csv_file_tool.py
 LangChain Tool for analyzing CSV files.
 This tool allows you to analyze CSV files and extract useful information from them.
+
+Files above CSV_STREAMING_BYTES are analysed in streaming mode (streaming_stats.py):
+read in chunks, only the requested column, with bounded memory and approximate quantiles.
 """
 
 import pandas as pd
@@ -9,6 +12,12 @@ from langchain.agents import Tool
 import os
 from typing import Optional
 
+from tools.streaming_stats import stream_describe, summarize_csv
+from tools.registry import tool_description
+
+# Larger files are not loaded into one DataFrame but summarised chunk by chunk
+CSV_STREAMING_BYTES = int(os.getenv("CSV_STREAMING_BYTES", str(100 * 1024 ** 2)))
+
 def analyse_csv_file(file_path: str, column_name: Optional[str] = None) -> str:
     """
     Analyze a CSV file and return basic statistics or information about a specific column.
@@ -22,9 +31,13 @@ def analyse_csv_file(file_path: str, column_name: Optional[str] = None) -> str:
     """
     try:
         # Check if the file exists
-        if not os.path.isfile(file_path):
+        if not os.path.isfile(file_path.strip().strip("'\"")):
             return f"Error: The file {file_path} does not exist."
 
+        file_path = file_path.strip().strip("'\"")
+        if os.path.getsize(file_path) > CSV_STREAMING_BYTES:
+            return _analyse_streaming(file_path, column_name)
+
         # Read the CSV file
         df = pd.read_csv(file_path)
 
@@ -42,10 +55,28 @@ def analyse_csv_file(file_path: str, column_name: Optional[str] = None) -> str:
     except Exception as e:
         return f"Error analyzing CSV file: {str(e)}"
 
+def _analyse_streaming(file_path: str, column_name: Optional[str]) -> str:
+    """Streaming variant of the analysis for large files."""
+    header = pd.read_csv(file_path, nrows=0).columns
+    if column_name is not None and column_name not in header:
+        return f"Error: The column '{column_name}' does not exist in the CSV file."
+
+    note = "(large file, computed in streaming mode; quantiles are approximate)"
+    if column_name is None:
+        return f"{stream_describe(file_path).to_string()}\n{note}"
+
+    summary = summarize_csv(file_path, columns=[column_name])[column_name]
+    result = summary.describe().to_string()
+    if not summary.numeric:
+        top = "\n".join(f"{value}: {count}" for value, count in summary.top_values(10))
+        result += f"\nMost frequent values:\n{top}"
+    return f"{result}\n{note}"
+
+
 analyse_csv_tool = Tool(
     name="analyse_csv_file",
     func=analyse_csv_file,
-    description="Analyze a CSV file and return basic statistics or information about a specific column. Provide the path to the CSV file and optionally the column name."
+    description=tool_description("analyse_csv_file")
 )
 
 if __name__ == "__main__":
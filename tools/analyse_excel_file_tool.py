@@ -1,22 +1,27 @@
 """
-analyse_csv_file_tool.py
+analyse_excel_file_tool.py
 LangChain Tool for analyzing Excel files.
 This tool allows you to analyze Excel files and extract useful information from them.
+Workbooks are read through tools/excel_loader.py: only the requested sheet and
+columns are parsed, and parsed sheets are cached.
 """
 
-import pandas as pd
 from langchain.agents import Tool
 import os
 from typing import Optional
 
+from tools.excel_loader import list_sheets, load_sheet
+from tools.registry import tool_description
 
-def analyse_excel_file(file_path: str, sheet_name: Optional[str] = None) -> str:
+
+def analyse_excel_file(file_path: str, sheet_name: Optional[str] = None, columns: Optional[str] = None) -> str:
     """
     Analyze an Excel file and return basic statistics or information about a specific sheet.
 
     Args:
         file_path (str): Path to the Excel file.
-        sheet_name (str, optional): Name of the sheet to analyze. If None, returns general info.
+        sheet_name (str, optional): Name of the sheet to analyze. If None, the first sheet is analyzed.
+        columns (str, optional): Excel column range to analyze, e.g. 'B:D'. If None, all columns.
 
     Returns:
         str: Analysis result.
@@ -26,21 +31,23 @@ def analyse_excel_file(file_path: str, sheet_name: Optional[str] = None) -> str:
         if not os.path.isfile(file_path):
             return f"Error: The file {file_path} does not exist."
 
-        # Read the Excel file
-        if sheet_name is None:
-            df = pd.read_excel(file_path)
-        else:
-            df = pd.read_excel(file_path, sheet_name=sheet_name)
+        # Sheets and their sizes, without loading the cells
+        sheets = list_sheets(file_path)
+        result = "Sheets: " + ", ".join(
+            f"{sheet['name']} ({sheet['dimensions']})" if sheet["dimensions"] else sheet["name"] for sheet in sheets
+        ) + "\n"
+
+        # Read only the requested sheet (and columns)
+        df = load_sheet(file_path, sheet_name=sheet_name, usecols=columns)
 
         # Run various analyses based on the query
-        result = f"Excel file loaded with {len(df)} rows and {len(df.columns)} columns.\n"
-        result += f"Columns: {', '.join(df.columns)}\n\n"
+        result += f"Sheet {sheet_name or sheets[0]['name']!r} loaded with {len(df)} rows and {len(df.columns)} columns.\n"
+        result += f"Columns: {', '.join(map(str, df.columns))}\n\n"
 
         # Add summary statistics
         result += "Summary statistics:\n"
         result += str(df.describe())
 
-        # If no sheet name is provided, return general info
         return result
 
     except Exception as e:
@@ -49,7 +56,7 @@ def analyse_excel_file(file_path: str, sheet_name: Optional[str] = None) -> str:
 analyse_excel_tool = Tool(
     name="analyse_excel_file",
     func=analyse_excel_file,
-    description="Analyze an Excel file and return basic statistics or information about a specific sheet. Provide the path to the Excel file and optionally the sheet name."
+    description=tool_description("analyse_excel_file")
 )
 
 if __name__ == "__main__":
@@ -6,6 +6,8 @@ LangChain Tool for searching ArXiv and returning results.
 from langchain.agents import Tool
 from langchain_community.document_loaders import ArxivLoader
 
+from tools.registry import tool_description
+
 def search_arxiv(query: str, limit: int = 5) -> list[dict]:
     """
     Search ArXiv for a given query string and return up to `limit` results.
@@ -24,5 +26,5 @@ def search_arxiv(query: str, limit: int = 5) -> list[dict]:
 arxiv_search_tool = Tool(
     name="search_arxiv",
     func=search_arxiv,
-    description="Search ArXiv for a given query string and return up to 5 results. Each result contains 'title', 'summary', and 'url'."
+    description=tool_description("search_arxiv")
 )
\ No newline at end of file
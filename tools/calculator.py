@@ -0,0 +1,402 @@
+"""
+calculator.py
+Safe batch calculator for the agent.
+A whole calculation is sent in one tool call as a list of expressions (and
+assignments like 'total = a + b' whose names the later expressions can use).
+The expressions are parsed with `ast` and evaluated by walking the tree; only
+numbers, names, arithmetic, comparisons and a whitelist of functions are
+allowed, nothing is passed to eval/exec.
+Integers are Python integers (no overflow), lists become NumPy arrays so the
+same expression is evaluated element-wise, and the 'fraction' and 'decimal'
+modes compute exactly instead of with floats.
+"""
+
+import ast
+import math
+import operator
+import statistics
+from decimal import Decimal, localcontext
+from fractions import Fraction
+from typing import Any, Optional
+
+import numpy as np
+
+MODES = ("float", "fraction", "decimal")
+DECIMAL_PRECISION = 50
+MAX_EXPRESSION_CHARS = 2000
+MAX_EXPRESSIONS = 100
+MAX_ARRAY_LENGTH = 1_000_000
+# Integers (every intermediate result, also numerators/denominators of fractions) are limited to this many bits
+MAX_INT_BITS = 100_000
+# round() computes 10 ** ndigits, so the number of digits is limited
+MAX_ROUND_DIGITS = 1000
+# Integers with more bits are shown in scientific notation
+LONG_INT_BITS = 1000
+
+_BINARY_OPERATORS = {
+    ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul, ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv, ast.Mod: operator.mod, ast.Pow: operator.pow,
+}
+_UNARY_OPERATORS = {ast.UAdd: operator.pos, ast.USub: operator.neg}
+_COMPARE_OPERATORS = {
+    ast.Eq: operator.eq, ast.NotEq: operator.ne, ast.Lt: operator.lt, ast.LtE: operator.le,
+    ast.Gt: operator.gt, ast.GtE: operator.ge,
+}
+
+
+class CalculationError(ValueError):
+    """Raised for expressions that are not allowed or cannot be evaluated."""
+
+
+def _is_array(value) -> bool:
+    return isinstance(value, np.ndarray)
+
+
+def _to_float(value):
+    return value.astype(np.float64) if _is_array(value) else float(value)
+
+
+def _elementwise(func):
+    """Apply a scalar function to a number or to every element of an array."""
+    def apply(value, *args):
+        if _is_array(value):
+            return np.array([func(item, *args) for item in value], dtype=object)
+        return func(value, *args)
+    return apply
+
+
+def _checked_factorial(n):
+    n = int(n)
+    if n < 0:
+        raise CalculationError("factorial of a negative number")
+    if n > 20000:
+        raise CalculationError(f"factorial({n}) is too large")
+    return math.factorial(n)
+
+
+def _checked_round(x, ndigits=None):
+    if ndigits is None:
+        return round(x)
+    if ndigits != int(ndigits):
+        raise CalculationError(f"round() needs an integer number of digits, got {ndigits}")
+    ndigits = int(ndigits)
+    if abs(ndigits) > MAX_ROUND_DIGITS:
+        raise CalculationError(f"round() is limited to {MAX_ROUND_DIGITS} digits")
+    return round(x, ndigits)
+
+
+def _check_int_size(value) -> None:
+    """Reject integers (or fractions) with more than MAX_INT_BITS bits."""
+    items = value.tolist() if _is_array(value) and value.dtype == object else [value]
+    for item in items:
+        if isinstance(item, Fraction):
+            bits = max(item.numerator.bit_length(), item.denominator.bit_length())
+        elif isinstance(item, int):
+            bits = item.bit_length()
+        else:
+            continue
+        if bits > MAX_INT_BITS:
+            raise CalculationError(f"result has {bits} bits, integers are limited to {MAX_INT_BITS} bits")
+
+
+def _bounded_bits(estimate):
+    """Wrap comb/perm/lcm: refuse arguments whose result (estimated in bits) would be too large."""
+    def decorator(func):
+        def apply(*args):
+            if any(not isinstance(arg, int) for arg in args):
+                raise CalculationError(f"{func.__name__} needs integers")
+            if estimate(*args) > MAX_INT_BITS:
+                raise CalculationError(f"{func.__name__}{tuple(args)} is too large")
+            return func(*args)
+        apply.__name__ = func.__name__
+        return apply
+    return decorator
+
+
+def _log2_falling_factorial(n: int, k: int) -> float:
+    """log2(n! / (n - k)!), the size of perm(n, k)."""
+    if n < 0 or k < 0 or k > n:
+        return 0.0
+    return (math.lgamma(n + 1) - math.lgamma(n - k + 1)) / math.log(2)
+
+
+def _perm_bits(n, k=None):
+    return _log2_falling_factorial(n, n if k is None else k)
+
+
+def _comb_bits(n, k):
+    return _log2_falling_factorial(n, min(k, n - k)) if 0 <= k <= n else 0.0
+
+
+def _lcm_bits(*values):
+    return sum(abs(value).bit_length() for value in values)
+
+
+def _log(value, base=None):
+    if isinstance(value, Decimal):
+        return value.ln() if base is None else value.ln() / Decimal(base).ln()
+    if base is None:
+        return np.log(_to_float(value)) if _is_array(value) else math.log(value)
+    if base in (2, 10):
+        # exact for powers of the base, math.log(1000, 10) is 2.9999999999999996
+        return FUNCTIONS[f"log{base}"](value)
+    return np.log(_to_float(value)) / math.log(base) if _is_array(value) else math.log(value, base)
+
+
+def _unary_math(numpy_func, math_func, decimal_method=None):
+    def apply(value):
+        if _is_array(value):
+            return numpy_func(_to_float(value))
+        if isinstance(value, Decimal):
+            # exact where Decimal has the function, otherwise through float
+            return getattr(value, decimal_method)() if decimal_method else Decimal(repr(math_func(value)))
+        return math_func(value)
+    return apply
+
+
+def _sqrt(value):
+    if _is_array(value):
+        return np.sqrt(_to_float(value))
+    if isinstance(value, Decimal):
+        return value.sqrt()
+    if isinstance(value, Fraction) and value >= 0:
+        root = Fraction(math.isqrt(value.numerator), math.isqrt(value.denominator))
+        if root * root == value:
+            return root
+    if isinstance(value, int) and value >= 0 and math.isqrt(value) ** 2 == value:
+        return math.isqrt(value)
+    return math.sqrt(value)
+
+
+def _aggregate(func):
+    """Aggregates take an array or several numbers: sum([1, 2]) or sum(1, 2)."""
+    def apply(*values):
+        if len(values) == 1 and _is_array(values[0]):
+            values = values[0].tolist()
+        if not values:
+            raise CalculationError(f"{func.__name__} of an empty list")
+        return func(values)
+    return apply
+
+
+def _percentage(part, whole):
+    return part / whole * 100
+
+
+FUNCTIONS = {
+    "abs": abs, "round": _checked_round,
+    "sqrt": _sqrt, "exp": _unary_math(np.exp, math.exp, "exp"), "log": _log,
+    "log10": _unary_math(np.log10, math.log10, "log10"), "log2": _unary_math(np.log2, math.log2),
+    "sin": _unary_math(np.sin, math.sin), "cos": _unary_math(np.cos, math.cos),
+    "tan": _unary_math(np.tan, math.tan), "asin": _unary_math(np.arcsin, math.asin),
+    "acos": _unary_math(np.arccos, math.acos), "atan": _unary_math(np.arctan, math.atan),
+    "degrees": _unary_math(np.degrees, math.degrees), "radians": _unary_math(np.radians, math.radians),
+    "floor": _elementwise(math.floor), "ceil": _elementwise(math.ceil),
+    "factorial": _elementwise(_checked_factorial), "comb": _bounded_bits(_comb_bits)(math.comb),
+    "perm": _bounded_bits(_perm_bits)(math.perm), "gcd": math.gcd, "lcm": _bounded_bits(_lcm_bits)(math.lcm), "hypot": math.hypot, "percentage": _percentage,
+    "sum": _aggregate(sum), "min": _aggregate(min), "max": _aggregate(max),
+    "mean": _aggregate(statistics.mean), "median": _aggregate(statistics.median),
+    "stdev": _aggregate(statistics.stdev), "pstdev": _aggregate(statistics.pstdev),
+    "len": lambda values: len(values),
+}
+CONSTANTS = {"pi": math.pi, "e": math.e, "tau": math.tau, "inf": math.inf}
+_DECIMAL_PI = Decimal("3.14159265358979323846264338327950288419716939937510")
+
+
+class _Evaluator:
+    def __init__(self, mode: str, variables: dict):
+        if mode not in MODES:
+            raise CalculationError(f"Unknown mode {mode!r}, use one of {', '.join(MODES)}")
+        self.mode = mode
+        self.names = dict(CONSTANTS)
+        if mode == "decimal":
+            with localcontext() as context:
+                context.prec = DECIMAL_PRECISION
+                self.names.update(pi=_DECIMAL_PI, e=Decimal(1).exp(), tau=2 * _DECIMAL_PI, inf=Decimal("Infinity"))
+        for name, value in variables.items():
+            self.names[name] = self._value(value)
+            _check_int_size(self.names[name])
+
+    # -- numbers --
+
+    def _number(self, value, text: Optional[str] = None):
+        """Convert a literal or variable value to the number type of the mode."""
+        if isinstance(value, bool) or not isinstance(value, (int, float, Fraction, Decimal)):
+            raise CalculationError(f"not a number: {value!r}")
+        if self.mode == "float" or (self.mode == "fraction" and isinstance(value, int)):
+            return value
+        text = text or str(value)
+        if self.mode == "fraction":
+            return Fraction(text)
+        return Decimal(text)
+
+    def _value(self, value):
+        if isinstance(value, (list, tuple)):
+            if len(value) > MAX_ARRAY_LENGTH:
+                raise CalculationError(f"lists are limited to {MAX_ARRAY_LENGTH} items")
+            items = [self._value(item) for item in value]
+            if any(_is_array(item) for item in items):
+                raise CalculationError("nested lists are not supported")
+            if self.mode == "float" and any(isinstance(item, float) for item in items) \
+                    and all(isinstance(item, (int, float)) for item in items):
+                return np.array(items, dtype=np.float64)
+            # integers (arbitrary size), fractions and decimals stay exact Python numbers
+            return np.array(items, dtype=object)
+        return self._number(value)
+
+    # -- evaluation --
+
+    def evaluate(self, node: ast.AST):
+        method = getattr(self, f"_eval_{type(node).__name__}", None)
+        if method is None:
+            raise CalculationError(f"{type(node).__name__} is not allowed")
+        return method(node)
+
+    def _eval_Constant(self, node: ast.Constant):
+        return self._number(node.value, ast.unparse(node))
+
+    def _eval_Name(self, node: ast.Name):
+        if node.id not in self.names:
+            raise CalculationError(f"unknown name {node.id!r}")
+        return self.names[node.id]
+
+    def _eval_List(self, node: ast.List):
+        return self._value([self.evaluate(item) for item in node.elts])
+
+    _eval_Tuple = _eval_List
+
+    def _eval_UnaryOp(self, node: ast.UnaryOp):
+        if type(node.op) not in _UNARY_OPERATORS:
+            raise CalculationError(f"{type(node.op).__name__} is not allowed")
+        return _UNARY_OPERATORS[type(node.op)](self.evaluate(node.operand))
+
+    def _eval_BinOp(self, node: ast.BinOp):
+        if type(node.op) not in _BINARY_OPERATORS:
+            raise CalculationError(f"{type(node.op).__name__} is not allowed")
+        left, right = self.evaluate(node.left), self.evaluate(node.right)
+        if isinstance(node.op, ast.Pow):
+            self._check_power(left, right)
+        if isinstance(node.op, ast.Div) and self.mode == "fraction":
+            left = self._as_fraction(left)
+        result = _BINARY_OPERATORS[type(node.op)](left, right)
+        _check_int_size(result)
+        return result
+
+    def _eval_Compare(self, node: ast.Compare):
+        left = self.evaluate(node.left)
+        result = True
+        for op, comparator in zip(node.ops, node.comparators):
+            if type(op) not in _COMPARE_OPERATORS:
+                raise CalculationError(f"{type(op).__name__} is not allowed")
+            right = self.evaluate(comparator)
+            result = result & _COMPARE_OPERATORS[type(op)](left, right)
+            left = right
+        return result
+
+    def _eval_Call(self, node: ast.Call):
+        if not isinstance(node.func, ast.Name) or node.func.id not in FUNCTIONS:
+            name = node.func.id if isinstance(node.func, ast.Name) else ast.unparse(node.func)
+            raise CalculationError(f"unknown function {name!r}, available: {', '.join(sorted(FUNCTIONS))}")
+        if node.keywords:
+            raise CalculationError("keyword arguments are not supported")
+        result = FUNCTIONS[node.func.id](*[self.evaluate(arg) for arg in node.args])
+        _check_int_size(result)
+        return result
+
+    @staticmethod
+    def _as_fraction(value):
+        """int / int would give a float, Fraction / int stays exact."""
+        if _is_array(value) and value.dtype == object:
+            return np.array([Fraction(item) if isinstance(item, int) else item for item in value], dtype=object)
+        return Fraction(value) if isinstance(value, int) else value
+
+    @staticmethod
+    def _check_power(base, exponent) -> None:
+        for b, x in np.broadcast(np.asarray(base, dtype=object), np.asarray(exponent, dtype=object)):
+            if isinstance(b, (int, Fraction)) and isinstance(x, int) and b != 0:
+                if abs(x) * math.log2(max(abs(b.numerator), b.denominator)) > MAX_INT_BITS:
+                    raise CalculationError(f"{b} ** {x} is too large")
+
+    def run(self, source: str):
+        """Evaluate 'expression' or 'name = expression'; returns (label, value)."""
+        if len(source) > MAX_EXPRESSION_CHARS:
+            raise CalculationError(f"expressions are limited to {MAX_EXPRESSION_CHARS} characters")
+        try:
+            tree = ast.parse(source.strip(), mode="exec")
+        except SyntaxError as e:
+            raise CalculationError(f"invalid syntax: {e.msg}") from None
+        if len(tree.body) != 1:
+            raise CalculationError("one expression per list item")
+        statement = tree.body[0]
+        if isinstance(statement, ast.Assign) and len(statement.targets) == 1 \
+                and isinstance(statement.targets[0], ast.Name):
+            name = statement.targets[0].id
+            if name in FUNCTIONS:
+                raise CalculationError(f"{name!r} is a function name")
+            value = self.evaluate(statement.value)
+            self.names[name] = value
+            return name, value
+        if isinstance(statement, ast.Expr):
+            return source.strip(), self.evaluate(statement.value)
+        raise CalculationError("only expressions and 'name = expression' are allowed")
+
+
+def format_value(value) -> str:
+    """Readable result; fractions also as decimal number."""
+    if _is_array(value):
+        return "[" + ", ".join(format_value(item) for item in value.tolist()) + "]"
+    if isinstance(value, (bool, np.bool_)):
+        return str(bool(value))
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, Fraction):
+        if value.denominator == 1:
+            return str(value.numerator)
+        with localcontext() as context:
+            context.prec = 30
+            decimal = Decimal(value.numerator) / Decimal(value.denominator)
+        return f"{value} (= {decimal})"
+    if isinstance(value, int) and value.bit_length() > LONG_INT_BITS:
+        # very long integers are shortened (and str() refuses more than 4300 digits)
+        decimal = Decimal(value)
+        return f"{decimal:.20e} ({decimal.adjusted() + 1} digits)"
+    if isinstance(value, float) and value.is_integer() and abs(value) < 1e16:
+        return str(int(value))
+    return str(value)
+
+
+def calculate(expressions: list[str], variables: Optional[dict[str, Any]] = None, mode: str = "float") -> str:
+    """
+    Evaluate a list of expressions in one call.
+
+    Args:
+        expressions (list[str]): Expressions like '(a + b) * 2' or assignments like
+            'total = a + b'; later expressions can use the names assigned before.
+        variables (dict, optional): Names with numbers or lists of numbers (lists are
+            evaluated element-wise).
+        mode (str): 'float' (default), 'fraction' (exact rational numbers) or
+            'decimal' (50 significant digits).
+
+    Returns:
+        str: One line per expression, 'expression = result' or 'expression: Error ...'.
+    """
+    if isinstance(expressions, str):
+        expressions = [expressions]
+    if len(expressions) > MAX_EXPRESSIONS:
+        return f"Error in calculation: at most {MAX_EXPRESSIONS} expressions per call, got {len(expressions)}"
+    try:
+        evaluator = _Evaluator(mode, variables or {})
+    except Exception as e:
+        return f"Error in calculation: {str(e)}"
+
+    lines = []
+    with localcontext() as context:
+        context.prec = DECIMAL_PRECISION
+        for source in expressions:
+            try:
+                with np.errstate(all="raise"):
+                    label, value = evaluator.run(source)
+                lines.append(f"{label} = {format_value(value)}")
+            except Exception as e:
+                lines.append(f"{source.strip()}: Error {type(e).__name__}: {str(e)}")
+    return "\n".join(lines)
@@ -0,0 +1,317 @@
+"""
+cassette.py
+Record and replay of all outbound HTTP calls, for reproducible runs without network.
+In record mode every request made through requests (the shared http_client
+session, Tavily, arXiv, the scoring API) or urllib (pytubefix for YouTube) is
+sent as usual and the response is written to a cassette: a directory with an
+interactions.jsonl index and the response bodies, stored by SHA-256. In replay
+mode the responses are served from the cassette, with the original latency or
+without any, and a request that was not recorded raises CassetteMiss.
+
+Requests are matched by method, URL (query parameters sorted), conditional
+headers (Range, If-None-Match, ...) and body. API keys in query parameters and
+JSON bodies are left out of the match and, like the Authorization header, never
+written to the cassette. A request that was recorded several times is answered
+with the recorded responses in order.
+"""
+
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+from contextlib import contextmanager
+from datetime import timedelta
+from http.client import HTTPMessage
+from typing import Optional
+from urllib.parse import parse_qsl, urlsplit
+from urllib.response import addinfourl
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+CASSETTE_MODE = os.getenv("CASSETTE_MODE", "off")
+CASSETTE_PATH = os.getenv("CASSETTE_PATH", os.path.join("cassettes", "default"))
+# "original" waits as long as the recorded request took, "zero" answers immediately
+CASSETTE_LATENCY = os.getenv("CASSETTE_LATENCY", "original")
+
+_SECRET_FIELDS = {"api_key", "apikey", "key", "token", "access_token", "auth"}
+_MATCH_HEADERS = ("range", "if-range", "if-none-match", "if-modified-since")
+# Not valid any more for the stored (decoded) body, or not worth keeping
+_DROPPED_RESPONSE_HEADERS = {"content-encoding", "transfer-encoding", "content-length", "set-cookie", "connection"}
+
+
+class CassetteMiss(requests.exceptions.ConnectionError):
+    """Raised in replay mode for a request that is not in the cassette."""
+
+
+def _strip_secrets(value):
+    if isinstance(value, dict):
+        return {k: _strip_secrets(v) for k, v in value.items() if str(k).lower() not in _SECRET_FIELDS}
+    if isinstance(value, list):
+        return [_strip_secrets(item) for item in value]
+    return value
+
+
+def _body_digest(body) -> Optional[str]:
+    if body is None:
+        return None
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    if not isinstance(body, bytes):  # file objects and generators are not matched
+        return "stream"
+    try:
+        body = json.dumps(_strip_secrets(json.loads(body)), sort_keys=True).encode("utf-8")
+    except ValueError:
+        pass
+    return hashlib.sha256(body).hexdigest()
+
+
+def request_key(method: str, url: str, headers: dict, body=None) -> str:
+    """Match key of a request; secrets and non-conditional headers are ignored."""
+    parts = urlsplit(url)
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                   if k.lower() not in _SECRET_FIELDS)
+    headers = {str(k).lower(): str(v) for k, v in (headers or {}).items()}
+    conditional = {name: headers[name] for name in _MATCH_HEADERS if name in headers}
+    payload = [method.upper(), f"{parts.scheme}://{parts.netloc}{parts.path}", query, conditional, _body_digest(body)]
+    return hashlib.sha256(json.dumps(payload).encode("utf-8")).hexdigest()
+
+
+def _public_url(url: str) -> str:
+    """URL as written to the cassette, without secret query parameters."""
+    parts = urlsplit(url)
+    query = "&".join(f"{k}={v}" for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                     if k.lower() not in _SECRET_FIELDS)
+    return f"{parts.scheme}://{parts.netloc}{parts.path}" + (f"?{query}" if query else "")
+
+
+class Cassette:
+    """One recording; safe to use from several threads."""
+
+    def __init__(self, path: str, mode: str = "replay", latency: str = CASSETTE_LATENCY):
+        """
+        Open a cassette.
+
+        Args:
+            path (str): Directory of the cassette.
+            mode (str): 'record' (appends to the cassette) or 'replay'.
+            latency (str): 'original' or 'zero', the delay of replayed responses.
+        """
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown cassette mode {mode!r}, expected 'record' or 'replay'")
+        if latency not in ("original", "zero"):
+            raise ValueError(f"Unknown cassette latency {latency!r}, expected 'original' or 'zero'")
+        self.path = path
+        self.mode = mode
+        self.latency = latency
+        self.index_path = os.path.join(path, "interactions.jsonl")
+        self.bodies_dir = os.path.join(path, "bodies")
+        self.recorded = 0
+        self.played = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._interactions: dict[str, list[dict]] = {}
+        self._positions: dict[str, int] = {}
+        if mode == "record":
+            os.makedirs(self.bodies_dir, exist_ok=True)
+        elif not os.path.exists(self.index_path):
+            raise FileNotFoundError(f"Cassette {path!r} has no {os.path.basename(self.index_path)}")
+        else:
+            with open(self.index_path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        interaction = json.loads(line)
+                        self._interactions.setdefault(interaction["key"], []).append(interaction)
+
+    def record(self, transport: str, method: str, url: str, key: str, status: int, reason: str,
+               headers: list[tuple[str, str]], body: bytes, elapsed: float) -> None:
+        digest = hashlib.sha256(body).hexdigest()
+        body_path = os.path.join(self.bodies_dir, digest)
+        if not os.path.exists(body_path):
+            tmp_path = f"{body_path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(body)
+            os.replace(tmp_path, body_path)
+        interaction = {
+            "key": key, "transport": transport, "method": method.upper(), "url": _public_url(url),
+            "status": status, "reason": reason, "elapsed": round(elapsed, 4), "body": digest,
+            "headers": [[k, v] for k, v in headers if k.lower() not in _DROPPED_RESPONSE_HEADERS],
+        }
+        with self._lock:
+            with open(self.index_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(interaction) + "\n")
+            self.recorded += 1
+
+    def play(self, method: str, url: str, key: str) -> tuple[dict, bytes]:
+        """
+        Return the next recorded interaction for a request and its body.
+
+        Raises:
+            CassetteMiss: If the request was never recorded.
+        """
+        with self._lock:
+            interactions = self._interactions.get(key)
+            if not interactions:
+                self.misses += 1
+                raise CassetteMiss(f"No recorded response for {method.upper()} {_public_url(url)} in {self.path}")
+            position = self._positions.get(key, 0)
+            # the recorded responses in order, the last one again when there are more calls
+            interaction = interactions[min(position, len(interactions) - 1)]
+            self._positions[key] = position + 1
+            self.played += 1
+        with open(os.path.join(self.bodies_dir, interaction["body"]), "rb") as f:
+            body = f.read()
+        if self.latency == "original":
+            time.sleep(interaction["elapsed"])
+        return interaction, body
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"mode": self.mode, "recorded": self.recorded, "played": self.played, "misses": self.misses}
+
+    def format_stats(self) -> str:
+        s = self.stats()
+        return (f"{s['mode']} {self.path}: {s['recorded']} responses recorded, {s['played']} replayed, "
+                f"{s['misses']} not found")
+
+
+_active: Optional[Cassette] = None
+_original_send = HTTPAdapter.send
+_original_open = urllib.request.OpenerDirector.open
+_install_lock = threading.Lock()
+
+
+# -- requests --
+
+def _replayed_response(adapter: HTTPAdapter, request, interaction: dict, body: bytes) -> requests.Response:
+    response = requests.Response()
+    response.status_code = interaction["status"]
+    response.reason = interaction["reason"]
+    response.headers = CaseInsensitiveDict(interaction["headers"])
+    response.headers["Content-Length"] = str(len(body))
+    response.encoding = get_encoding_from_headers(response.headers)
+    response._content = body
+    response._content_consumed = True
+    response.raw = io.BytesIO(body)
+    response.url = request.url
+    response.request = request
+    response.connection = adapter
+    response.elapsed = timedelta(seconds=interaction["elapsed"])
+    return response
+
+
+def _send(adapter: HTTPAdapter, request, **kwargs):
+    cassette = _active
+    if cassette is None:
+        return _original_send(adapter, request, **kwargs)
+    key = request_key(request.method, request.url, request.headers, request.body)
+    if cassette.mode == "replay":
+        interaction, body = cassette.play(request.method, request.url, key)
+        return _replayed_response(adapter, request, interaction, body)
+    start = time.perf_counter()
+    response = _original_send(adapter, request, **kwargs)
+    body = response.content  # reads streamed responses too, iter_content then serves the buffer
+    cassette.record("requests", request.method, request.url, key, response.status_code, response.reason or "",
+                    list(response.headers.items()), body, time.perf_counter() - start)
+    return response
+
+
+# -- urllib --
+
+def _urllib_response(url: str, status: int, reason: str, headers: list, body: bytes):
+    message = HTTPMessage()
+    for name, value in headers:
+        message[name] = value
+    message["Content-Length"] = str(len(body))
+    if status >= 400:
+        return urllib.error.HTTPError(url, status, reason, message, io.BytesIO(body))
+    return addinfourl(io.BytesIO(body), message, url, status)
+
+
+def _open(opener: urllib.request.OpenerDirector, fullurl, data=None, timeout=None, **kwargs):
+    cassette = _active
+    call_kwargs = dict(kwargs, **({"timeout": timeout} if timeout is not None else {}))
+    if cassette is None:
+        return _original_open(opener, fullurl, data, **call_kwargs)
+    request = fullurl if isinstance(fullurl, urllib.request.Request) else urllib.request.Request(fullurl)
+    if data is not None:
+        request.data = data
+    url, method = request.full_url, request.get_method()
+    key = request_key(method, url, dict(request.header_items()), request.data)
+    if cassette.mode == "replay":
+        interaction, body = cassette.play(method, url, key)
+        response = _urllib_response(url, interaction["status"], interaction["reason"], interaction["headers"], body)
+        if isinstance(response, urllib.error.HTTPError):
+            raise response
+        return response
+    start = time.perf_counter()
+    try:
+        response = _original_open(opener, request, None, **call_kwargs)
+    except urllib.error.HTTPError as e:
+        body = e.read()
+        cassette.record("urllib", method, url, key, e.code, str(e.reason), list(e.headers.items()), body,
+                        time.perf_counter() - start)
+        raise _urllib_response(url, e.code, str(e.reason), list(e.headers.items()), body) from None
+    body = response.read()
+    headers = list(response.headers.items())
+    cassette.record("urllib", method, url, key, response.status, response.reason or "", headers, body,
+                    time.perf_counter() - start)
+    return _urllib_response(response.geturl(), response.status, response.reason or "", headers, body)
+
+
+def install(path: str, mode: str, latency: str = CASSETTE_LATENCY) -> Cassette:
+    """
+    Route all HTTP calls of the process through a cassette.
+
+    Args:
+        path (str): Directory of the cassette.
+        mode (str): 'record' or 'replay'.
+        latency (str): 'original' or 'zero' (replay only).
+
+    Returns:
+        Cassette: The active cassette (for its stats).
+    """
+    global _active
+    cassette = Cassette(path, mode, latency)
+    with _install_lock:
+        HTTPAdapter.send = _send
+        urllib.request.OpenerDirector.open = _open
+        _active = cassette
+    print(f"Cassette {mode}: {path}")
+    return cassette
+
+
+def uninstall() -> None:
+    """Restore the normal network access."""
+    global _active
+    with _install_lock:
+        _active = None
+        HTTPAdapter.send = _original_send
+        urllib.request.OpenerDirector.open = _original_open
+
+
+def install_from_env() -> Optional[Cassette]:
+    """Install the cassette from CASSETTE_MODE/CASSETTE_PATH/CASSETTE_LATENCY, unless the mode is 'off'."""
+    if CASSETTE_MODE == "off":
+        return None
+    return install(CASSETTE_PATH, CASSETTE_MODE, CASSETTE_LATENCY)
+
+
+def active_cassette() -> Optional[Cassette]:
+    return _active
+
+
+@contextmanager
+def use_cassette(path: str, mode: str, latency: str = CASSETTE_LATENCY):
+    """Context manager around install() and uninstall()."""
+    cassette = install(path, mode, latency)
+    try:
+        yield cassette
+    finally:
+        uninstall()
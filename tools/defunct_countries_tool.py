@@ -6,6 +6,8 @@ LangChain Tool for fetching defunct countries and their dates.
 from langchain.agents import Tool
 import json
 
+from tools.registry import tool_description
+
 def get_defunct_countries(_: str = "") -> str:
     """Returns a JSON-formatted list of countries that no longer exist.
 
@@ -43,7 +45,7 @@ def get_defunct_countries(_: str = "") -> str:
 defunct_countries_tool = Tool(
     name="get_defunct_countries",
     func=get_defunct_countries,
-    description="Returns a JSON-formatted list of countries that no longer exist, including their dissolution dates and successors."
+    description=tool_description("get_defunct_countries")
 )
 
 if __name__ == "__main__":
@@ -0,0 +1,308 @@
+"""
+document_extraction.py
+Text extraction from PDF and DOCX files.
+PDFs are opened lazily with pypdf, so only the requested pages are parsed; the
+text layers of many pages are extracted in parallel on a process pool, and only
+pages without a text layer (scans) go through OCR. DOCX files are read with the
+standard library (the document XML), split into pages at page breaks.
+Every page is cached by file hash and page number.
+"""
+
+import csv
+import hashlib
+import io
+import multiprocessing
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+from xml.etree import ElementTree
+
+DOCUMENT_CACHE_DIR = os.getenv("DOCUMENT_CACHE_DIR", os.path.join(tempfile.gettempdir(), "agent_document_cache"))
+DOCUMENT_WORKERS = int(os.getenv("DOCUMENT_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Fewer pages are extracted in the calling process, the pool start is not worth it
+DOCUMENT_PARALLEL_MIN_PAGES = 8
+# Pages with less text than this (after stripping) are treated as scans
+MIN_TEXT_CHARS = 25
+# Bump when the extraction changes, so cached pages are not used any more
+_EXTRACTOR_VERSION = 1
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+
+def parse_page_range(pages: Optional[str], page_count: int) -> list[int]:
+    """
+    Parse a page selection like '3-5', '1,4,7-9' or '10-' (1-based, inclusive).
+
+    Args:
+        pages (str, optional): The selection; all pages if None or empty.
+        page_count (int): Number of pages of the document.
+
+    Returns:
+        list[int]: Sorted page numbers without duplicates.
+
+    Raises:
+        ValueError: If the selection is invalid or outside the document.
+    """
+    if not pages or not str(pages).strip():
+        return list(range(1, page_count + 1))
+    selected = set()
+    for part in str(pages).replace(" ", "").split(","):
+        match = re.fullmatch(r"(\d+)(?:-(\d*))?", part)
+        if not match:
+            raise ValueError(f"Invalid page range {part!r}, expected e.g. '3-5' or '1,4,7-9'")
+        first = int(match.group(1))
+        last = first if match.group(2) is None else int(match.group(2) or page_count)
+        if first < 1 or last < first:
+            raise ValueError(f"Invalid page range {part!r}")
+        if first > page_count:
+            raise ValueError(f"Page {first} does not exist, the document has {page_count} pages")
+        selected.update(range(first, min(last, page_count) + 1))
+    return sorted(selected)
+
+
+def format_page_range(page_numbers: list[int]) -> str:
+    """
+    Write page numbers as a selection for parse_page_range, e.g. [1, 4, 7, 8, 9] -> '1,4,7-9'.
+
+    Args:
+        page_numbers (list[int]): 1-based page numbers.
+
+    Returns:
+        str: Comma separated pages and ranges of consecutive pages.
+    """
+    parts = []
+    for page in sorted(set(page_numbers)):
+        if parts and parts[-1][1] == page - 1:
+            parts[-1][1] = page
+        else:
+            parts.append([page, page])
+    return ",".join(str(first) if first == last else f"{first}-{last}" for first, last in parts)
+
+
+# -- PDF --
+
+def _pdf_reader(path: str):
+    from pypdf import PdfReader
+
+    return PdfReader(path)
+
+
+def _extract_pdf_pages(path: str, pages: list[int]) -> list[tuple[int, str]]:
+    """Text layer of some pages; runs in the worker processes."""
+    reader = _pdf_reader(path)
+    return [(page, reader.pages[page - 1].extract_text() or "") for page in pages]
+
+
+def _pdf_page_image(reader, page: int):
+    """Largest image on a page (the scan of a scanned page), or None."""
+    images = []
+    for image in reader.pages[page - 1].images:
+        try:
+            images.append(image.image)
+        except Exception as e:
+            print(f"Could not decode image on page {page}: {str(e)}")
+    images = [image for image in images if image is not None]
+    return max(images, key=lambda image: image.width * image.height) if images else None
+
+
+# -- DOCX --
+
+def _docx_paragraph(paragraph, pages: list[list[str]]) -> None:
+    """Append the text of a paragraph, starting new pages at page breaks."""
+    text = []
+    for node in paragraph.iter():
+        if node.tag == f"{_W}t":
+            text.append(node.text or "")
+        elif node.tag == f"{_W}tab":
+            text.append("\t")
+        elif node.tag == f"{_W}br" and node.get(f"{_W}type") != "page":
+            text.append("\n")
+        elif node.tag == f"{_W}lastRenderedPageBreak" or (node.tag == f"{_W}br" and node.get(f"{_W}type") == "page"):
+            if "".join(text).strip() or any(line.strip() for line in pages[-1]):
+                pages[-1].append("".join(text))
+                pages.append([])
+                text = []
+    pages[-1].append("".join(text))
+
+
+def _docx_table(table) -> str:
+    out = io.StringIO()
+    writer = csv.writer(out, lineterminator="\n")
+    for row in table.iter(f"{_W}tr"):
+        writer.writerow([" ".join("".join(t.text or "" for t in cell.iter(f"{_W}t")).split())
+                         for cell in row.iter(f"{_W}tc")])
+    return out.getvalue().rstrip("\n")
+
+
+def _docx_pages(path: str) -> list[str]:
+    """Text of a DOCX file per page (as last rendered by Word, or split at manual page breaks)."""
+    with zipfile.ZipFile(path) as archive:
+        root = ElementTree.fromstring(archive.read("word/document.xml"))
+    body = root.find(f"{_W}body")
+    pages: list[list[str]] = [[]]
+    for element in body if body is not None else []:
+        if element.tag == f"{_W}p":
+            _docx_paragraph(element, pages)
+        elif element.tag == f"{_W}tbl":
+            pages[-1].append(_docx_table(element))
+    return ["\n".join(line for line in page if line.strip()) for page in pages]
+
+
+# -- cache --
+
+class DocumentCache:
+    """SQLite cache of extracted pages, keyed by file hash and page number."""
+
+    def __init__(self, cache_dir: str = DOCUMENT_CACHE_DIR):
+        os.makedirs(cache_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(cache_dir, "documents.sqlite"), check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS pages (
+                    file_hash TEXT NOT NULL,
+                    page INTEGER NOT NULL,
+                    version INTEGER NOT NULL,
+                    text TEXT NOT NULL,
+                    source TEXT NOT NULL,
+                    PRIMARY KEY (file_hash, page, version)
+                )
+                """
+            )
+
+    def get(self, file_hash: str, pages: list[int]) -> dict[int, tuple[str, str]]:
+        """Cached pages as {page: (text, source)}."""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT page, text, source FROM pages WHERE file_hash = ? AND version = ? "
+                f"AND page IN ({','.join('?' * len(pages))})",
+                (file_hash, _EXTRACTOR_VERSION, *pages),
+            ).fetchall()
+        return {page: (text, source) for page, text, source in rows}
+
+    def put(self, file_hash: str, page: int, text: str, source: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?)",
+                               (file_hash, page, _EXTRACTOR_VERSION, text, source))
+
+
+_cache: Optional[DocumentCache] = None
+_executor: Optional[ProcessPoolExecutor] = None
+_lock = threading.Lock()
+
+
+def get_document_cache() -> DocumentCache:
+    """Return the process-wide document cache."""
+    global _cache
+    with _lock:
+        if _cache is None:
+            _cache = DocumentCache()
+        return _cache
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=DOCUMENT_WORKERS,
+                                            mp_context=multiprocessing.get_context("spawn"))
+        return _executor
+
+
+def _file_hash(path: str) -> str:
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+def _text_layers(path: str, pages: list[int]) -> dict[int, str]:
+    """Text layer of the pages, split over the process pool when there are many."""
+    if len(pages) < DOCUMENT_PARALLEL_MIN_PAGES or DOCUMENT_WORKERS < 2:
+        return dict(_extract_pdf_pages(path, pages))
+    size = -(-len(pages) // DOCUMENT_WORKERS)
+    chunks = [pages[i:i + size] for i in range(0, len(pages), size)]
+    executor = _get_executor()
+    texts = {}
+    for result in executor.map(_extract_pdf_pages, [path] * len(chunks), chunks):
+        texts.update(result)
+    return texts
+
+
+def _ocr_pages(reader, pages: list[int]) -> dict[int, tuple[str, str]]:
+    """OCR the scans of image-only pages; pages without an image or OCR engine stay empty."""
+    from tools.ocr_pipeline import OcrUnavailable, recognize_images
+
+    images = {page: _pdf_page_image(reader, page) for page in pages}
+    scanned = [page for page, image in images.items() if image is not None]
+    results = {page: ("", "empty") for page in pages}
+    if not scanned:
+        return results
+    try:
+        texts = recognize_images([images[page] for page in scanned])
+    except OcrUnavailable as e:
+        print(f"OCR of scanned pages not possible: {str(e)}")
+        return {page: ("[scanned page, OCR not available]", "scan") if page in scanned else result
+                for page, result in results.items()}
+    for page, text in zip(scanned, texts):
+        results[page] = (text, "ocr")
+    return results
+
+
+def extract_document(path: str, pages: Optional[str] = None, ocr: bool = True,
+                     cache: Optional[DocumentCache] = None) -> dict:
+    """
+    Extract the text of (some pages of) a PDF or DOCX file.
+
+    Args:
+        path (str): Path to the document.
+        pages (str, optional): Page selection like '3-5' or '1,4,7-9'; all pages if None.
+        ocr (bool): OCR pages without a text layer.
+        cache (DocumentCache, optional): Page cache, defaults to the shared cache.
+
+    Returns:
+        dict: 'page_count' and 'pages', a list of dicts with 'page' (1-based),
+        'text' and 'source' ('text', 'ocr', 'scan', 'empty' or 'docx').
+    """
+    cache = cache or get_document_cache()
+    file_hash = _file_hash(path)
+    is_docx = path.lower().endswith(".docx")
+
+    if is_docx:
+        docx_pages = _docx_pages(path)
+        count = len(docx_pages)
+    else:
+        reader = _pdf_reader(path)
+        count = len(reader.pages)
+    selected = parse_page_range(pages, count)
+
+    results = cache.get(file_hash, selected)
+    missing = [page for page in selected if page not in results]
+    if missing and is_docx:
+        for page in missing:
+            results[page] = (docx_pages[page - 1], "docx")
+    elif missing:
+        texts = _text_layers(path, missing)
+        scans = [page for page in missing if len(texts[page].strip()) < MIN_TEXT_CHARS]
+        for page in missing:
+            if page not in scans:
+                results[page] = (texts[page], "text")
+        if scans and ocr:
+            results.update(_ocr_pages(reader, scans))
+        elif scans:
+            results.update({page: (texts[page], "scan") for page in scans})
+    for page in missing:
+        text, source = results[page]
+        if source != "scan":  # retried when an OCR engine is available
+            cache.put(file_hash, page, text, source)
+
+    return {"page_count": count,
+            "pages": [{"page": page, "text": results[page][0], "source": results[page][1]} for page in selected]}
@@ -3,52 +3,37 @@ download_tool.py
 LangChain Tool for downloading files from a given URL.
 This tool allows you to download files from the internet and save them locally.
 It can be used in various applications, such as downloading datasets, images, or any other files.
+
+Downloads go through the shared file cache (file_cache.py), so a URL that was
+already downloaded is not fetched again.
 """
 
 
-import requests
 from langchain.agents import Tool
 
+from tools import file_cache
+from tools.registry import tool_description
+
 from typing import Optional
 import os
-from urllib.parse import urlparse
-import tempfile
 
 
 def download_file(url: str, filename: Optional[str] = None) -> str:
     """
-    Download a file from a URL and save it to a temporary location.
+    Download a file from a URL into the file cache.
 
     Args:
         url: The URL to download from
-        filename: Optional filename, will generate one based on URL if not provided
+        filename: Optional filename, its extension is kept for the cached file
 
     Returns:
         Path to the downloaded file
     """
 
     try:
-        # Parse URL to get filename if not provided
-        if not filename:
-            path = urlparse(url).path
-            filename = os.path.basename(path)
-            if not filename:
-                # Generate a random name if we couldn't extract one
-                import uuid
-                filename = f"downloaded_{uuid.uuid4().hex[:8]}"
-
-        # Create temporary file
-        temp_dir = tempfile.gettempdir()
-        filepath = os.path.join(temp_dir, filename)
-
-        # Download the file
-        response = requests.get(url, stream=True)
-        response.raise_for_status()
-
-        # Save the file
-        with open(filepath, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
+        # Strip quotes the LLM sometimes adds around the URL
+        url = url.strip().strip("'\"")
+        filepath = file_cache.download(url, filename=filename)
 
         return f"File downloaded to {filepath}. You can now process this file."
     except Exception as e:
@@ -58,7 +43,7 @@ def download_file(url: str, filename: Optional[str] = None) -> str:
 download_tool = Tool(
     name="download_file",
     func=download_file,
-    description="Lädt eine Datei von einer gegebenen URL herunter und speichert sie lokal."
+    description=tool_description("download_file")
 )
 
 if __name__ == "__main__":
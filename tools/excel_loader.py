@@ -0,0 +1,202 @@
+"""
+excel_loader.py
+Fast loading of Excel workbooks for the analysis tools.
+Workbooks are opened with openpyxl in read-only (streaming) mode: the sheet list
+and dimensions come from the workbook metadata without reading cell data, and
+only the requested sheet and column range is parsed. Every parsed sheet is
+stored in a columnar sidecar file (Parquet; JSON with the table schema if
+pyarrow is missing) keyed by the SHA-256 of the workbook, so later calls skip the
+XLSX parsing entirely. No pickle: the cache directory is shared, and loading a
+planted pickle would run its code.
+"""
+
+import hashlib
+import importlib.util
+import io
+import json
+import os
+import re
+import tempfile
+import threading
+from typing import Optional, Union
+
+import pandas as pd
+
+EXCEL_CACHE_DIR = os.getenv("EXCEL_CACHE_DIR", os.path.join(tempfile.gettempdir(), "agent_excel_cache"))
+# Bump when the parsing changes, so old sidecars are not used any more
+_SIDECAR_VERSION = 1
+
+# openpyxl can stream these formats, older .xls files go through pandas (xlrd)
+STREAMING_EXTENSIONS = (".xlsx", ".xlsm")
+
+_hashes: dict[tuple, str] = {}
+_sheet_lists: dict[str, list[dict]] = {}
+_lock = threading.Lock()
+
+
+def _sidecar_format() -> str:
+    return "parquet" if importlib.util.find_spec("pyarrow") else "json"
+
+
+def file_hash(path: str) -> str:
+    """SHA-256 of a file, cached by (path, size, mtime)."""
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    with _lock:
+        if key in _hashes:
+            return _hashes[key]
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            sha.update(block)
+    with _lock:
+        _hashes[key] = sha.hexdigest()
+    return _hashes[key]
+
+
+def _is_streaming(path: str) -> bool:
+    return path.lower().endswith(STREAMING_EXTENSIONS)
+
+
+def list_sheets(file_path: str) -> list[dict]:
+    """
+    List the sheets of a workbook without loading their cells.
+
+    Args:
+        file_path (str): Path to the Excel file.
+
+    Returns:
+        list[dict]: One dict per sheet with 'name', 'dimensions' (e.g. 'A1:D120'),
+        'rows' and 'columns' (None if the workbook does not store its dimensions).
+    """
+    digest = file_hash(file_path)
+    if digest in _sheet_lists:
+        return _sheet_lists[digest]
+
+    if not _is_streaming(file_path):
+        with pd.ExcelFile(file_path) as workbook:
+            sheets = [{"name": name, "dimensions": None, "rows": None, "columns": None}
+                      for name in workbook.sheet_names]
+    else:
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            sheets = []
+            for worksheet in workbook.worksheets:
+                rows, columns = worksheet.max_row, worksheet.max_column
+                dimensions = worksheet.calculate_dimension() if rows and columns else None
+                sheets.append({"name": worksheet.title, "dimensions": dimensions, "rows": rows, "columns": columns})
+        finally:
+            workbook.close()
+    _sheet_lists[digest] = sheets
+    return sheets
+
+
+def _column_range(usecols: Optional[str]) -> tuple[Optional[int], Optional[int]]:
+    """Column numbers (1-based) of an Excel column range like 'B:D' or 'C'."""
+    if not usecols:
+        return None, None
+    from openpyxl.utils import column_index_from_string
+
+    match = re.fullmatch(r"\s*([A-Za-z]{1,3})\s*(?::\s*([A-Za-z]{1,3})\s*)?", usecols)
+    if not match:
+        raise ValueError(f"Invalid column range {usecols!r}, expected e.g. 'B:D'")
+    first = column_index_from_string(match.group(1).upper())
+    last = column_index_from_string((match.group(2) or match.group(1)).upper())
+    if last < first:
+        raise ValueError(f"Invalid column range {usecols!r}")
+    return first, last
+
+
+def _parse_sheet(file_path: str, sheet_name: str, usecols: Optional[str]) -> pd.DataFrame:
+    """Stream the rows of one sheet; the first row is the header, like pd.read_excel."""
+    if not _is_streaming(file_path):
+        return pd.read_excel(file_path, sheet_name=sheet_name, usecols=usecols)
+
+    from openpyxl import load_workbook
+
+    min_col, max_col = _column_range(usecols)
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        worksheet = workbook[sheet_name]
+        rows = worksheet.iter_rows(min_col=min_col, max_col=max_col, values_only=True)
+        header = next(rows, ())
+        data = [row for row in rows]
+    finally:
+        workbook.close()
+
+    # read-only sheets can report trailing empty rows and columns
+    while data and all(value is None for value in data[-1]):
+        data.pop()
+    width = len(header)
+    while width and header[width - 1] is None and all(len(row) < width or row[width - 1] is None for row in data):
+        width -= 1
+    columns = [str(name) if name is not None else f"Unnamed: {i}" for i, name in enumerate(header[:width])]
+    df = pd.DataFrame([row[:width] for row in data], columns=columns)
+    return df.infer_objects()
+
+
+def _sidecar_path(file_path: str, sheet_name: str, usecols: Optional[str]) -> str:
+    key = f"{_SIDECAR_VERSION}\0{sheet_name}\0{(usecols or '').upper().replace(' ', '')}"
+    name = hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(EXCEL_CACHE_DIR, file_hash(file_path), f"{name}.{_sidecar_format()}")
+
+
+def _read_sidecar(path: str) -> pd.DataFrame:
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path)
+    with open(path, encoding="utf-8") as f:
+        sidecar = json.load(f)
+    df = pd.read_json(io.StringIO(json.dumps(sidecar["table"])), orient="table")
+    # the table schema does not keep e.g. the unit of datetimes
+    return df.astype(sidecar["dtypes"])
+
+
+def _write_sidecar(df: pd.DataFrame, path: str) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    try:
+        if path.endswith(".parquet"):
+            df.to_parquet(tmp_path, index=False)
+        else:
+            table = df.to_json(orient="table", index=False, date_format="iso", date_unit="ns")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"dtypes": {column: str(dtype) for column, dtype in df.dtypes.items()},
+                           "table": json.loads(table)}, f)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        # e.g. object columns with mixed types that Parquet cannot store; the data is still returned
+        print(f"Could not cache sheet in {path}: {str(e)}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def load_sheet(file_path: str, sheet_name: Optional[Union[str, int]] = None,
+               usecols: Optional[str] = None) -> pd.DataFrame:
+    """
+    Load one sheet of a workbook, from the sidecar cache if it was parsed before.
+
+    Args:
+        file_path (str): Path to the Excel file.
+        sheet_name (str or int, optional): Sheet name or 0-based index; the first sheet if None.
+        usecols (str, optional): Excel column range to load, e.g. 'B:D'.
+
+    Returns:
+        pd.DataFrame: The sheet with the first row as header.
+    """
+    if sheet_name is None or isinstance(sheet_name, int):
+        names = [sheet["name"] for sheet in list_sheets(file_path)]
+        sheet_name = names[sheet_name or 0]
+
+    path = _sidecar_path(file_path, sheet_name, usecols)
+    if os.path.isfile(path):
+        return _read_sidecar(path)
+    df = _parse_sheet(file_path, sheet_name, usecols)
+    _write_sidecar(df, path)
+    return df
+
+
+def load_workbook_sheets(file_path: str) -> dict[str, pd.DataFrame]:
+    """Load all sheets of a workbook, like pd.read_excel(file_path, sheet_name=None)."""
+    return {sheet["name"]: load_sheet(file_path, sheet["name"]) for sheet in list_sheets(file_path)}
@@ -2,6 +2,10 @@
 extrace_audio_from_youtube_tool.py
 LangChain Tool for extracting audio from YouTube videos using pytubefix.
 This tool allows you to extract audio from YouTube videos and save it in a specified format.
+
+get_youtube_transcript returns the caption track of a video when it has one and only
+falls back to downloading and transcribing the audio when it does not. Downloaded
+audio is cached by video ID, so a video is never downloaded twice.
 """
 
 import os
@@ -11,12 +15,94 @@ from pytubefix import YouTube
 import tempfile
 
 import re
+import threading
 import uuid
 
+from tools.registry import tool_description
+
+
+YOUTUBE_AUDIO_CACHE_DIR = os.getenv("YOUTUBE_AUDIO_CACHE_DIR", os.path.join(tempfile.gettempdir(), "youtube_audio"))
+
+# Preferred caption languages, manual tracks are preferred over auto-generated ones ("a.<lang>")
+CAPTION_LANGUAGES = ["en"]
+
+_video_locks = {}
+_video_locks_lock = threading.Lock()
+
+_VIDEO_ID_PATTERN = re.compile(r"(?:v=|youtu\.be/|shorts/|embed/|live/)([A-Za-z0-9_-]{11})")
+
+
+def extract_video_id(url: str) -> str:
+    """
+    Return the 11 character video ID of a YouTube URL.
+
+    Raises:
+        ValueError: If the URL does not contain a video ID.
+    """
+    match = _VIDEO_ID_PATTERN.search(url)
+    if not match:
+        raise ValueError(f"No YouTube video ID found in {url}")
+    return match.group(1)
+
+
+def _clean_url(url: str) -> str:
+    return re.sub(r'["\']', '', url).strip()
+
+
+def _video_lock(video_id: str) -> threading.Lock:
+    with _video_locks_lock:
+        return _video_locks.setdefault(video_id, threading.Lock())
+
+
+def _pick_caption(captions, languages: list[str]):
+    """Pick the best caption track: manual before auto-generated, in the order of `languages`."""
+    tracks = {caption.code: caption for caption in captions}
+    for language in languages:
+        for code in (language, f"a.{language}"):
+            if code in tracks:
+                return tracks[code]
+        for code, caption in tracks.items():
+            if code.split("-")[0] == language:
+                return caption
+    # any track is better than downloading the audio
+    return next(iter(tracks.values()), None)
+
+
+def srt_to_text(srt: str) -> str:
+    """Convert SRT captions to compact '[mm:ss] text' lines."""
+    lines = []
+    for block in re.split(r"\n\s*\n", srt.strip()):
+        parts = block.strip().splitlines()
+        if len(parts) < 3:
+            continue
+        hours, minutes, seconds = parts[1].split(" --> ")[0].split(",")[0].split(":")
+        minutes = int(hours) * 60 + int(minutes)
+        lines.append(f"[{minutes:02d}:{int(seconds):02d}] {' '.join(part.strip() for part in parts[2:])}")
+    return "\n".join(lines)
+
+
+def get_youtube_captions(url: str, languages: list[str] = None):
+    """
+    Return the captions of a YouTube video as timestamped text.
+
+    Args:
+        url (str): URL of the YouTube video.
+        languages (list[str], optional): Preferred language codes. Defaults to CAPTION_LANGUAGES.
+
+    Returns:
+        tuple: (caption code, text), or None if the video has no captions.
+    """
+    yt = YouTube(_clean_url(url))
+    caption = _pick_caption(yt.captions, languages or CAPTION_LANGUAGES)
+    if caption is None:
+        return None
+    return caption.code, srt_to_text(caption.generate_srt_captions())
+
 
 def extract_audio_from_youtube(url: str) -> str:
     """
     Extract audio from a YouTube video and save it in the specified format.
+    The audio is cached by video ID; a cached video is not downloaded again.
 
     Args:
         url (str): URL of the YouTube video.
@@ -26,29 +112,69 @@ def extract_audio_from_youtube(url: str) -> str:
         str: Path to the saved audio file.
     """
     try:
-        # Create a YouTube object
-        youtube_url = re.sub(r'"', '', url)
-        yt = YouTube(youtube_url)
+        youtube_url = _clean_url(url)
+        video_id = extract_video_id(youtube_url)
+        out_path = os.path.join(YOUTUBE_AUDIO_CACHE_DIR, f"{video_id}.mp3")
 
-        # wähle den besten Audiostream
-        stream = yt.streams.filter(only_audio=True).order_by('abr').desc().first()
+        with _video_lock(video_id):
+            if os.path.isfile(out_path):
+                print(f"Using cached audio for video {video_id}.")
+                return f"{out_path}."
 
-        # lade in ein temporäres Verzeichnis
-        tmpdir = tempfile.mkdtemp()
-        filename = f"downloaded_{uuid.uuid4().hex[:8]}.mp3"
-        out_path = stream.download(output_path=tmpdir, filename=filename)
+            # Create a YouTube object
+            yt = YouTube(youtube_url)
 
+            # wähle den besten Audiostream
+            stream = yt.streams.filter(only_audio=True).order_by('abr').desc().first()
 
+            # erst unter temporärem Namen laden, damit der Cache nie halbe Dateien enthält
+            os.makedirs(YOUTUBE_AUDIO_CACHE_DIR, exist_ok=True)
+            filename = f"{video_id}_{uuid.uuid4().hex[:8]}.part"
+            tmp_path = stream.download(output_path=YOUTUBE_AUDIO_CACHE_DIR, filename=filename)
+            os.replace(tmp_path, out_path)
 
         return f"{out_path}."
     except Exception as e:
         return f"Error extracting audio: {str(e)}"
 
 
+def get_youtube_transcript(url: str) -> str:
+    """
+    Return the transcript of a YouTube video. Uses the caption track when the video
+    has one, otherwise downloads the audio (cached by video ID) and transcribes it.
+
+    Args:
+        url (str): URL of the YouTube video.
+
+    Returns:
+        str: The transcript, ended with [END OF TEXT].
+    """
+    try:
+        captions = get_youtube_captions(url)
+        if captions is not None:
+            code, text = captions
+            return f"Transcript from captions ({code}):\n{text}\n[END OF TEXT]"
+    except Exception as e:
+        print(f"Could not read captions, falling back to audio: {e}")
+
+    audio_path = extract_audio_from_youtube(url)
+    if audio_path.startswith("Error"):
+        return audio_path
+
+    from tools.extract_text_from_audio_tool import extract_text_from_audio
+    return extract_text_from_audio(audio_path.rstrip("."))
+
+
 extract_audio_from_youtube_tool = Tool(
     name="extract_audio_from_youtube",
     func=extract_audio_from_youtube,
-    description="Extract audio from a YouTube video and save it in the specified format. Provide the URL of the YouTube video. The audio will be saved in a temporary directory."
+    description=tool_description("extract_audio_from_youtube")
+)
+
+youtube_transcript_tool = Tool(
+    name="get_youtube_transcript",
+    func=get_youtube_transcript,
+    description=tool_description("get_youtube_transcript")
 )
 
 if __name__ == "__main__":
@@ -66,7 +192,7 @@ if __name__ == "__main__":
         openai_api_base="https://api.openai.com/v1",
     )
     agent = initialize_agent(
-        tools=[extract_audio_from_youtube_tool, extract_text_from_audio_tool],
+        tools=[youtube_transcript_tool, extract_audio_from_youtube_tool, extract_text_from_audio_tool],
         llm=llm,
         agent_type=AgentType.ZERO_SHOT_REACT_DESCRIPTION,
         verbose=True,
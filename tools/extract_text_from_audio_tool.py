@@ -2,12 +2,253 @@
 extract_text_from_audio.py
 LangChain Tool for extracting text from audio files using Whisper.
 This tool allows you to extract text from audio files using Whisper.
+
+The Whisper model is loaded once per process and reused. Transcripts are cached
+by the SHA-256 of the audio file, so asking about the same recording again is
+instant. Long recordings are split on silence and the segments are transcribed
+in parallel on a process pool; the result is stitched with timestamps.
 """
 
 
 import os
+import hashlib
+import json
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+
+import numpy as np
 from langchain.agents import Tool
-import whisper
+
+from tools.registry import tool_description
+
+
+WHISPER_MODEL_SIZE = os.getenv("WHISPER_MODEL_SIZE", "base")
+TRANSCRIPT_CACHE_DIR = os.getenv("TRANSCRIPT_CACHE_DIR", os.path.join(tempfile.gettempdir(), "whisper_transcripts"))
+
+# Audio longer than this is transcribed in segments on the process pool
+LONG_AUDIO_SECONDS = float(os.getenv("WHISPER_LONG_AUDIO_SECONDS", "600"))
+LONG_AUDIO_WORKERS = int(os.getenv("WHISPER_WORKERS", str(max(1, min(4, (os.cpu_count() or 2) // 2)))))
+
+# whisper.audio.SAMPLE_RATE; whisper itself is only imported when a model or audio file is loaded
+SAMPLE_RATE = 16000
+FRAME_SECONDS = 0.03
+SILENCE_DB_BELOW_PEAK = 35.0
+MIN_SILENCE_SECONDS = 0.5
+MIN_SEGMENT_SECONDS = 20.0
+MAX_SEGMENT_SECONDS = 60.0
+
+_models = {}
+_model_lock = threading.Lock()
+# whisper installs decoding hooks on the model, so one transcription per model at a time
+_transcribe_locks = {}
+
+_transcripts = {}
+_transcripts_lock = threading.Lock()
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_whisper_model(size: str = None):
+    """
+    Return the process-wide Whisper model of the given size, loading it on first use.
+
+    Args:
+        size (str, optional): Model size (tiny, base, small, ...). Defaults to WHISPER_MODEL_SIZE.
+    """
+    size = size or WHISPER_MODEL_SIZE
+    if size not in _models:
+        with _model_lock:
+            if size not in _models:
+                import whisper
+
+                print(f"Loading Whisper model '{size}'...")
+                _models[size] = whisper.load_model(size)
+                _transcribe_locks[size] = threading.Lock()
+    return _models[size]
+
+
+def preload_whisper_model(size: str = None) -> None:
+    """Load the Whisper model ahead of the first audio question (e.g. at app startup)."""
+    get_whisper_model(size)
+
+
+def load_audio(path: str) -> np.ndarray:
+    """Decode an audio file to mono SAMPLE_RATE samples (with ffmpeg, through whisper)."""
+    import whisper
+
+    return whisper.load_audio(path, sr=SAMPLE_RATE)
+
+
+def _file_hash(path: str) -> str:
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+def _cache_path(key: str) -> str:
+    return os.path.join(TRANSCRIPT_CACHE_DIR, f"{key}.json")
+
+
+def _get_cached_transcript(key: str):
+    with _transcripts_lock:
+        if key in _transcripts:
+            return _transcripts[key]
+    try:
+        with open(_cache_path(key), "r", encoding="utf-8") as f:
+            text = json.load(f)["text"]
+    except (OSError, ValueError, KeyError):
+        return None
+    with _transcripts_lock:
+        _transcripts[key] = text
+    return text
+
+
+def _put_cached_transcript(key: str, text: str) -> None:
+    with _transcripts_lock:
+        _transcripts[key] = text
+    try:
+        os.makedirs(TRANSCRIPT_CACHE_DIR, exist_ok=True)
+        tmp_path = _cache_path(key) + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"text": text}, f)
+        os.replace(tmp_path, _cache_path(key))
+    except OSError as e:
+        print(f"Could not write transcript cache: {e}")
+
+
+def _format_timestamp(seconds: float) -> str:
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours:d}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes:02d}:{seconds:02d}"
+
+
+def split_on_silence(audio: np.ndarray, sample_rate: int = SAMPLE_RATE) -> list[tuple[int, int]]:
+    """
+    Split audio into segments of MIN_SEGMENT_SECONDS to MAX_SEGMENT_SECONDS, cutting in silent parts.
+
+    Args:
+        audio (np.ndarray): Mono audio samples.
+        sample_rate (int): Samples per second.
+
+    Returns:
+        list of (start, end) sample indices covering the whole audio.
+    """
+    frame = max(1, int(FRAME_SECONDS * sample_rate))
+    n_frames = len(audio) // frame
+    if n_frames == 0:
+        return [(0, len(audio))]
+
+    frames = audio[:n_frames * frame].reshape(n_frames, frame).astype(np.float64)
+    db = 20 * np.log10(np.sqrt(np.mean(frames ** 2, axis=1)) + 1e-10)
+    silent = db < db.max() - SILENCE_DB_BELOW_PEAK
+
+    # Candidate cut points: middle of every silent run that is long enough
+    cuts = []
+    min_run = int(MIN_SILENCE_SECONDS / FRAME_SECONDS)
+    run_start = None
+    for i, is_silent in enumerate(np.append(silent, False)):
+        if is_silent and run_start is None:
+            run_start = i
+        elif not is_silent and run_start is not None:
+            if i - run_start >= min_run:
+                cuts.append(((run_start + i) // 2) * frame)
+            run_start = None
+
+    segments = []
+    start = 0
+    min_len = int(MIN_SEGMENT_SECONDS * sample_rate)
+    max_len = int(MAX_SEGMENT_SECONDS * sample_rate)
+    while len(audio) - start > max_len:
+        candidates = [cut for cut in cuts if start + min_len <= cut <= start + max_len]
+        end = candidates[-1] if candidates else start + max_len
+        segments.append((start, end))
+        start = end
+    segments.append((start, len(audio)))
+    return segments
+
+
+def _init_worker(size: str) -> None:
+    get_whisper_model(size)
+
+
+def _transcribe_segment(args) -> list[dict]:
+    samples, size = args
+    result = get_whisper_model(size).transcribe(samples)
+    return [{"start": s["start"], "end": s["end"], "text": s["text"].strip()} for s in result["segments"]]
+
+
+def _get_pool(size: str, workers: int) -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(size,),
+            )
+        return _pool
+
+
+def transcribe_long_audio(audio: np.ndarray, size: str = None, workers: int = LONG_AUDIO_WORKERS) -> str:
+    """
+    Transcribe long audio in parallel segments and stitch the text with timestamps.
+
+    Args:
+        audio (np.ndarray): Mono 16 kHz samples as returned by load_audio.
+        size (str, optional): Whisper model size.
+        workers (int): Number of worker processes.
+
+    Returns:
+        str: One line per Whisper segment, prefixed with [start - end].
+    """
+    size = size or WHISPER_MODEL_SIZE
+    segments = split_on_silence(audio)
+    pool = _get_pool(size, workers)
+    results = pool.map(_transcribe_segment, [(audio[start:end], size) for start, end in segments])
+
+    lines = []
+    for (start, _), parts in zip(segments, results):
+        offset = start / SAMPLE_RATE
+        for part in parts:
+            if part["text"]:
+                lines.append(f"[{_format_timestamp(offset + part['start'])} - {_format_timestamp(offset + part['end'])}] {part['text']}")
+    return "\n".join(lines)
+
+
+def transcribe_audio(audio_path: str, size: str = None) -> str:
+    """
+    Transcribe an audio file, using the transcript cache and the long-audio mode when needed.
+
+    Args:
+        audio_path (str): Path to the audio file.
+        size (str, optional): Whisper model size.
+
+    Returns:
+        str: The transcript.
+    """
+    size = size or WHISPER_MODEL_SIZE
+    key = f"{_file_hash(audio_path)}_{size}"
+    cached = _get_cached_transcript(key)
+    if cached is not None:
+        print(f"Using cached transcript for {audio_path}.")
+        return cached
+
+    audio = load_audio(audio_path)
+    if len(audio) / SAMPLE_RATE > LONG_AUDIO_SECONDS and LONG_AUDIO_WORKERS > 1:
+        text = transcribe_long_audio(audio, size=size)
+    else:
+        model = get_whisper_model(size)
+        with _transcribe_locks[size]:
+            text = model.transcribe(audio)["text"]
+
+    _put_cached_transcript(key, text)
+    return text
 
 
 def extract_text_from_audio(audio_path: str) -> str:
@@ -21,12 +262,12 @@ def extract_text_from_audio(audio_path: str) -> str:
         str: Extracted text from the audio.
     """
     try:
-        # Load the Whisper model
-        model = whisper.load_model("base")
+        audio_path = audio_path.strip().strip("'\"")
+        if not os.path.isfile(audio_path):
+            raise FileNotFoundError(audio_path)
 
-        # Transcribe the audio file
-        result = model.transcribe(audio_path)
-        return "Extracted text: " + result["text"] + "\n" + "[END OF TEXT]"
+        text = transcribe_audio(audio_path)
+        return "Extracted text: " + text + "\n" + "[END OF TEXT]"
     except FileNotFoundError:
         return f"Error: The file {audio_path} was not found."
     except Exception as e:
@@ -35,7 +276,7 @@ def extract_text_from_audio(audio_path: str) -> str:
 extract_text_from_audio_tool = Tool(
     name="extract_text_from_audio",
     func=extract_text_from_audio,
-    description="Extract text from an audio file using Whisper. Provide the path to the audio file. The Text will be returned in a string format and ended with [END OF TEXT]."
+    description=tool_description("extract_text_from_audio")
 )
 
 if __name__ == "__main__":
@@ -62,4 +303,3 @@ if __name__ == "__main__":
     query = "Hi, I'm making a pie but I could use some help with my shopping list. I have everything I need for the crust, but I'm not sure about the filling. I got the recipe from my friend Aditi, but she left it as a voice memo and the speaker on my phone is buzzing so I can't quite make out what she's saying. Could you please listen to the recipe and list all of the ingredients that my friend described? I only want the ingredients for the filling, as I have everything I need to make my favorite pie crust. I've attached the recipe as Strawberry pie.mp3.\n\nIn your response, please only list the ingredients, not any measurements. So if the recipe calls for \"a pinch of salt\" or \"two cups of ripe strawberries\" the ingredients on the list would be \"salt\" and \"ripe strawberries\".\n\nPlease format your response as a comma separated list of ingredients. Also, please alphabetize the ingredients. \n\nThanks so much for your help! I really appreciate it.\n\nFile:" + audio_path
     result = agent({"input": query})
     print(result)
-
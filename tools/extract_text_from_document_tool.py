@@ -0,0 +1,64 @@
+"""
+extract_text_from_document_tool.py
+LangChain Tool for extracting text from PDF and Word (DOCX) documents.
+Only the requested pages are extracted; scanned pages are read with OCR
+(see document_extraction.py).
+"""
+
+import os
+from typing import Optional
+
+from langchain.agents import Tool
+
+from tools.document_extraction import extract_document, format_page_range
+from tools.registry import tool_description
+
+# Longer output is cut off with a hint to request fewer pages
+DOCUMENT_MAX_CHARS = int(os.getenv("DOCUMENT_MAX_CHARS", "30000"))
+
+
+def extract_text_from_document(file_path: str, pages: Optional[str] = None) -> str:
+    """
+    Extract the text of a PDF or DOCX document, page by page.
+
+    Args:
+        file_path (str): Path to the PDF or DOCX file.
+        pages (str, optional): Pages to extract, e.g. '3-5' or '1,4,7-9'. All pages if None.
+
+    Returns:
+        str: The page count and the text of every page under a '## Page N' heading.
+    """
+    try:
+        file_path = file_path.strip().strip("'\"")
+        if not os.path.isfile(file_path):
+            return f"Error: The file {file_path} does not exist."
+        if not file_path.lower().endswith((".pdf", ".docx")):
+            return "Error: Only PDF and DOCX files are supported."
+
+        document = extract_document(file_path, pages)
+        parts = []
+        length = 0
+        for page in document["pages"]:
+            note = " (OCR)" if page["source"] == "ocr" else ""
+            part = f"## Page {page['page']}{note}\n{page['text'].strip() or '[no text on this page]'}"
+            if length + len(part) > DOCUMENT_MAX_CHARS and parts:
+                # only the pages of the selection that were not returned
+                rest = format_page_range([page["page"] for page in document["pages"][len(parts):]])
+                parts.append(f"... [output truncated; request the remaining pages with pages='{rest}']")
+                break
+            parts.append(part)
+            length += len(part)
+
+        header = f"Document with {document['page_count']} pages"
+        if pages:
+            header += f", pages {pages}"
+        return header + ":\n\n" + "\n\n".join(parts) + "\n[END OF TEXT]"
+    except Exception as e:
+        return f"Error extracting text from document: {str(e)}"
+
+
+extract_text_from_document_tool = Tool(
+    name="extract_text_from_document",
+    func=extract_text_from_document,
+    description=tool_description("extract_text_from_document")
+)
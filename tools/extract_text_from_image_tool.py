@@ -4,34 +4,52 @@ extract_text_from_image_tool.py
 LangChain Tool for extracting text from images using Tesseract OCR.
 This tool allows you to extract text from images using Tesseract OCR.
 It can be used in various applications, such as document processing, image analysis, and more.
+The images are preprocessed, recognised in parallel and cached (see ocr_pipeline.py).
 """
 
 
 from langchain.agents import Tool
-import pytesseract
-from PIL import Image
+from typing import Optional, Union
 
 import os
 
-def extract_text_from_image(image_path: str) -> str:
+from tools.ocr_pipeline import OCR_LANG, OcrUnavailable, ocr_images
+from tools.registry import tool_description
+
+
+def extract_text_from_image(image_paths: Union[str, list[str]], lang: Optional[str] = None) -> str:
     """
-    Extract text from an image using Tesseract OCR.
+    Extract text from one or more images using Tesseract OCR.
 
     Args:
-        image_path (str): Path to the image file.
+        image_paths (str or list[str]): Path to the image file, or a list of paths.
+            Multi-page TIFF files are read page by page.
+        lang (str, optional): Tesseract language(s), e.g. 'eng' or 'eng+deu'.
 
     Returns:
-        str: Extracted text from the image.
+        str: Extracted text from the image(s).
     """
+    if isinstance(image_paths, str):
+        image_paths = [image_paths]
     try:
-        # Open the image file
-        with Image.open(image_path) as img:
-            # Use Tesseract to do OCR on the image
-            text = pytesseract.image_to_string(img)
-        return "Extracted text: " + text + "\n" + "[END OF TEXT]"
-    except FileNotFoundError:
-        return f"Error: The file {image_path} was not found."
-    except pytesseract.TesseractError:
+        missing = [path for path in image_paths if not os.path.isfile(path)]
+        if missing:
+            return f"Error: The file {missing[0]} was not found."
+
+        pages = ocr_images(image_paths, lang=lang or OCR_LANG)
+        if len(pages) == 1:
+            page = pages[0]
+            if "error" in page:
+                return f"Error extracting text from image: {page['error']}"
+            return "Extracted text: " + page["text"] + "\n" + "[END OF TEXT]"
+
+        multi_page = {page["path"] for page in pages if page.get("page")}
+        parts = []
+        for page in pages:
+            title = page["path"] + (f" (page {page['page'] + 1})" if page["path"] in multi_page else "")
+            parts.append(f"## {title}\n" + (f"Error: {page['error']}" if "error" in page else page["text"]))
+        return "Extracted text:\n" + "\n\n".join(parts) + "\n" + "[END OF TEXT]"
+    except OcrUnavailable:
         return "Error: Tesseract OCR failed to process the image. Please ensure Tesseract is installed and configured correctly."
     except Exception as e:
         return f"Error extracting text from image: {str(e)}"
@@ -39,7 +57,7 @@ def extract_text_from_image(image_path: str) -> str:
 extract_text_from_image_tool = Tool(
     name="extract_text_from_image",
     func=extract_text_from_image,
-    description="Extract text from an image using Tesseract OCR. Provide the path to the image file. The Text will be returned in a string format and ended with [END OF TEXT]."
+    description=tool_description("extract_text_from_image")
 )
 
 if __name__ == "__main__":
@@ -0,0 +1,321 @@
+"""
+file_cache.py
+Content-addressed download cache shared by the download tool and the task file
+download of the app.
+Files are streamed straight to disk in large chunks and stored under the SHA-256
+of their content, so the same file is kept once even if several URLs point to
+it. Cached URLs are revalidated with ETag/Last-Modified, interrupted downloads
+are resumed with a Range request, downloads above a size limit are aborted and
+the least recently used files are evicted when the cache grows too large.
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Optional
+from urllib.parse import unquote, urlparse
+
+from tools import http_client
+
+FILE_CACHE_DIR = os.getenv("FILE_CACHE_DIR", os.path.join(tempfile.gettempdir(), "agent_file_cache"))
+# Total size of the cached files, least recently used files are evicted above it
+FILE_CACHE_MAX_BYTES = int(os.getenv("FILE_CACHE_MAX_BYTES", str(2 * 1024 ** 3)))
+# Downloads larger than this are aborted
+DOWNLOAD_MAX_BYTES = int(os.getenv("DOWNLOAD_MAX_BYTES", str(512 * 1024 ** 2)))
+# Cached URLs fetched less than this many seconds ago are used without revalidation
+FILE_CACHE_FRESH_SECONDS = float(os.getenv("FILE_CACHE_FRESH_SECONDS", "3600"))
+CHUNK_SIZE = 1024 * 1024
+
+_EXTENSION_PATTERN = re.compile(r"^\.[A-Za-z0-9]{1,10}$")
+
+
+class DownloadTooLarge(ValueError):
+    """Raised when a download exceeds the size limit."""
+
+
+def _url_key(url: str) -> str:
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+
+def _extension(*names: Optional[str]) -> str:
+    """File extension of the first name that has a usable one, e.g. '.xlsx'."""
+    for name in names:
+        if name:
+            ext = os.path.splitext(name)[1].lower()
+            if _EXTENSION_PATTERN.match(ext):
+                return ext
+    return ""
+
+
+def _content_disposition_name(response) -> Optional[str]:
+    header = response.headers.get("Content-Disposition", "")
+    match = re.search(r"filename\*?=(?:UTF-8'')?\"?([^\";]+)\"?", header, re.IGNORECASE)
+    return unquote(match.group(1)) if match else None
+
+
+class FileCache:
+    """On-disk download cache, safe to use from several threads."""
+
+    def __init__(self, cache_dir: str = FILE_CACHE_DIR, max_bytes: int = FILE_CACHE_MAX_BYTES,
+                 max_download_bytes: int = DOWNLOAD_MAX_BYTES, fresh_seconds: float = FILE_CACHE_FRESH_SECONDS,
+                 session=None):
+        """
+        Open (or create) the cache.
+
+        Args:
+            cache_dir (str): Directory for the files and the index database.
+            max_bytes (int): Maximum total size of the cached files.
+            max_download_bytes (int): Maximum size of a single download.
+            fresh_seconds (float): Age below which a cached URL is not revalidated.
+            session: requests session to use, defaults to the shared http_client session.
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_download_bytes = max_download_bytes
+        self.fresh_seconds = fresh_seconds
+        self.session = session
+        self.objects_dir = os.path.join(cache_dir, "objects")
+        self.partial_dir = os.path.join(cache_dir, "partial")
+        os.makedirs(self.objects_dir, exist_ok=True)
+        os.makedirs(self.partial_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._url_locks = {}
+        self._conn = sqlite3.connect(os.path.join(cache_dir, "index.sqlite"), check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS objects (
+                    sha256 TEXT NOT NULL,
+                    ext TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    last_access REAL NOT NULL,
+                    PRIMARY KEY (sha256, ext)
+                )
+                """
+            )
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS urls (
+                    url TEXT PRIMARY KEY,
+                    sha256 TEXT NOT NULL,
+                    ext TEXT NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    fetched_at REAL NOT NULL
+                )
+                """
+            )
+            # validators of the partial downloads, needed for If-Range when resuming
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS partials (
+                    url TEXT PRIMARY KEY,
+                    etag TEXT,
+                    last_modified TEXT
+                )
+                """
+            )
+
+    # -- paths and index --
+
+    def _object_path(self, sha256: str, ext: str) -> str:
+        return os.path.join(self.objects_dir, f"{sha256}{ext}")
+
+    def _partial_path(self, url: str) -> str:
+        return os.path.join(self.partial_dir, f"{_url_key(url)}.part")
+
+    def _url_lock(self, url: str) -> threading.Lock:
+        with self._lock:
+            return self._url_locks.setdefault(url, threading.Lock())
+
+    def _execute(self, sql: str, params: tuple = ()) -> list:
+        with self._lock, self._conn:
+            return self._conn.execute(sql, params).fetchall()
+
+    def _cached_entry(self, url: str) -> Optional[dict]:
+        rows = self._execute("SELECT sha256, ext, etag, last_modified, fetched_at FROM urls WHERE url = ?", (url,))
+        if not rows:
+            return None
+        sha256, ext, etag, last_modified, fetched_at = rows[0]
+        path = self._object_path(sha256, ext)
+        if not os.path.isfile(path):
+            return None
+        return {"path": path, "sha256": sha256, "ext": ext, "etag": etag,
+                "last_modified": last_modified, "fetched_at": fetched_at}
+
+    def _touch(self, url: str, entry: dict, fetched: bool) -> None:
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE objects SET last_access = ? WHERE sha256 = ? AND ext = ?",
+                               (now, entry["sha256"], entry["ext"]))
+            if fetched:
+                self._conn.execute("UPDATE urls SET fetched_at = ? WHERE url = ?", (now, url))
+
+    # -- public API --
+
+    def fetch(self, url: str, filename: Optional[str] = None, max_bytes: Optional[int] = None) -> str:
+        """
+        Return the local path of a URL, downloading it only when needed.
+
+        Args:
+            url (str): The URL to download.
+            filename (str, optional): Original file name, used for the file extension.
+            max_bytes (int, optional): Size limit for this download, defaults to the cache setting.
+
+        Returns:
+            str: Path of the cached file (named after its SHA-256, with the original extension).
+
+        Raises:
+            DownloadTooLarge: If the file is larger than the size limit.
+            requests.exceptions.RequestException: On network or HTTP errors.
+        """
+        with self._url_lock(url):
+            entry = self._cached_entry(url)
+            if entry and time.time() - entry["fetched_at"] < self.fresh_seconds:
+                self._touch(url, entry, fetched=False)
+                return entry["path"]
+            return self._download(url, filename, entry, max_bytes or self.max_download_bytes)
+
+    def total_bytes(self) -> int:
+        """Total size of the cached files."""
+        return self._execute("SELECT COALESCE(SUM(size), 0) FROM objects")[0][0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # -- download --
+
+    def _request(self, url: str, headers: dict):
+        session = self.session or http_client.get_session()
+        return session.get(url, headers=headers, stream=True)
+
+    def _download(self, url: str, filename: Optional[str], entry: Optional[dict], max_bytes: int) -> str:
+        headers = {}
+        if entry:
+            if entry["etag"]:
+                headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        partial_path = self._partial_path(url)
+        offset = os.path.getsize(partial_path) if os.path.isfile(partial_path) else 0
+        if offset:
+            rows = self._execute("SELECT etag, last_modified FROM partials WHERE url = ?", (url,))
+            validator = (rows[0][0] or rows[0][1]) if rows else None
+            if validator:
+                headers["Range"] = f"bytes={offset}-"
+                headers["If-Range"] = validator
+            else:
+                offset = 0
+
+        response = self._request(url, headers)
+        if offset and response.status_code >= 400:
+            # e.g. 416 when the partial file is already complete: start again without Range
+            response.close()
+            print(f"Resuming {url} failed with HTTP {response.status_code}, downloading it again.")
+            self._discard_partial(url)
+            return self._download(url, filename, entry, max_bytes)
+
+        with response:
+            if response.status_code == 304 and entry:
+                self._touch(url, entry, fetched=True)
+                return entry["path"]
+            response.raise_for_status()
+
+            if response.status_code != 206:
+                offset = 0  # server sent the whole file
+            length = response.headers.get("Content-Length")
+            if length and length.isdigit() and offset + int(length) > max_bytes:
+                self._discard_partial(url)
+                raise DownloadTooLarge(f"{url} is {offset + int(length)} bytes, the limit is {max_bytes} bytes")
+
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+            self._execute("INSERT OR REPLACE INTO partials VALUES (?, ?, ?)", (url, etag, last_modified))
+
+            sha = hashlib.sha256()
+            if offset:
+                with open(partial_path, "rb") as f:
+                    for block in iter(lambda: f.read(CHUNK_SIZE), b""):
+                        sha.update(block)
+            size = offset
+            with open(partial_path, "ab" if offset else "wb") as f:
+                for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                    size += len(chunk)
+                    if size > max_bytes:
+                        f.close()
+                        self._discard_partial(url)
+                        raise DownloadTooLarge(f"{url} is larger than the limit of {max_bytes} bytes")
+                    sha.update(chunk)
+                    f.write(chunk)
+
+            ext = _extension(filename, _content_disposition_name(response), urlparse(url).path)
+
+        sha256 = sha.hexdigest()
+        path = self._object_path(sha256, ext)
+        if os.path.isfile(path):
+            os.remove(partial_path)
+        else:
+            os.replace(partial_path, path)
+
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM partials WHERE url = ?", (url,))
+            self._conn.execute("INSERT OR REPLACE INTO objects VALUES (?, ?, ?, ?)", (sha256, ext, size, now))
+            self._conn.execute("INSERT OR REPLACE INTO urls VALUES (?, ?, ?, ?, ?, ?)",
+                               (url, sha256, ext, etag, last_modified, now))
+        self._evict(keep=(sha256, ext))
+        return path
+
+    def _discard_partial(self, url: str) -> None:
+        try:
+            os.remove(self._partial_path(url))
+        except FileNotFoundError:
+            pass
+        self._execute("DELETE FROM partials WHERE url = ?", (url,))
+
+    def _evict(self, keep: tuple) -> None:
+        """Delete least recently used files until the cache fits into max_bytes."""
+        with self._lock, self._conn:
+            total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM objects").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            rows = self._conn.execute("SELECT sha256, ext, size FROM objects ORDER BY last_access").fetchall()
+            for sha256, ext, size in rows:
+                if total <= self.max_bytes:
+                    break
+                if (sha256, ext) == keep:
+                    continue
+                try:
+                    os.remove(self._object_path(sha256, ext))
+                except FileNotFoundError:
+                    pass
+                self._conn.execute("DELETE FROM objects WHERE sha256 = ? AND ext = ?", (sha256, ext))
+                self._conn.execute("DELETE FROM urls WHERE sha256 = ? AND ext = ?", (sha256, ext))
+                total -= size
+
+
+_cache: Optional[FileCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_file_cache() -> FileCache:
+    """Return the process-wide file cache."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = FileCache()
+    return _cache
+
+
+def download(url: str, filename: Optional[str] = None) -> str:
+    """Download a URL through the shared file cache and return the local path."""
+    return get_file_cache().fetch(url, filename=filename)
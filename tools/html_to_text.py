@@ -0,0 +1,259 @@
+"""
+html_to_text.py
+Converts the HTML of a parsed Wikipedia page to compact Markdown-like text.
+Styles, scripts, edit links, reference marks, reference lists and navboxes are
+dropped, links and formatting are reduced to their text, and tables
+(wikitables, infoboxes) become CSV rows.
+"""
+
+import csv
+import io
+import re
+from html.parser import HTMLParser
+
+# Elements that are dropped with their whole content
+SKIP_TAGS = {"style", "script", "noscript", "math"}
+SKIP_CLASSES = {
+    "mw-editsection", "reference", "reflist", "references", "mw-references-wrap", "navbox", "navbox-styles",
+    "authority-control", "shortdescription", "metadata", "noprint", "mw-empty-elt", "Z3988", "sistersitebox",
+    "mw-cite-backlink", "printfooter", "catlinks", "mwe-math-element",
+}
+
+BLOCK_TAGS = {"p", "div", "ul", "ol", "dl", "dd", "dt", "figure", "figcaption", "blockquote", "pre", "center"}
+VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+
+_WHITESPACE = re.compile(r"\s+")
+_SEPARATORS = re.compile(r"\s*(?:;\s*)+")
+
+
+class _Table:
+    def __init__(self):
+        self.caption = []
+        self.rows = []
+        self.row = None
+        self.cell = None
+        self.cell_span = (1, 1)
+        # column -> (rows left, text) for cells spanning several rows
+        self.pending = {}
+
+    def start_row(self):
+        self.end_row()
+        self.row = []
+
+    def end_row(self):
+        self.end_cell()
+        if self.row is not None:
+            row = []
+            column = 0
+            cells = iter(self.row)
+            while True:
+                if column in self.pending:
+                    left, text = self.pending[column]
+                    row.append(text)
+                    if left > 1:
+                        self.pending[column] = (left - 1, text)
+                    else:
+                        del self.pending[column]
+                    column += 1
+                    continue
+                cell = next(cells, None)
+                if cell is None:
+                    break
+                text, colspan, rowspan = cell
+                for _ in range(colspan):
+                    row.append(text)
+                    if rowspan > 1:
+                        self.pending[column] = (rowspan - 1, text)
+                    column += 1
+            if len(set(row)) == 1 and len(row) > 1:
+                row = row[:1]  # title or separator row spanning the whole table
+            if any(row):
+                self.rows.append(row)
+        self.row = None
+
+    def start_cell(self, colspan, rowspan):
+        self.end_cell()
+        if self.row is None:
+            self.row = []
+        self.cell = []
+        self.cell_span = (colspan, rowspan)
+
+    def end_cell(self):
+        if self.cell is not None:
+            text = _SEPARATORS.sub("; ", _WHITESPACE.sub(" ", "".join(self.cell))).strip(" ;")
+            self.row.append((text, *self.cell_span))
+        self.cell = None
+
+    def to_csv(self) -> str:
+        self.end_row()
+        out = io.StringIO()
+        csv.writer(out, lineterminator="\n").writerows(self.rows)
+        return out.getvalue().rstrip("\n")
+
+
+class _Converter(HTMLParser):
+    def __init__(self, inline_tables: bool):
+        super().__init__(convert_charrefs=True)
+        self.inline_tables = inline_tables
+        self.blocks = []
+        self.inline = []
+        self.tables = []
+        self.table_stack = []
+        self.skip_tag = None
+        self.skip_depth = 0
+        self.list_depth = 0
+
+    # -- output helpers --
+
+    def _emit(self, text: str) -> None:
+        if self.table_stack:
+            table = self.table_stack[-1]
+            if table.cell is not None:
+                table.cell.append(text)
+            elif table.row is None:
+                table.caption.append(text)
+            return
+        self.inline.append(text)
+
+    def _flush(self, prefix: str = "") -> None:
+        if self.table_stack:
+            self._emit("; ")
+            return
+        text = _WHITESPACE.sub(" ", "".join(self.inline)).strip()
+        self.inline = []
+        if text:
+            self.blocks.append(prefix + text)
+
+    def _should_skip(self, tag: str, attrs: dict) -> bool:
+        classes = set((attrs.get("class") or "").split())
+        if classes & SKIP_CLASSES:
+            return True
+        if tag in SKIP_TAGS:
+            return True
+        return "display:none" in (attrs.get("style") or "").replace(" ", "")
+
+    # -- parser callbacks --
+
+    def handle_starttag(self, tag, attrs):
+        if self.skip_tag is not None:
+            if tag == self.skip_tag:
+                self.skip_depth += 1
+            return
+        attrs = dict(attrs)
+        if tag not in VOID_TAGS and self._should_skip(tag, attrs):
+            self.skip_tag, self.skip_depth = tag, 1
+            return
+
+        if tag == "table":
+            if not self.table_stack:
+                self._flush()
+            self.table_stack.append(_Table())
+        elif tag == "tr" and self.table_stack:
+            self.table_stack[-1].start_row()
+        elif tag in ("td", "th") and self.table_stack:
+            self.table_stack[-1].start_cell(_span(attrs.get("colspan")), _span(attrs.get("rowspan")))
+        elif tag == "br":
+            self._flush(self._list_prefix()) if not self.table_stack else self._emit(" ")
+        elif tag in ("ul", "ol"):
+            self._flush()
+            self.list_depth += 1
+        elif tag == "li":
+            self._flush(self._list_prefix())
+        elif tag in BLOCK_TAGS or re.fullmatch(r"h[1-6]", tag):
+            self._flush(self._list_prefix())
+        elif tag == "img" and attrs.get("alt") and self.table_stack:
+            self._emit(attrs["alt"])
+
+    def handle_endtag(self, tag):
+        if self.skip_tag is not None:
+            if tag == self.skip_tag:
+                self.skip_depth -= 1
+                if self.skip_depth == 0:
+                    self.skip_tag = None
+            return
+
+        if tag == "table" and self.table_stack:
+            table = self.table_stack.pop()
+            self._close_table(table)
+        elif tag == "tr" and self.table_stack:
+            self.table_stack[-1].end_row()
+        elif tag in ("td", "th") and self.table_stack:
+            self.table_stack[-1].end_cell()
+        elif re.fullmatch(r"h[1-6]", tag):
+            self._flush("#" * int(tag[1]) + " ")
+        elif tag in ("ul", "ol"):
+            self._flush(self._list_prefix())
+            self.list_depth = max(self.list_depth - 1, 0)
+        elif tag == "li":
+            self._flush(self._list_prefix())
+        elif tag in BLOCK_TAGS:
+            self._flush(self._list_prefix())
+
+    def handle_data(self, data):
+        if self.skip_tag is None:
+            self._emit(data)
+
+    def _list_prefix(self) -> str:
+        return "  " * (self.list_depth - 1) + "- " if self.list_depth else ""
+
+    def _close_table(self, table: _Table) -> None:
+        rows = table.to_csv()
+        if self.table_stack:
+            # nested table: flatten into the cell of the outer table
+            self._emit(" " + rows.replace("\n", "; ") + " ")
+            return
+        if not rows:
+            return
+        caption = _WHITESPACE.sub(" ", "".join(table.caption)).strip(" ;")
+        if self.inline_tables:
+            self.blocks.append((f"[Table: {caption}]\n" if caption else "[Table]\n") + rows)
+        else:
+            self.tables.append({"caption": caption, "csv": rows})
+            self.blocks.append(f"[Table {len(self.tables)}{': ' + caption if caption else ''}]")
+
+    def result(self) -> tuple[str, list[dict]]:
+        while self.table_stack:
+            self._close_table(self.table_stack.pop())
+        self._flush()
+        return "\n".join(self.blocks), self.tables
+
+
+def _span(value) -> int:
+    try:
+        return max(1, min(int(value), 100))
+    except (TypeError, ValueError):
+        return 1
+
+
+def html_to_text(html: str) -> str:
+    """
+    Convert an HTML fragment to compact text with tables inline as CSV rows.
+
+    Args:
+        html (str): HTML of a page or of a part of a page.
+
+    Returns:
+        str: One block per line; headings as '## title', list items as '- item'.
+    """
+    converter = _Converter(inline_tables=True)
+    converter.feed(html)
+    converter.close()
+    return converter.result()[0]
+
+
+def convert_page(html: str) -> dict:
+    """
+    Convert the HTML of a page to structured compact content.
+
+    Args:
+        html (str): HTML as returned by the Wikipedia parse API.
+
+    Returns:
+        dict: 'text' with '[Table N]' placeholders where the tables were, and
+        'tables' as a list of dicts with 'caption' and 'csv'.
+    """
+    converter = _Converter(inline_tables=False)
+    converter.feed(html)
+    converter.close()
+    text, tables = converter.result()
+    return {"text": text, "tables": tables}
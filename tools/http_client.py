@@ -0,0 +1,197 @@
+"""
+http_client.py
+Shared HTTP client for all network calls of the agent and the tools.
+One requests.Session with keep-alive connection pooling (limited per host),
+default timeouts and retries with backoff on 429/5xx, plus metrics for the
+connection reuse rate and the latency per host.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from typing import Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# (connect, read) timeout in seconds, used when a call does not pass its own timeout
+DEFAULT_TIMEOUT = (float(os.getenv("HTTP_CONNECT_TIMEOUT", "5")), float(os.getenv("HTTP_READ_TIMEOUT", "30")))
+# Maximum open connections per host; further requests wait for a free connection
+POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "8"))
+RETRY_TOTAL = int(os.getenv("HTTP_RETRIES", "3"))
+RETRY_BACKOFF = float(os.getenv("HTTP_RETRY_BACKOFF", "0.5"))
+RETRY_STATUS = (429, 500, 502, 503, 504)
+USER_AGENT = "gaia-agent/1.0 (python-requests)"
+
+_LATENCY_SAMPLES = 1000
+
+
+class _HostMetrics:
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self.latencies = deque(maxlen=_LATENCY_SAMPLES)
+
+
+_metrics: dict[str, _HostMetrics] = {}
+_metrics_lock = threading.Lock()
+
+
+class MetricsHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter that records latency and errors per host."""
+
+    def send(self, request, **kwargs):
+        host = urlparse(request.url).netloc
+        start = time.perf_counter()
+        try:
+            response = super().send(request, **kwargs)
+        except Exception:
+            self._record(host, time.perf_counter() - start, error=True)
+            raise
+        self._record(host, time.perf_counter() - start, error=response.status_code >= 400)
+        return response
+
+    @staticmethod
+    def _record(host: str, seconds: float, error: bool) -> None:
+        with _metrics_lock:
+            metrics = _metrics.setdefault(host, _HostMetrics())
+            metrics.requests += 1
+            metrics.errors += int(error)
+            metrics.total_seconds += seconds
+            metrics.latencies.append(seconds)
+
+    def connection_stats(self) -> dict[str, tuple[int, int]]:
+        """Return {host: (requests sent, new connections opened)} from the urllib3 pools."""
+        stats = {}
+        pools = self.poolmanager.pools
+        for key in list(pools.keys()):
+            try:
+                pool = pools[key]
+            except KeyError:
+                continue
+            host = f"{pool.host}:{pool.port}" if pool.port not in (None, 80, 443) else pool.host
+            requests_sent, connections = stats.get(host, (0, 0))
+            stats[host] = (requests_sent + pool.num_requests, connections + pool.num_connections)
+        return stats
+
+
+class TimeoutSession(requests.Session):
+    """Session that applies DEFAULT_TIMEOUT when no timeout is given."""
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT):
+        super().__init__()
+        self.default_timeout = timeout
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.default_timeout)
+        return super().request(method, url, **kwargs)
+
+
+def create_session(
+        retries: int = RETRY_TOTAL,
+        backoff_factor: float = RETRY_BACKOFF,
+        pool_maxsize: int = POOL_MAXSIZE,
+        timeout=DEFAULT_TIMEOUT) -> TimeoutSession:
+    """
+    Create a pooled session with retries and default timeouts.
+
+    Args:
+        retries (int): Retries for connection errors and 429/5xx responses (idempotent methods only).
+        backoff_factor (float): Exponential backoff factor between retries (Retry-After is respected).
+        pool_maxsize (int): Maximum connections per host.
+        timeout: Default (connect, read) timeout in seconds.
+
+    Returns:
+        TimeoutSession: The configured session.
+    """
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUS,
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = MetricsHTTPAdapter(pool_connections=16, pool_maxsize=pool_maxsize, pool_block=True, max_retries=retry)
+    session = TimeoutSession(timeout=timeout)
+    session.headers["User-Agent"] = USER_AGENT
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+_session: Optional[TimeoutSession] = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> TimeoutSession:
+    """Return the process-wide shared session."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = create_session()
+    return _session
+
+
+def request(method: str, url: str, **kwargs) -> requests.Response:
+    """Send a request through the shared session (default timeout, retries, pooling)."""
+    return get_session().request(method, url, **kwargs)
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    return request("GET", url, **kwargs)
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    return request("POST", url, **kwargs)
+
+
+def http_metrics(session: Optional[requests.Session] = None) -> dict[str, dict]:
+    """
+    Return metrics per host.
+
+    Returns:
+        dict: {host: {requests, errors, avg_ms, p95_ms, max_ms, connections, reuse_rate}}.
+        `reuse_rate` is the share of requests that were sent over an already open connection.
+    """
+    session = session or get_session()
+    connection_stats = {}
+    for adapter in set(session.adapters.values()):
+        if isinstance(adapter, MetricsHTTPAdapter):
+            for host, (requests_sent, connections) in adapter.connection_stats().items():
+                old_requests, old_connections = connection_stats.get(host, (0, 0))
+                connection_stats[host] = (old_requests + requests_sent, old_connections + connections)
+
+    result = {}
+    with _metrics_lock:
+        for host, metrics in _metrics.items():
+            latencies = sorted(metrics.latencies)
+            requests_sent, connections = connection_stats.get(host, (0, 0))
+            result[host] = {
+                "requests": metrics.requests,
+                "errors": metrics.errors,
+                "avg_ms": 1000 * metrics.total_seconds / metrics.requests if metrics.requests else 0.0,
+                "p95_ms": 1000 * latencies[int(0.95 * (len(latencies) - 1))] if latencies else 0.0,
+                "max_ms": 1000 * latencies[-1] if latencies else 0.0,
+                "connections": connections,
+                "reuse_rate": 1 - connections / requests_sent if requests_sent else 0.0,
+            }
+    return result
+
+
+def format_http_metrics(session: Optional[requests.Session] = None) -> str:
+    """Return the metrics as a small text table."""
+    lines = [f"{'host':40} {'requests':>8} {'errors':>6} {'avg ms':>8} {'p95 ms':>8} {'reuse':>6}"]
+    for host, m in sorted(http_metrics(session).items()):
+        lines.append(f"{host:40} {m['requests']:>8} {m['errors']:>6} {m['avg_ms']:>8.1f} {m['p95_ms']:>8.1f} {m['reuse_rate']:>6.0%}")
+    return "\n".join(lines)
+
+
+def reset_metrics() -> None:
+    """Clear the latency metrics (connection counters live in the pools and are not reset)."""
+    with _metrics_lock:
+        _metrics.clear()
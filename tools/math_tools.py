@@ -1,8 +1,11 @@
 """
 math_tools.py
 Mathematical operations for LangChain agents.
+The agent uses the batch calculator in calculator.py instead of these single-operation tools.
 """
 
+import math
+
 from langchain.agents import Tool
 
 
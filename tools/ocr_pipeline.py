@@ -0,0 +1,343 @@
+"""
+ocr_pipeline.py
+OCR pipeline for the image tool.
+Images are preprocessed before recognition (scaled to the target DPI, grayscale,
+Otsu binarisation, deskew), recognised by a persistent engine and the text is
+cached by image content and OCR settings.
+The engine is tesserocr (Tesseract in-process; the language data is loaded once
+per worker thread) if it is installed, otherwise pytesseract, which starts one
+tesseract process per image. Several images and the pages of multi-page TIFFs
+are recognised in parallel by a thread pool.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import numpy as np
+from PIL import Image, ImageOps
+
+OCR_CACHE_DIR = os.getenv("OCR_CACHE_DIR", os.path.join(tempfile.gettempdir(), "agent_ocr_cache"))
+OCR_LANG = os.getenv("OCR_LANG", "eng")
+# Tesseract page segmentation mode, 3 = fully automatic
+OCR_PSM = int(os.getenv("OCR_PSM", "3"))
+OCR_TARGET_DPI = int(os.getenv("OCR_TARGET_DPI", "300"))
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Without DPI information the longer side is scaled into this range
+OCR_MIN_SIDE = 1000
+OCR_MAX_SIDE = 3500
+# Deskew searches this range of angles (degrees)
+DESKEW_MAX_ANGLE = 10.0
+# Bump when the preprocessing changes, so cached results are not used any more
+_PIPELINE_VERSION = 1
+
+
+class OcrUnavailable(RuntimeError):
+    """Raised when neither tesserocr nor pytesseract (with a tesseract binary) is available."""
+
+
+# -- preprocessing --
+
+def _scale_factor(image: Image.Image, target_dpi: int) -> float:
+    dpi = image.info.get("dpi")
+    if dpi and dpi[0] and dpi[0] > 1:
+        # scanned documents: bring them to the target DPI (only down, upscaling adds no detail)
+        return min(1.0, target_dpi / float(dpi[0]))
+    longest = max(image.size)
+    if longest > OCR_MAX_SIDE:
+        return OCR_MAX_SIDE / longest
+    if longest < OCR_MIN_SIDE:
+        # small screenshots: Tesseract works best with characters of 20-30 pixels
+        return min(2.0, OCR_MIN_SIDE / longest)
+    return 1.0
+
+
+def otsu_threshold(gray: np.ndarray) -> int:
+    """Threshold that maximises the between-class variance of a grayscale image."""
+    histogram = np.bincount(gray.ravel(), minlength=256).astype(np.float64)
+    weights = np.cumsum(histogram)
+    means = np.cumsum(histogram * np.arange(256))
+    total, total_mean = weights[-1], means[-1]
+    background = weights[:-1]
+    foreground = total - background
+    valid = (background > 0) & (foreground > 0)
+    if not valid.any():
+        return 128
+    between = np.zeros(255)
+    mean_b = means[:-1][valid] / background[valid]
+    mean_f = (total_mean - means[:-1][valid]) / foreground[valid]
+    between[valid] = background[valid] * foreground[valid] * (mean_b - mean_f) ** 2
+    return int(np.argmax(between)) + 1
+
+
+def _profile_score(binary: Image.Image, angle: float) -> float:
+    """Text lines give sharp peaks in the row sums when the page is straight."""
+    rotated = np.asarray(binary.rotate(angle, resample=Image.NEAREST, fillcolor=0), dtype=np.float64)
+    rows = rotated.sum(axis=1)
+    return float(np.sum(np.diff(rows) ** 2))
+
+
+def estimate_skew(binary: Image.Image) -> float:
+    """
+    Estimate the skew angle of a binarised page by a projection profile search.
+
+    Args:
+        binary (Image.Image): Mode 'L' image with text as 255 on 0.
+
+    Returns:
+        float: Angle in degrees by which the page has to be rotated (counter-clockwise).
+    """
+    small = binary.copy()
+    small.thumbnail((800, 800))
+    coarse = np.arange(-DESKEW_MAX_ANGLE, DESKEW_MAX_ANGLE + 0.01, 1.0)
+    best = max(coarse, key=lambda angle: _profile_score(small, angle))
+    fine = np.arange(best - 1.0, best + 1.01, 0.1)
+    return round(float(max(fine, key=lambda angle: _profile_score(small, angle))), 1)
+
+
+def preprocess(image: Image.Image, target_dpi: int = OCR_TARGET_DPI, deskew: bool = True) -> Image.Image:
+    """
+    Prepare an image for OCR: scale, grayscale, binarise (Otsu) and deskew.
+
+    Args:
+        image (Image.Image): The image (any mode).
+        target_dpi (int): DPI to scale scanned documents down to.
+        deskew (bool): Straighten rotated pages.
+
+    Returns:
+        Image.Image: Black text on white, mode 'L'.
+    """
+    image = ImageOps.exif_transpose(image)
+    if image.mode in ("RGBA", "LA", "P"):
+        # transparent areas become white instead of black
+        background = Image.new("RGB", image.size, "white")
+        background.paste(image.convert("RGBA"), mask=image.convert("RGBA").getchannel("A"))
+        image = background
+    gray = ImageOps.grayscale(image)
+
+    factor = _scale_factor(image, target_dpi)
+    if abs(factor - 1.0) > 0.01:
+        size = (max(1, round(gray.width * factor)), max(1, round(gray.height * factor)))
+        gray = gray.resize(size, Image.LANCZOS)
+
+    pixels = np.asarray(gray)
+    threshold = otsu_threshold(pixels)
+    text = pixels < threshold
+    if text.mean() > 0.5:
+        text = ~text  # light text on a dark background
+    binary = Image.fromarray(np.where(text, 255, 0).astype(np.uint8))
+
+    if deskew:
+        angle = estimate_skew(binary)
+        if abs(angle) >= 0.3:
+            binary = binary.rotate(angle, resample=Image.BILINEAR, expand=True, fillcolor=0)
+            binary = binary.point(lambda value: 255 if value >= 128 else 0)
+    result = ImageOps.invert(binary)
+    result.info["dpi"] = (target_dpi, target_dpi)
+    return result
+
+
+# -- engines --
+
+class _TesserocrEngine:
+    """One PyTessBaseAPI per thread; the language data is loaded once per thread."""
+
+    name = "tesserocr"
+
+    def __init__(self, lang: str, psm: int):
+        import tesserocr
+
+        self._tesserocr = tesserocr
+        self.lang = lang
+        self.psm = psm
+        self._local = threading.local()
+
+    def recognize(self, image: Image.Image) -> str:
+        api = getattr(self._local, "api", None)
+        if api is None:
+            api = self._tesserocr.PyTessBaseAPI(lang=self.lang, psm=self.psm)
+            self._local.api = api
+        api.SetImage(image)
+        api.SetSourceResolution(image.info.get("dpi", (OCR_TARGET_DPI,))[0])
+        return api.GetUTF8Text()
+
+
+class _PytesseractEngine:
+    """Fallback: one tesseract process per image."""
+
+    name = "pytesseract"
+
+    def __init__(self, lang: str, psm: int):
+        import pytesseract
+
+        pytesseract.get_tesseract_version()  # raises if the binary is missing
+        self._pytesseract = pytesseract
+        self.lang = lang
+        self.psm = psm
+
+    def recognize(self, image: Image.Image) -> str:
+        dpi = image.info.get("dpi", (OCR_TARGET_DPI,))[0]
+        return self._pytesseract.image_to_string(image, lang=self.lang, config=f"--psm {self.psm} --dpi {dpi}")
+
+
+_engines: dict[tuple, object] = {}
+_executor: Optional[ThreadPoolExecutor] = None
+_lock = threading.Lock()
+
+
+def get_engine(lang: str = OCR_LANG, psm: int = OCR_PSM):
+    """Return the shared OCR engine for a language and page segmentation mode."""
+    with _lock:
+        if (lang, psm) not in _engines:
+            errors = []
+            for engine_class in (_TesserocrEngine, _PytesseractEngine):
+                try:
+                    _engines[(lang, psm)] = engine_class(lang, psm)
+                    break
+                except Exception as e:
+                    errors.append(f"{engine_class.name}: {str(e) or type(e).__name__}")
+            else:
+                raise OcrUnavailable("No OCR engine available (" + "; ".join(errors) + ")")
+        return _engines[(lang, psm)]
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=OCR_WORKERS, thread_name_prefix="ocr")
+        return _executor
+
+
+# -- cache --
+
+class OcrCache:
+    """SQLite cache of recognised text, keyed by image hash, page and OCR settings."""
+
+    def __init__(self, cache_dir: str = OCR_CACHE_DIR):
+        os.makedirs(cache_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(cache_dir, "ocr.sqlite"), check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, text TEXT NOT NULL)")
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT text FROM results WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def put(self, key: str, text: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO results VALUES (?, ?)", (key, text))
+
+
+_cache: Optional[OcrCache] = None
+
+
+def get_ocr_cache() -> OcrCache:
+    """Return the process-wide OCR cache."""
+    global _cache
+    with _lock:
+        if _cache is None:
+            _cache = OcrCache()
+        return _cache
+
+
+def _file_hash(path: str) -> str:
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+def _cache_key(image_hash: str, page: int, settings: dict) -> str:
+    return hashlib.sha256(json.dumps([image_hash, page, settings], sort_keys=True).encode("utf-8")).hexdigest()
+
+
+# -- pipeline --
+
+def recognize_image(image: Image.Image, lang: str = OCR_LANG, psm: int = OCR_PSM,
+                    target_dpi: int = OCR_TARGET_DPI, preprocess_images: bool = True) -> str:
+    """Preprocess and recognise one in-memory image (not cached)."""
+    if preprocess_images:
+        image = preprocess(image, target_dpi)
+    return get_engine(lang, psm).recognize(image).strip()
+
+
+def recognize_images(images: list[Image.Image], lang: str = OCR_LANG, psm: int = OCR_PSM) -> list[str]:
+    """Recognise several in-memory images in parallel on the OCR thread pool."""
+    get_engine(lang, psm)
+    futures = [_get_executor().submit(recognize_image, image, lang, psm) for image in images]
+    return [future.result() for future in futures]
+
+
+def _recognize_page(path: str, page: int, settings: dict) -> str:
+    with Image.open(path) as image:
+        image.seek(page)
+        frame = image.copy()
+        frame.info = dict(image.info)
+    return recognize_image(frame, settings["lang"], settings["psm"], settings["target_dpi"], settings["preprocess"])
+
+
+def _page_count(path: str) -> int:
+    with Image.open(path) as image:
+        return getattr(image, "n_frames", 1)
+
+
+def ocr_images(image_paths: list[str], lang: str = OCR_LANG, psm: int = OCR_PSM,
+               target_dpi: int = OCR_TARGET_DPI, preprocess_images: bool = True,
+               cache: Optional[OcrCache] = None) -> list[dict]:
+    """
+    Recognise the text of several images (and all pages of multi-page TIFFs) in parallel.
+
+    Args:
+        image_paths (list[str]): Paths of the image files.
+        lang (str): Tesseract language(s), e.g. 'eng' or 'eng+deu'.
+        psm (int): Tesseract page segmentation mode.
+        target_dpi (int): DPI that scanned images are scaled to.
+        preprocess_images (bool): Grayscale, binarise and deskew before recognition.
+        cache (OcrCache, optional): Result cache, defaults to the shared cache.
+
+    Returns:
+        list[dict]: One dict per page with 'path', 'page' (0-based), 'text' and
+        'cached', or 'path' and 'error' for files that could not be read.
+    """
+    cache = cache or get_ocr_cache()
+    settings = {"lang": lang, "psm": psm, "target_dpi": target_dpi, "preprocess": preprocess_images,
+                "version": _PIPELINE_VERSION}
+    results: list[dict] = []
+    pending = []
+    for path in image_paths:
+        try:
+            image_hash = _file_hash(path)
+            pages = _page_count(path)
+        except Exception as e:
+            results.append({"path": path, "error": f"{type(e).__name__}: {str(e)}"})
+            continue
+        for page in range(pages):
+            key = _cache_key(image_hash, page, settings)
+            text = cache.get(key)
+            result = {"path": path, "page": page, "text": text, "cached": text is not None}
+            results.append(result)
+            if text is None:
+                pending.append((result, key))
+
+    if pending:
+        get_engine(lang, psm)  # fail early (once) if there is no engine
+        executor = _get_executor()
+        futures = [(result, key, executor.submit(_recognize_page, result["path"], result["page"], settings))
+                   for result, key in pending]
+        for result, key, future in futures:
+            try:
+                result["text"] = future.result()
+                cache.put(key, result["text"])
+            except Exception as e:
+                result["error"] = f"{type(e).__name__}: {str(e)}"
+    return results
@@ -2,66 +2,43 @@
 python_interpreter_tool.py
 LangChain Tool for executing Python code.
 This tool allows you to execute Python code snippets and return the results.
+The code is executed in a pool of sandboxed worker processes, not in the agent process.
 """
 
 import os
 
 from langchain.agents import Tool
-import subprocess
-import tempfile
-import uuid
-import re
+from langchain_core.runnables import RunnableConfig
 import ast
-import json
-from typing import Any, Dict, List, Optional, Tuple, Union
-import sys
+from typing import Optional
 
-import io
-import contextlib
-import traceback
-import pandas as pd
-import numpy as np
+from tools.python_sandbox import format_outcome, get_sandbox_pool
+from tools.registry import tool_description
 
 
-def execute_python_code(code: str) -> str:
+def _session_id(config: Optional[RunnableConfig]) -> Optional[str]:
+    """Python session of the current graph run, set by the agent in config["configurable"]["session_id"]."""
+    return ((config or {}).get("configurable") or {}).get("session_id")
+
+
+def execute_python_code(code: str, config: RunnableConfig = None) -> str:
     """
     Execute Python code and return the result.
+    The code runs in a sandboxed worker process (see python_sandbox.py) with
+    CPU-time, wall-clock and memory limits. Within one graph run (one question)
+    all calls share the same namespace, so variables and loaded data stay available.
 
     Args:
         code (str): Python code to execute.
+        config (RunnableConfig, optional): Injected by LangChain, carries the session ID.
 
     Returns:
         str: Result of the execution.
     """
     try:
-        # Create a temporary file to store the code
-        tmpdir = tempfile.mkdtemp()
-        filename = f"code_{uuid.uuid4().hex[:8]}.py"
-        filepath = os.path.join(tmpdir, filename)
-
-        # Write the code to the temporary file
-        with open(filepath, 'w') as f:
-            f.write(code)
-
-        # Execute the code and capture the output
-        with io.StringIO() as buf, contextlib.redirect_stdout(buf), contextlib.redirect_stderr(buf):
-            exec_globals = {}
-            exec(code, exec_globals)
-            output = buf.getvalue()
-
-        return output
+        return format_outcome(get_sandbox_pool().run(code, session_id=_session_id(config)))
     except Exception as e:
         return f"Error executing code: {str(e)}"
-    except SyntaxError as e:
-        return f"SyntaxError: {str(e)}"
-    except NameError as e:
-        return f"NameError: {str(e)}"
-    except TypeError as e:
-        return f"TypeError: {str(e)}"
-    except ValueError as e:
-        return f"ValueError: {str(e)}"
-    except ZeroDivisionError as e:
-        return f"ZeroDivisionError: {str(e)}"
 
 def parse_python_code(code: str) -> str:
     """
@@ -80,56 +57,36 @@ def parse_python_code(code: str) -> str:
     except Exception as e:
         return f"Error parsing code: {str(e)}"
 
-def execute_python_code_with_output(code: str) -> str:
+def execute_python_code_with_output(code: str, config: RunnableConfig = None) -> str:
     """
     Execute Python code and return the result.
 
     Args:
         code (str): Python code to execute.
+        config (RunnableConfig, optional): Injected by LangChain, carries the session ID.
 
     Returns:
         str: Result of the execution.
     """
-    try:
-        # Create a temporary file to store the code
-        tmpdir = tempfile.mkdtemp()
-        filename = f"code_{uuid.uuid4().hex[:8]}.py"
-        filepath = os.path.join(tmpdir, filename)
-
-        # Write the code to the temporary file
-        with open(filepath, 'w') as f:
-            f.write(code)
-
-        # Execute the code and capture the output
-        with io.StringIO() as buf, contextlib.redirect_stdout(buf), contextlib.redirect_stderr(buf):
-            exec_globals = {}
-            exec(code, exec_globals)
-            output = buf.getvalue()
-
-        return output
-    except Exception as e:
-        return f"Error executing code: {str(e)}"
-    except SyntaxError as e:
-        return f"SyntaxError: {str(e)}"
-
+    return execute_python_code(code, config=config)
 
 
 execute_python_code_tool = Tool(
     name="execute_python_code",
     func=execute_python_code,
-    description="Execute Python code and return the result. Provide the Python code as a string."
+    description=tool_description("execute_python_code")
 )
 
 parse_python_code_tool = Tool(
     name="parse_python_code",
     func=parse_python_code,
-    description="Parse Python code and return the abstract syntax tree (AST) representation. Provide the Python code as a string."
+    description=tool_description("parse_python_code")
 )
 
 execute_python_code_with_output_tool = Tool(
     name="execute_python_code_with_output",
     func=execute_python_code_with_output,
-    description="Execute Python code and return the result. Provide the Python code as a string."
+    description=tool_description("execute_python_code_with_output")
 )
 
 if __name__ == "__main__":
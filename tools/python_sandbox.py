@@ -0,0 +1,376 @@
+"""
+python_sandbox.py
+Pool of worker processes that execute model-written Python code.
+The workers are started once with pandas and numpy already imported and are
+reused; every run gets fresh globals, a CPU-time, wall-clock and memory limit,
+and returns stdout, stderr, the value of the last expression and the error
+separately. A worker that hits a limit is killed and replaced, and every worker
+is recycled after a number of runs. The pool is safe to use from several threads.
+
+Sessions: runs with a session_id share one interpreter namespace in a worker
+process of their own, so data loaded in one tool call is still there in the
+next. The agent opens one session per question and closes it when the
+question is done.
+"""
+
+import ast
+import contextlib
+import io
+import multiprocessing
+import os
+import queue
+import shutil
+import signal
+import tempfile
+import threading
+import traceback
+from typing import Optional
+
+try:
+    import resource
+except ImportError:  # not available on Windows, the limits are then wall-clock only
+    resource = None
+
+SANDBOX_WORKERS = int(os.getenv("PYTHON_SANDBOX_WORKERS", "2"))
+# Runs per worker process before it is replaced by a fresh one
+SANDBOX_MAX_RUNS = int(os.getenv("PYTHON_SANDBOX_MAX_RUNS", "20"))
+SANDBOX_CPU_SECONDS = int(os.getenv("PYTHON_SANDBOX_CPU_SECONDS", "10"))
+SANDBOX_WALL_SECONDS = float(os.getenv("PYTHON_SANDBOX_WALL_SECONDS", "30"))
+SANDBOX_MEMORY_MB = int(os.getenv("PYTHON_SANDBOX_MEMORY_MB", "1024"))
+# Memory cap of a session worker, sessions keep their data and need more
+SANDBOX_SESSION_MEMORY_MB = int(os.getenv("PYTHON_SANDBOX_SESSION_MEMORY_MB", "2048"))
+MAX_OUTPUT_CHARS = 20000
+
+# Imported once per worker, so code using them starts without import cost
+PRELOAD_MODULES = ("pandas", "numpy")
+_STARTUP_SECONDS = 120
+
+
+class _CpuLimitExceeded(BaseException):
+    pass
+
+
+def _truncate(text: str) -> str:
+    if len(text) > MAX_OUTPUT_CHARS:
+        return text[:MAX_OUTPUT_CHARS] + f"\n... [{len(text) - MAX_OUTPUT_CHARS} more characters truncated]"
+    return text
+
+
+def _on_sigxcpu(signum, frame):
+    raise _CpuLimitExceeded()
+
+
+def _set_cpu_limit(seconds: int) -> None:
+    """Limit the CPU time of the next run (RLIMIT_CPU counts the whole process, so add the time used so far)."""
+    if resource is None:
+        return
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    used = int(usage.ru_utime + usage.ru_stime) + 1
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    soft = used + seconds
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+
+def _set_memory_limit(memory_mb: int) -> None:
+    """Set the soft address space limit of the worker (0 = no limit)."""
+    if resource is None:
+        return
+    _, hard = resource.getrlimit(resource.RLIMIT_AS)
+    resource.setrlimit(resource.RLIMIT_AS, (memory_mb * 1024 * 1024 if memory_mb else hard, hard))
+
+
+def _new_namespace() -> dict:
+    return {"__name__": "__main__", "__builtins__": __builtins__}
+
+
+def _execute(code: str, namespace: dict) -> dict:
+    """Run code in `namespace`; the value of a trailing expression is returned like in a REPL."""
+    stdout, stderr = io.StringIO(), io.StringIO()
+    result, error = None, None
+    try:
+        tree = ast.parse(code, mode="exec")
+        last_expr = None
+        if tree.body and isinstance(tree.body[-1], ast.Expr):
+            last_expr = ast.Expression(tree.body.pop().value)
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            exec(compile(tree, "<code>", "exec"), namespace)
+            if last_expr is not None:
+                value = eval(compile(last_expr, "<code>", "eval"), namespace)
+                if value is not None:
+                    result = repr(value)
+    except _CpuLimitExceeded:
+        error = "TimeoutError: CPU time limit exceeded"
+    except MemoryError:
+        error = "MemoryError: memory limit exceeded"
+    except SystemExit as e:
+        error = f"SystemExit: {e.code}"
+    except BaseException as e:
+        # only the frames of the user code, not of the sandbox
+        frames = [frame for frame in traceback.extract_tb(e.__traceback__) if frame.filename == "<code>"]
+        location = f" (line {frames[-1].lineno})" if frames else ""
+        error = f"{type(e).__name__}: {e}{location}"
+    return {
+        "stdout": _truncate(stdout.getvalue()),
+        "stderr": _truncate(stderr.getvalue()),
+        "result": _truncate(result) if result is not None else None,
+        "error": error,
+    }
+
+
+def _failed(error: str) -> dict:
+    return {"stdout": "", "stderr": "", "result": None, "error": error}
+
+
+def _worker_main(conn) -> None:
+    """Entry point of a worker process: preload modules, then run code sent over `conn`."""
+    os.environ.setdefault("OPENBLAS_NUM_THREADS", "1")
+    os.environ.setdefault("OMP_NUM_THREADS", "1")
+    for module in PRELOAD_MODULES:
+        try:
+            __import__(module)
+        except ImportError:
+            pass
+
+    workdir = tempfile.mkdtemp(prefix="sandbox_")
+    os.chdir(workdir)
+    if resource is not None:
+        signal.signal(signal.SIGXCPU, _on_sigxcpu)
+    conn.send("ready")
+
+    # namespace of a session worker, kept from run to run
+    session_namespace = None
+
+    try:
+        while True:
+            try:
+                message = conn.recv()
+            except EOFError:
+                break
+            if message is None:
+                break
+            code, cpu_seconds, memory_mb, keep_namespace = message
+            if keep_namespace:
+                session_namespace = session_namespace if session_namespace is not None else _new_namespace()
+                namespace = session_namespace
+            else:
+                namespace = _new_namespace()
+            _set_memory_limit(memory_mb)
+            _set_cpu_limit(cpu_seconds)
+            conn.send(_execute(code, namespace))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+class _Worker:
+    def __init__(self, context):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.runs = 0
+        self.ready = False
+
+    def wait_ready(self, timeout: float) -> None:
+        if not self.ready:
+            if not self.conn.poll(timeout) or self.conn.recv() != "ready":
+                raise RuntimeError("Sandbox worker did not start")
+            self.ready = True
+
+    def kill(self) -> None:
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join(timeout=5)
+        self.conn.close()
+
+    def stop(self) -> None:
+        try:
+            self.conn.send(None)
+            self.process.join(timeout=2)
+        except (OSError, ValueError):
+            pass
+        self.kill()
+
+
+class SandboxPool:
+    """Fixed number of pre-warmed worker processes for running code."""
+
+    def __init__(self, size: int = SANDBOX_WORKERS, max_runs: int = SANDBOX_MAX_RUNS,
+                 cpu_seconds: int = SANDBOX_CPU_SECONDS, wall_seconds: float = SANDBOX_WALL_SECONDS,
+                 memory_mb: int = SANDBOX_MEMORY_MB, session_memory_mb: int = SANDBOX_SESSION_MEMORY_MB):
+        """
+        Start the worker processes (they import pandas/numpy in the background).
+
+        Args:
+            size (int): Number of worker processes, i.e. runs at the same time.
+            max_runs (int): Runs after which a worker is replaced.
+            cpu_seconds (int): CPU time limit per run.
+            wall_seconds (float): Wall-clock limit per run, the worker is killed after it.
+            memory_mb (int): Address space limit per worker in MB (0 = unlimited).
+            session_memory_mb (int): Address space limit of a session worker in MB (0 = unlimited).
+        """
+        self.max_runs = max_runs
+        self.cpu_seconds = cpu_seconds
+        self.wall_seconds = wall_seconds
+        self.memory_mb = memory_mb
+        self.session_memory_mb = session_memory_mb
+        self._context = multiprocessing.get_context("spawn")
+        self._idle = queue.Queue()
+        self._workers = set()
+        self._sessions: dict[str, _Worker] = {}
+        self._session_locks: dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._closed = False
+        for _ in range(max(1, size)):
+            self._idle.put(self._spawn())
+
+    def _spawn(self) -> _Worker:
+        worker = _Worker(self._context)
+        with self._lock:
+            self._workers.add(worker)
+        return worker
+
+    def _retire(self, worker: _Worker, kill: bool) -> None:
+        with self._lock:
+            self._workers.discard(worker)
+        worker.kill() if kill else worker.stop()
+        if not self._closed:
+            self._idle.put(self._spawn())
+
+    def _execute_on(self, worker: _Worker, code: str, cpu_seconds: Optional[int], wall_seconds: Optional[float],
+                    memory_mb: int, keep_namespace: bool) -> tuple[dict, bool]:
+        """Run code on a worker; returns (outcome, whether the worker is still usable)."""
+        wall_seconds = wall_seconds or self.wall_seconds
+        try:
+            worker.wait_ready(_STARTUP_SECONDS)
+            worker.conn.send((code, cpu_seconds or self.cpu_seconds, memory_mb, keep_namespace))
+            if not worker.conn.poll(wall_seconds):
+                return _failed(f"TimeoutError: execution took longer than {wall_seconds:g} seconds"), False
+            outcome = worker.conn.recv()
+        except (EOFError, OSError, RuntimeError) as e:
+            # the worker died, e.g. killed by the memory or hard CPU limit
+            return _failed(f"WorkerError: sandbox process died ({e or 'no output'})"), False
+        worker.runs += 1
+        return outcome, True
+
+    def run(self, code: str, cpu_seconds: Optional[int] = None, wall_seconds: Optional[float] = None,
+            session_id: Optional[str] = None) -> dict:
+        """
+        Execute code in a worker process.
+
+        Args:
+            code (str): Python source code.
+            cpu_seconds (int, optional): CPU time limit, defaults to the pool setting.
+            wall_seconds (float, optional): Wall-clock limit, defaults to the pool setting.
+            session_id (str, optional): Run in the persistent namespace of this session instead of fresh globals.
+
+        Returns:
+            dict: 'stdout', 'stderr', 'result' (repr of the last expression or None) and 'error' (or None).
+        """
+        if self._closed:
+            raise RuntimeError("Sandbox pool is closed")
+        if session_id is not None:
+            return self._run_in_session(code, session_id, cpu_seconds, wall_seconds)
+
+        worker = self._idle.get()
+        outcome, usable = self._execute_on(worker, code, cpu_seconds, wall_seconds, self.memory_mb, keep_namespace=False)
+        if not usable:
+            self._retire(worker, kill=True)
+        elif outcome["error"] and outcome["error"].startswith(("TimeoutError", "MemoryError")) or worker.runs >= self.max_runs:
+            self._retire(worker, kill=False)
+        else:
+            self._idle.put(worker)
+        return outcome
+
+    # -- sessions --
+
+    def _session_lock(self, session_id: str) -> threading.Lock:
+        with self._lock:
+            return self._session_locks.setdefault(session_id, threading.Lock())
+
+    def _run_in_session(self, code: str, session_id: str, cpu_seconds: Optional[int], wall_seconds: Optional[float]) -> dict:
+        # one run per session at a time, runs of different sessions are independent
+        with self._session_lock(session_id):
+            with self._lock:
+                worker = self._sessions.get(session_id)
+            if worker is None:
+                worker = self._take_warm_worker()
+                with self._lock:
+                    self._sessions[session_id] = worker
+
+            outcome, usable = self._execute_on(worker, code, cpu_seconds, wall_seconds, self.session_memory_mb,
+                                               keep_namespace=True)
+            if not usable:
+                self._drop_session(session_id, kill=True)
+                outcome["error"] += ". The Python session was reset, variables from earlier calls are lost."
+            return outcome
+
+    def _take_warm_worker(self) -> _Worker:
+        """Take an idle (already warm) worker for a session and start a replacement for the pool."""
+        try:
+            worker = self._idle.get_nowait()
+        except queue.Empty:
+            return self._spawn()
+        self._idle.put(self._spawn())
+        return worker
+
+    def _drop_session(self, session_id: str, kill: bool) -> None:
+        with self._lock:
+            worker = self._sessions.pop(session_id, None)
+            self._session_locks.pop(session_id, None)
+            self._workers.discard(worker)
+        if worker is not None:
+            worker.kill() if kill else worker.stop()
+
+    def close_session(self, session_id: str) -> None:
+        """End a session and stop its worker process (no-op for unknown sessions)."""
+        self._drop_session(session_id, kill=False)
+
+    def session_count(self) -> int:
+        with self._lock:
+            return len(self._sessions)
+
+    def close(self) -> None:
+        """Stop all worker processes."""
+        self._closed = True
+        with self._lock:
+            workers = list(self._workers)
+            self._workers.clear()
+            self._sessions.clear()
+        for worker in workers:
+            worker.stop()
+
+
+_pool: Optional[SandboxPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_sandbox_pool() -> SandboxPool:
+    """Return the process-wide sandbox pool, starting it on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = SandboxPool()
+    return _pool
+
+
+def close_session(session_id: str) -> None:
+    """End a session of the shared pool, if the pool was ever started."""
+    if _pool is not None:
+        _pool.close_session(session_id)
+
+
+def format_outcome(outcome: dict) -> str:
+    """Format a run result as tool output."""
+    parts = []
+    if outcome["stdout"]:
+        parts.append(outcome["stdout"].rstrip("\n"))
+    if outcome["result"] is not None:
+        parts.append(f"Result: {outcome['result']}")
+    if outcome["stderr"]:
+        parts.append(f"Stderr:\n{outcome['stderr'].rstrip()}")
+    if outcome["error"]:
+        parts.append(f"Error executing code: {outcome['error']}")
+    return "\n".join(parts) if parts else "Code executed without output. Use print() to show values."
@@ -0,0 +1,269 @@
+"""
+registry.py
+Lazy tool registry for the agent.
+Name, description and arguments of every tool are declared here, so the tool
+schemas can be bound to the LLM without importing the tool modules. A tool
+module (and its heavy dependencies like whisper, torch or pytesseract) is only
+imported when the tool is invoked for the first time.
+
+Run `python -m tools.registry` for an import-time report per tool module.
+"""
+
+import argparse
+import importlib
+import json
+import subprocess
+import sys
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Optional, Union
+
+from langchain_core.runnables import RunnableConfig
+from langchain_core.tools import BaseTool, StructuredTool, Tool
+from pydantic import Field, create_model
+
+
+@dataclass(frozen=True)
+class ToolSpec:
+    """Declaration of a tool: schema plus the location of its implementation."""
+    name: str
+    description: str
+    module: str
+    function: str
+    # None for tools with a single text input, otherwise {arg: (type, default, description)}
+    # with `...` as default for required arguments
+    args: Optional[dict] = None
+    # The implementation takes a `config: RunnableConfig` argument (e.g. for the session ID of the run)
+    needs_config: bool = False
+
+
+class LazyFunction:
+    """Callable that imports `module` and resolves `function` on the first call."""
+
+    def __init__(self, module: str, function: str):
+        self.module = module
+        self.function = function
+        self._func: Optional[Callable] = None
+        self._lock = threading.Lock()
+
+    def load(self) -> Callable:
+        """Import the implementation (once) and return it."""
+        if self._func is None:
+            with self._lock:
+                if self._func is None:
+                    self._func = getattr(importlib.import_module(self.module), self.function)
+        return self._func
+
+    @property
+    def loaded(self) -> bool:
+        return self._func is not None
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        return self.load()(*args, **kwargs)
+
+
+TOOL_SPECS: list[ToolSpec] = [
+    ToolSpec("get_defunct_countries",
+             "Returns a JSON-formatted list of countries that no longer exist, including their dissolution dates and successors.",
+             "tools.defunct_countries_tool", "get_defunct_countries"),
+    ToolSpec("current_time",
+             "Gibt die aktuelle UTC-Zeit zurück. Optional: Geben Sie eine andere Zeitzone an, um die Zeit in dieser Zeitzone zu erhalten.",
+             "tools.time_tool", "get_current_time"),
+    ToolSpec("download_file",
+             "Lädt eine Datei von einer gegebenen URL herunter und speichert sie lokal.",
+             "tools.download_tool", "download_file"),
+    ToolSpec("get_wikipedia_toc",
+             "List the sections of a Wikipedia page (table of contents). Provide the exact title of the Wikipedia page. Use search_wikipedia_page afterwards to read single sections.",
+             "tools.wiki_search_tool", "get_wikipedia_toc"),
+    ToolSpec("search_wikipedia_page",
+             "Return only the sections of a Wikipedia page that match a query, best match first. The query can also be a section number or title from get_wikipedia_toc. Prefer this over get_wikipedia_page.",
+             "tools.wiki_search_tool", "search_wikipedia_page",
+             {"title": (str, ..., "exact title of the Wikipedia page"),
+              "query": (str, ..., "search terms, section number or section title"),
+              "top_k": (int, 3, "maximum number of sections to return")}),
+    ToolSpec("get_wikipedia_page",
+             "Retrieve the full content of a Wikipedia page by title as compact text, with tables as CSV rows. Provide the exact title of the Wikipedia page. For long pages prefer get_wikipedia_toc and search_wikipedia_page.",
+             "tools.wiki_search_tool", "get_wikipedia_page"),
+    ToolSpec("search_wikipedia",
+             "Search Wikipedia for a given query string and return up to 5 results. Each result contains 'title' and 'snippet'.",
+             "tools.wiki_search_tool", "search_wikipedia"),
+    ToolSpec("web_search",
+             "Search The web for a given query string and return up to 3 results.",
+             "tools.tavily_search_tool", "web_search"),
+    ToolSpec("search_arxiv",
+             "Search ArXiv for a given query string and return up to 5 results. Each result contains 'title', 'summary', and 'url'.",
+             "tools.arxiv_search_tool", "search_arxiv"),
+    ToolSpec("extract_text_from_image",
+             "Extract text from images using Tesseract OCR. Provide the paths of the image files (several images and multi-page TIFFs are read in one call). The Text will be returned in a string format and ended with [END OF TEXT].",
+             "tools.extract_text_from_image_tool", "extract_text_from_image",
+             {"image_paths": (list[str], ..., "paths of the image files"),
+              "lang": (Optional[str], None, "Tesseract language(s), e.g. 'eng' or 'eng+deu'; default eng")}),
+    ToolSpec("get_youtube_transcript",
+             "Get the transcript of a YouTube video. Uses the captions of the video if available, otherwise transcribes the audio. Provide the URL of the YouTube video. The Text will be returned in a string format and ended with [END OF TEXT].",
+             "tools.extract_audio_from_youtube_tool", "get_youtube_transcript"),
+    ToolSpec("extract_audio_from_youtube",
+             "Extract audio from a YouTube video and save it in the specified format. Provide the URL of the YouTube video. The audio will be saved in a temporary directory.",
+             "tools.extract_audio_from_youtube_tool", "extract_audio_from_youtube"),
+    ToolSpec("extract_text_from_audio",
+             "Extract text from an audio file using Whisper. Provide the path to the audio file. The Text will be returned in a string format and ended with [END OF TEXT].",
+             "tools.extract_text_from_audio_tool", "extract_text_from_audio"),
+    ToolSpec("extract_text_from_document",
+             "Extract the text of a PDF or Word (DOCX) document page by page; scanned pages are read with OCR. Provide the path to the file and optionally the pages, e.g. '3-5', to read only part of a long document.",
+             "tools.extract_text_from_document_tool", "extract_text_from_document",
+             {"file_path": (str, ..., "path to the PDF or DOCX file"),
+              "pages": (Optional[str], None, "pages to extract, e.g. '3-5' or '1,4,7-9'; all pages if omitted")}),
+    ToolSpec("analyse_excel_file",
+             "Analyze an Excel file and return its sheets and basic statistics of a sheet. Provide the path to the Excel file and optionally the sheet name and a column range.",
+             "tools.analyse_excel_file_tool", "analyse_excel_file",
+             {"file_path": (str, ..., "path to the Excel file"),
+              "sheet_name": (Optional[str], None, "sheet to analyse; the first sheet if omitted"),
+              "columns": (Optional[str], None, "Excel column range to analyse, e.g. 'B:D'; all columns if omitted")}),
+    ToolSpec("analyse_csv_file",
+             "Analyze a CSV file and return basic statistics or information about a specific column. Provide the path to the CSV file and optionally the column name. Large files are analysed in streaming mode.",
+             "tools.analyse_csv_file_tool", "analyse_csv_file",
+             {"file_path": (str, ..., "path to the CSV file"),
+              "column_name": (Optional[str], None, "column to analyse; all numeric columns if omitted")}),
+    ToolSpec("describe_table_file",
+             "Load a CSV or Excel file into a SQL database and return its tables, columns and first rows. Provide the path to the file. Use it before sql_query_file.",
+             "tools.sql_query_tool", "describe_table_file"),
+    ToolSpec("sql_query_file",
+             "Run a read-only SQL SELECT query (SQLite dialect) against a CSV or Excel file and return the result rows as CSV. Use the table and column names from describe_table_file. Do filtering and aggregation in SQL.",
+             "tools.sql_query_tool", "sql_query_file",
+             {"file_path": (str, ..., "path to the CSV or Excel file"),
+              "query": (str, ..., "SELECT query"),
+              "max_rows": (Optional[int], None, "maximum number of rows to return")}),
+    ToolSpec("read_result",
+             "Read parts of a long tool result that was stored under a handle (e.g. 'result-1'). Give a query to get the most relevant chunks, or chunk numbers such as '2-4'.",
+             "tools.result_store", "read_result",
+             {"handle": (str, ..., "handle of the stored result, e.g. 'result-1'"),
+              "query": (Optional[str], None, "text to search for in the stored result"),
+              "chunks": (Optional[str], None, "chunk numbers to read, e.g. '3' or '2-4', if no query is given")},
+             needs_config=True),
+    ToolSpec("calculate",
+             "Evaluate a whole calculation in one call. Give a list of expressions such as '(a + b) * 2' or assignments such as 'total = price * 1.19' (later expressions can use earlier names). Operators: + - * / // % ** and comparisons; functions: sqrt, log(x, base), exp, sin, cos, tan, floor, ceil, round, factorial, comb, gcd, sum, min, max, mean, median, stdev, percentage(part, whole). Lists are evaluated element-wise. Integers never overflow.",
+             "tools.calculator", "calculate",
+             {"expressions": (list[str], ..., "expressions or 'name = expression' assignments, evaluated in order"),
+              "variables": (Optional[dict[str, Union[int, float, list[Union[int, float]]]]], None,
+                            "names with numbers or lists of numbers"),
+              "mode": (str, "float", "'float', 'fraction' for exact rational results or 'decimal' for 50 significant digits")}),
+    ToolSpec("execute_python_code",
+             "Execute Python code and return the result. Provide the Python code as a string. Variables and loaded data are kept between calls for the same question.",
+             "tools.python_interpreter_tool", "execute_python_code", needs_config=True),
+    ToolSpec("parse_python_code",
+             "Parse Python code and return the abstract syntax tree (AST) representation. Provide the Python code as a string.",
+             "tools.python_interpreter_tool", "parse_python_code"),
+    ToolSpec("execute_python_code_with_output",
+             "Execute Python code and return the result. Provide the Python code as a string. Variables and loaded data are kept between calls for the same question.",
+             "tools.python_interpreter_tool", "execute_python_code_with_output", needs_config=True),
+]
+
+
+def tool_description(name: str) -> str:
+    """Description of the tool `name` from TOOL_SPECS, for the Tool objects in the tool modules."""
+    for spec in TOOL_SPECS:
+        if spec.name == name:
+            return spec.description
+    raise KeyError(f"No tool spec named {name!r}")
+
+
+def _with_config(func: LazyFunction) -> Callable:
+    """Wrap a lazy function so LangChain sees (and injects) the RunnableConfig parameter."""
+    def call(*args: Any, config: RunnableConfig, **kwargs: Any) -> Any:
+        return func(*args, config=config, **kwargs)
+    call.lazy = func
+    return call
+
+
+def build_tool(spec: ToolSpec) -> BaseTool:
+    """
+    Build a LangChain tool for a spec without importing the implementation.
+
+    Args:
+        spec (ToolSpec): The tool declaration.
+
+    Returns:
+        BaseTool: A Tool (single text input) or StructuredTool (declared arguments).
+    """
+    func = LazyFunction(spec.module, spec.function)
+    if spec.needs_config:
+        func = _with_config(func)
+    if spec.args is None:
+        return Tool(name=spec.name, func=func, description=spec.description)
+
+    fields = {arg: (type_, Field(default, description=doc)) for arg, (type_, default, doc) in spec.args.items()}
+    args_schema = create_model(f"{spec.name}_args", **fields)
+    return StructuredTool(name=spec.name, description=spec.description, func=func, args_schema=args_schema)
+
+
+def load_tools(specs: Optional[list[ToolSpec]] = None) -> list[BaseTool]:
+    """Build lazy tools for all specs (default: TOOL_SPECS), keeping their order."""
+    return [build_tool(spec) for spec in (specs if specs is not None else TOOL_SPECS)]
+
+
+def measure_import_time(module: str) -> dict:
+    """
+    Import `module` in a fresh interpreter with `-X importtime`.
+
+    Returns:
+        dict: module, cumulative import time in ms and the number of modules imported with it.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True,
+    )
+    cumulative_us = None
+    count = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = [part.strip() for part in line[len("import time:"):].split("|")]
+        if not parts[0].isdigit():
+            continue  # header line
+        count += 1
+        if parts[2] == module:
+            cumulative_us = int(parts[1])
+    return {
+        "module": module,
+        "cumulative_ms": cumulative_us / 1000 if cumulative_us is not None else None,
+        "modules_imported": count,
+        "error": result.stderr.strip().splitlines()[-1] if result.returncode != 0 else None,
+    }
+
+
+# Imported by every tool module, so its cost is reported separately
+BASELINE_MODULE = "langchain.agents"
+
+
+def import_time_report(specs: Optional[list[ToolSpec]] = None) -> list[dict]:
+    """
+    Measure the import time of every tool module, slowest first.
+    `own_ms` is the import time on top of the shared BASELINE_MODULE.
+    """
+    specs = specs if specs is not None else TOOL_SPECS
+    baseline_ms = measure_import_time(BASELINE_MODULE)["cumulative_ms"] or 0
+    modules = sorted({spec.module for spec in specs})
+    rows = []
+    for module in modules:
+        row = measure_import_time(module)
+        row["tools"] = [spec.name for spec in specs if spec.module == module]
+        row["own_ms"] = max(row["cumulative_ms"] - baseline_ms, 0) if row["cumulative_ms"] is not None else None
+        rows.append(row)
+    return sorted(rows, key=lambda row: row["own_ms"] or 0, reverse=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import-time report per tool module.")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON.")
+    args = parser.parse_args()
+
+    report = import_time_report()
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"{'module':40} {'import ms':>10} {'own ms':>8} {'modules':>8}  tools")
+        for row in report:
+            ms = f"{row['cumulative_ms']:.1f}" if row["cumulative_ms"] is not None else "error"
+            own = f"{row['own_ms']:.1f}" if row["own_ms"] is not None else "-"
+            print(f"{row['module']:40} {ms:>10} {own:>8} {row['modules_imported']:>8}  {', '.join(row['tools'])}")
+            if row["error"]:
+                print(f"    {row['error']}")
@@ -0,0 +1,232 @@
+"""
+result_store.py
+Per-run store for oversized tool results.
+A tool result longer than SPILL_THRESHOLD_CHARS is not put into the message
+history. It is kept here, split into chunks and indexed (BM25, plus embeddings
+of the agent's embedding model when one is configured), and the history only
+gets a short preview with a handle. The read_result tool then returns the
+chunks that match a query, or a range of chunks, from that handle.
+Results are stored per graph run (the session ID in the RunnableConfig) and
+dropped when the run is closed.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+import numpy as np
+from langchain_core.messages import ToolMessage
+from langchain_core.runnables import RunnableConfig
+
+from tools.text_index import BM25Index
+
+SPILL_THRESHOLD_CHARS = int(os.getenv("SPILL_THRESHOLD_CHARS", "12000"))
+RESULT_CHUNK_CHARS = int(os.getenv("RESULT_CHUNK_CHARS", "1500"))
+RESULT_PREVIEW_CHARS = 1000
+RESULT_TOP_K = 3
+# Runs kept at most; the oldest is dropped if runs are never closed
+MAX_RUNS = 32
+# Rank constant of the reciprocal rank fusion of BM25 and embedding ranks
+_RRF_K = 60
+# Tools whose output is never spilled
+NEVER_SPILL = {"read_result"}
+
+_DEFAULT_RUN = "default"
+
+
+def chunk_text(text: str, max_chars: int = RESULT_CHUNK_CHARS) -> list[str]:
+    """Split a text into chunks of at most max_chars, at line breaks where possible."""
+    chunks, current = [], ""
+    for line in text.splitlines(keepends=True):
+        while len(line) > max_chars:
+            # a single very long line (e.g. minified JSON): cut it hard
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(line[:max_chars])
+            line = line[max_chars:]
+        if len(current) + len(line) > max_chars:
+            chunks.append(current)
+            current = ""
+        current += line
+    if current.strip():
+        chunks.append(current)
+    return [chunk for chunk in chunks if chunk.strip()]
+
+
+class StoredResult:
+    """One spilled tool result with its chunks and indexes."""
+
+    def __init__(self, handle: str, tool_name: str, text: str, embeddings: Any = None):
+        self.handle = handle
+        self.tool_name = tool_name
+        self.text = text
+        self.chunks = chunk_text(text)
+        self.index = BM25Index(self.chunks)
+        self.embeddings = embeddings
+        self._vectors: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+
+    def _chunk_vectors(self) -> np.ndarray:
+        """Embeddings of the chunks, computed on the first query."""
+        with self._lock:
+            if self._vectors is None:
+                vectors = np.asarray(self.embeddings.embed_documents(self.chunks), dtype=np.float32)
+                self._vectors = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+            return self._vectors
+
+    def search(self, query: str, top_k: int = RESULT_TOP_K) -> list[int]:
+        """Chunk numbers (0-based) for a query, best first."""
+        lexical = [index for index, _ in self.index.search(query, top_k=len(self.chunks))]
+        if self.embeddings is None:
+            return lexical[:top_k]
+        try:
+            query_vector = np.asarray(self.embeddings.embed_query(query), dtype=np.float32)
+            query_vector /= max(float(np.linalg.norm(query_vector)), 1e-12)
+            semantic = list(np.argsort(-(self._chunk_vectors() @ query_vector)))
+        except Exception as e:
+            print(f"Embedding search failed, using BM25 only: {str(e)}")
+            return lexical[:top_k]
+        scores: dict[int, float] = {}
+        for ranking in (lexical, semantic):
+            for rank, index in enumerate(ranking):
+                scores[int(index)] = scores.get(int(index), 0.0) + 1.0 / (_RRF_K + rank + 1)
+        return sorted(scores, key=scores.get, reverse=True)[:top_k]
+
+
+class ResultStore:
+    """Spilled results of all runs, safe to use from several threads."""
+
+    def __init__(self, threshold: int = SPILL_THRESHOLD_CHARS, max_runs: int = MAX_RUNS):
+        self.threshold = threshold
+        self.max_runs = max_runs
+        self.embeddings = None
+        self._runs: OrderedDict[str, dict[str, StoredResult]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, run_id: str, tool_name: str, text: str) -> StoredResult:
+        with self._lock:
+            results = self._runs.setdefault(run_id, {})
+            self._runs.move_to_end(run_id)
+            while len(self._runs) > self.max_runs:
+                self._runs.popitem(last=False)
+            handle = f"result-{len(results) + 1}"
+            results[handle] = StoredResult(handle, tool_name, text, self.embeddings)
+            return results[handle]
+
+    def get(self, run_id: str, handle: str) -> Optional[StoredResult]:
+        with self._lock:
+            return self._runs.get(run_id, {}).get(handle.strip())
+
+    def close_run(self, run_id: str) -> None:
+        with self._lock:
+            self._runs.pop(run_id, None)
+
+    def run_count(self) -> int:
+        with self._lock:
+            return len(self._runs)
+
+
+_store = ResultStore()
+
+
+def get_result_store() -> ResultStore:
+    """Return the process-wide result store."""
+    return _store
+
+
+def close_run(run_id: str) -> None:
+    """Drop the stored results of a run."""
+    _store.close_run(run_id)
+
+
+def _run_id(config: Optional[RunnableConfig]) -> str:
+    return ((config or {}).get("configurable") or {}).get("session_id") or _DEFAULT_RUN
+
+
+def _config_store(config: Optional[RunnableConfig]) -> ResultStore:
+    """The store the spilling node put into the config, or the process-wide store."""
+    return ((config or {}).get("configurable") or {}).get("result_store") or _store
+
+
+def spill_message(message: ToolMessage, run_id: str, store: Optional[ResultStore] = None) -> ToolMessage:
+    """Return the message itself, or a preview with a handle if its content is too long."""
+    store = store or _store
+    content = message.content
+    if not isinstance(content, str) or len(content) <= store.threshold or message.name in NEVER_SPILL:
+        return message
+    stored = store.put(run_id, message.name or "tool", content)
+    preview = content[:RESULT_PREVIEW_CHARS].rstrip()
+    note = (f"[Output too long ({len(content)} characters), stored as handle '{stored.handle}' "
+            f"in {len(stored.chunks)} chunks. Use read_result(handle='{stored.handle}', query='...') "
+            f"for the relevant parts or read_result(handle='{stored.handle}', chunks='2-4') for a range.]")
+    return ToolMessage(content=f"{preview}\n...\n{note}", tool_call_id=message.tool_call_id,
+                       name=message.name, id=message.id, status=message.status,
+                       artifact={"result_handle": stored.handle, "chars": len(content)})
+
+
+def make_spilling_tool_node(tool_node: Any, embeddings: Any = None,
+                            store: Optional[ResultStore] = None) -> Callable:
+    """
+    Wrap a ToolNode so that oversized results are spilled to the result store.
+
+    Args:
+        tool_node: The LangGraph ToolNode.
+        embeddings: Embedding model (embed_documents/embed_query) for the semantic search, optional.
+        store (ResultStore, optional): Defaults to the process-wide store. It is passed to
+            read_result through the config, so results are read from the store they were written to.
+
+    Returns:
+        Callable: Graph node with the same input and output as the ToolNode.
+    """
+    store = store or _store
+    if embeddings is not None:
+        store.embeddings = embeddings
+
+    def tools(state: dict, config: RunnableConfig) -> Any:
+        configurable = {**(config.get("configurable") or {}), "result_store": store}
+        output = tool_node.invoke(state, {**config, "configurable": configurable})
+        if not isinstance(output, dict) or "messages" not in output:
+            return output
+        run_id = _run_id(config)
+        messages = [spill_message(message, run_id, store) if isinstance(message, ToolMessage) else message
+                    for message in output["messages"]]
+        return {**output, "messages": messages}
+    return tools
+
+
+def read_result(handle: str, query: Optional[str] = None, chunks: Optional[str] = None,
+                config: RunnableConfig = None) -> str:
+    """
+    Read parts of a stored tool result.
+
+    Args:
+        handle (str): Handle from the preview, e.g. 'result-1'.
+        query (str, optional): Return the chunks that best match this text.
+        chunks (str, optional): Chunk numbers like '3' or '2-4' (1-based). Used if no query is given.
+        config (RunnableConfig, optional): Injected by LangChain, carries the session ID of the run
+            and the result store of the spilling node.
+
+    Returns:
+        str: The selected chunks under '### Chunk N/M' headings.
+    """
+    from tools.document_extraction import parse_page_range
+
+    try:
+        stored = _config_store(config).get(_run_id(config), handle)
+        if stored is None:
+            return f"Error: Unknown result handle {handle!r}."
+        if query:
+            selected = stored.search(query)
+            if not selected:
+                return f"No chunk of {stored.handle} matches {query!r}. Try other words or read chunks by number."
+        else:
+            try:
+                selected = [n - 1 for n in parse_page_range(chunks or "1", len(stored.chunks))][:10]
+            except ValueError:
+                return f"Error: {stored.handle} has chunks 1 to {len(stored.chunks)}, got {chunks!r}."
+        total = len(stored.chunks)
+        return "\n\n".join(f"### Chunk {n + 1}/{total}\n{stored.chunks[n].strip()}" for n in selected)
+    except Exception as e:
+        return f"Error reading result: {str(e)}"
@@ -0,0 +1,246 @@
+"""
+sql_query_tool.py
+LangChain Tools for SQL queries over CSV and Excel files.
+A file is loaded once into an indexed SQLite database that is keyed by the
+SHA-256 of the file, so later questions about the same file (or a copy of it)
+query the database directly. Only read-only SELECT queries are allowed, with a
+time limit and a limit on the returned rows; aggregation happens in SQLite
+instead of in the prompt.
+"""
+
+import csv
+import io
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import closing
+from typing import Optional
+
+import pandas as pd
+from langchain.agents import Tool
+
+from tools.excel_loader import file_hash, load_workbook_sheets
+from tools.registry import tool_description
+
+SQL_CACHE_DIR = os.getenv("SQL_CACHE_DIR", os.path.join(tempfile.gettempdir(), "agent_sql_cache"))
+SQL_MAX_ROWS = int(os.getenv("SQL_MAX_ROWS", "50"))
+SQL_TIMEOUT_SECONDS = float(os.getenv("SQL_TIMEOUT_SECONDS", "10"))
+# Tables with more rows get an index on every column (up to MAX_INDEXED_COLUMNS)
+INDEX_MIN_ROWS = 1000
+MAX_INDEXED_COLUMNS = 16
+CSV_LOAD_CHUNK_ROWS = 100000
+# Bump when the loading changes, so old databases are rebuilt
+_SCHEMA_VERSION = 1
+
+EXCEL_EXTENSIONS = (".xlsx", ".xlsm", ".xls")
+
+_ALLOWED_ACTIONS = {sqlite3.SQLITE_SELECT, sqlite3.SQLITE_READ, sqlite3.SQLITE_FUNCTION}
+if hasattr(sqlite3, "SQLITE_RECURSIVE"):
+    _ALLOWED_ACTIONS.add(sqlite3.SQLITE_RECURSIVE)
+_ALLOWED_PRAGMAS = {"table_info", "table_xinfo", "index_list", "index_info"}
+
+# file hash -> database path, and the locks that build every database only once
+_databases: dict[str, str] = {}
+_locks: dict[str, threading.Lock] = {}
+_lock = threading.Lock()
+
+
+def _identifier(name: str, used: set) -> str:
+    """SQL-friendly lower-case identifier, unique within `used`."""
+    identifier = re.sub(r"[^0-9a-zA-Z]+", "_", str(name)).strip("_").lower() or "column"
+    if identifier[0].isdigit():
+        identifier = f"c_{identifier}"
+    candidate, n = identifier, 2
+    while candidate in used:
+        candidate, n = f"{identifier}_{n}", n + 1
+    used.add(candidate)
+    return candidate
+
+
+def _is_excel(path: str) -> bool:
+    return path.lower().endswith(EXCEL_EXTENSIONS)
+
+
+def _frames(path: str):
+    """Yield (table name, sheet name, DataFrame chunks) for a CSV or Excel file."""
+    if _is_excel(path):
+        for sheet, df in load_workbook_sheets(path).items():
+            yield sheet, sheet, [df]
+    else:
+        yield "data", None, pd.read_csv(path, chunksize=CSV_LOAD_CHUNK_ROWS)
+
+
+def _build_database(path: str, db_path: str) -> None:
+    tmp_path = f"{db_path}.{threading.get_ident()}.tmp"
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.execute("CREATE TABLE _columns (table_name TEXT, column_name TEXT, original_name TEXT)")
+        conn.execute("CREATE TABLE _tables (table_name TEXT, sheet_name TEXT, row_count INTEGER)")
+        used_tables = {"_columns", "_tables"}
+        for name, sheet, chunks in _frames(path):
+            table = _identifier(name, used_tables)
+            columns = None
+            rows = 0
+            for chunk in chunks:
+                if columns is None:
+                    used_columns = set()
+                    columns = [_identifier(column, used_columns) for column in chunk.columns]
+                    conn.executemany("INSERT INTO _columns VALUES (?, ?, ?)",
+                                     [(table, column, str(original)) for column, original in zip(columns, chunk.columns)])
+                chunk.columns = columns
+                chunk.to_sql(table, conn, index=False, if_exists="append")
+                rows += len(chunk)
+            if columns is None:
+                continue
+            conn.execute("INSERT INTO _tables VALUES (?, ?, ?)", (table, sheet, rows))
+            if rows >= INDEX_MIN_ROWS:
+                for column in columns[:MAX_INDEXED_COLUMNS]:
+                    conn.execute(f'CREATE INDEX "idx_{table}_{column}" ON "{table}" ("{column}")')
+        conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+        conn.commit()
+    finally:
+        conn.close()
+    os.replace(tmp_path, db_path)
+
+
+def _database(path: str) -> str:
+    """Path of the SQLite database of a file, building it on first use (once per file)."""
+    digest = file_hash(path)
+    with _lock:
+        if digest in _databases:
+            return _databases[digest]
+        file_lock = _locks.setdefault(digest, threading.Lock())
+
+    with file_lock:
+        with _lock:
+            if digest in _databases:
+                return _databases[digest]
+        os.makedirs(SQL_CACHE_DIR, exist_ok=True)
+        db_path = os.path.join(SQL_CACHE_DIR, f"{digest}.sqlite")
+        if os.path.isfile(db_path):
+            with closing(sqlite3.connect(db_path)) as check:
+                version = check.execute("PRAGMA user_version").fetchone()[0]
+            if version != _SCHEMA_VERSION:
+                os.remove(db_path)
+        if not os.path.isfile(db_path):
+            start = time.perf_counter()
+            _build_database(path, db_path)
+            print(f"Loaded {path} into SQLite in {time.perf_counter() - start:.2f}s.")
+        with _lock:
+            _databases[digest] = db_path
+        return db_path
+
+
+def _connection(path: str) -> sqlite3.Connection:
+    """
+    New read-only connection to the database of a file.
+
+    One connection per call, so queries of different questions (and files) run in
+    parallel; opening a read-only SQLite file takes well under a millisecond.
+    """
+    conn = sqlite3.connect(f"file:{_database(path)}?mode=ro", uri=True)
+    conn.set_authorizer(_authorize)
+    return conn
+
+
+def _authorize(action, arg1, arg2, db_name, trigger):
+    # SELECT only; PRAGMA table_info is allowed to read the schema
+    if action in _ALLOWED_ACTIONS or (action == sqlite3.SQLITE_PRAGMA and arg1 in _ALLOWED_PRAGMAS):
+        return sqlite3.SQLITE_OK
+    return sqlite3.SQLITE_DENY
+
+
+def _clean_path(file_path: str) -> str:
+    return file_path.strip().strip("'\"")
+
+
+def describe_table_file(file_path: str) -> str:
+    """
+    Load a CSV or Excel file into SQLite (once) and return the schema of its tables.
+
+    Args:
+        file_path (str): Path to the CSV or Excel file.
+
+    Returns:
+        str: Tables with row counts, columns with types and the first rows.
+    """
+    try:
+        file_path = _clean_path(file_path)
+        if not os.path.isfile(file_path):
+            return f"Error: The file {file_path} does not exist."
+        with closing(_connection(file_path)) as conn:
+            tables = conn.execute("SELECT table_name, sheet_name, row_count FROM _tables").fetchall()
+            parts = []
+            for table, sheet, rows in tables:
+                originals = dict(conn.execute("SELECT column_name, original_name FROM _columns WHERE table_name = ?",
+                                              (table,)).fetchall())
+                columns = conn.execute(f'PRAGMA table_info("{table}")').fetchall()
+                sample = conn.execute(f'SELECT * FROM "{table}" LIMIT 3').fetchall()
+                lines = [f"Table {table} ({rows} rows{f', sheet {sheet!r}' if sheet else ''}):"]
+                for column in columns:
+                    name, type_ = column[1], column[2] or "TEXT"
+                    original = originals.get(name)
+                    note = f"  -- {original!r}" if original is not None and original != name else ""
+                    lines.append(f"  {name} {type_}{note}")
+                lines.append("First rows:")
+                lines.append(_to_csv([column[1] for column in columns], sample))
+                parts.append("\n".join(lines))
+        return "\n\n".join(parts) + "\nQuery the tables with sql_query_file."
+    except Exception as e:
+        return f"Error loading table file: {str(e)}"
+
+
+def _to_csv(header: list, rows: list) -> str:
+    out = io.StringIO()
+    writer = csv.writer(out, lineterminator="\n")
+    writer.writerow(header)
+    writer.writerows(rows)
+    return out.getvalue().rstrip("\n")
+
+
+def sql_query_file(file_path: str, query: str, max_rows: Optional[int] = None) -> str:
+    """
+    Run a read-only SQL query (SQLite dialect) against a CSV or Excel file.
+
+    Args:
+        file_path (str): Path to the CSV or Excel file.
+        query (str): A SELECT query. Tables and columns as listed by describe_table_file.
+        max_rows (int, optional): Maximum number of rows to return (default SQL_MAX_ROWS).
+
+    Returns:
+        str: The result as CSV, with a note when rows were cut off.
+    """
+    max_rows = max_rows or SQL_MAX_ROWS
+    try:
+        file_path = _clean_path(file_path)
+        if not os.path.isfile(file_path):
+            return f"Error: The file {file_path} does not exist."
+        deadline = time.monotonic() + SQL_TIMEOUT_SECONDS
+        with closing(_connection(file_path)) as conn:
+            conn.set_progress_handler(lambda: int(time.monotonic() > deadline), 10000)
+            cursor = conn.execute(query.strip().rstrip(";"))
+            header = [column[0] for column in cursor.description or []]
+            rows = cursor.fetchmany(max_rows + 1)
+        result = _to_csv(header, rows[:max_rows])
+        if len(rows) > max_rows:
+            result += f"\n... (only the first {max_rows} rows are shown; aggregate in SQL or add LIMIT/WHERE)"
+        return result
+    except sqlite3.DatabaseError as e:
+        message = str(e)
+        if message == "interrupted":
+            message = f"query took longer than {SQL_TIMEOUT_SECONDS:g} seconds"
+        elif "not authorized" in message:
+            message = "only SELECT queries are allowed"
+        return f"Error executing SQL query: {message}"
+    except Exception as e:
+        return f"Error executing SQL query: {str(e)}"
+
+
+describe_table_file_tool = Tool(
+    name="describe_table_file",
+    func=describe_table_file,
+    description=tool_description("describe_table_file")
+)
@@ -0,0 +1,238 @@
+"""
+streaming_stats.py
+describe()-like statistics for CSV files of any size.
+The file is read in chunks (only the requested columns) and every column keeps
+a small, bounded summary: count/mean/std via Welford, min/max, approximate
+quantiles from a KLL-style sketch and approximate top-k frequencies
+(Misra-Gries) for text columns. Memory depends on the chunk size and the
+sketch sizes, not on the size of the file.
+"""
+
+import os
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+CSV_CHUNK_ROWS = int(os.getenv("CSV_CHUNK_ROWS", "200000"))
+# Items per sketch level; the rank error of the quantiles is roughly 1/k per level
+QUANTILE_SKETCH_K = 2048
+# Distinct values tracked per text column for the top-k frequencies
+TOP_K_CAPACITY = 1000
+# Distinct values counted exactly per text column, above it 'unique' is a lower bound
+UNIQUE_CAP = 100000
+QUANTILES = (0.25, 0.5, 0.75)
+
+
+class RunningStats:
+    """Count, mean, variance (Welford/Chan), min and max, updated chunk by chunk."""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, values: np.ndarray) -> None:
+        n = len(values)
+        if n == 0:
+            return
+        mean = float(values.mean())
+        m2 = float(((values - mean) ** 2).sum())
+        total = self.count + n
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += m2 + delta ** 2 * self.count * n / total
+        self.count = total
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+    @property
+    def std(self) -> float:
+        # sample standard deviation, like pandas (ddof=1)
+        return float(np.sqrt(self.m2 / (self.count - 1))) if self.count > 1 else float("nan")
+
+
+class QuantileSketch:
+    """
+    KLL-style quantile sketch: every level holds at most k items, items on
+    level i stand for 2**i values. A full level is sorted and every second item
+    (random offset) moves up one level.
+    """
+
+    def __init__(self, k: int = QUANTILE_SKETCH_K, seed: int = 0):
+        self.k = k
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values: np.ndarray) -> None:
+        self.levels[0] = np.concatenate([self.levels[0], values.astype(np.float64)])
+        level = 0
+        while level < len(self.levels):
+            if len(self.levels[level]) > self.k:
+                items = np.sort(self.levels[level])
+                # an odd item stays on its level, so the weights remain exact
+                keep, items = (items[-1:], items[:-1]) if len(items) % 2 else (items[:0], items)
+                promoted = items[self._rng.integers(2)::2]
+                self.levels[level] = keep
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            level += 1
+
+    def quantiles(self, qs) -> list[float]:
+        items = np.concatenate(self.levels)
+        if len(items) == 0:
+            return [float("nan")] * len(qs)
+        weights = np.concatenate([np.full(len(level), 2.0 ** i) for i, level in enumerate(self.levels)])
+        order = np.argsort(items, kind="stable")
+        items, cumulative = items[order], np.cumsum(weights[order])
+        total = cumulative[-1]
+        return [float(items[min(np.searchsorted(cumulative, q * total), len(items) - 1)]) for q in qs]
+
+    def size(self) -> int:
+        return sum(len(level) for level in self.levels)
+
+
+class FrequentItems:
+    """Approximate most frequent values (Misra-Gries summary with `capacity` counters)."""
+
+    def __init__(self, capacity: int = TOP_K_CAPACITY, unique_cap: int = UNIQUE_CAP):
+        self.capacity = capacity
+        self.counts: dict = {}
+        # upper bound of how much any count may be too low
+        self.error = 0
+        self.unique_cap = unique_cap
+        self._unique = set()
+        self.unique_exact = True
+
+    def update(self, values: pd.Series) -> None:
+        for value, count in values.value_counts(dropna=True).items():
+            self.counts[value] = self.counts.get(value, 0) + int(count)
+            if self.unique_exact:
+                self._unique.add(value)
+        if self.unique_exact and len(self._unique) > self.unique_cap:
+            self.unique_exact = False
+            self._unique = set()
+        if len(self.counts) > self.capacity:
+            threshold = sorted(self.counts.values(), reverse=True)[self.capacity]
+            self.counts = {value: count - threshold for value, count in self.counts.items() if count > threshold}
+            self.error += threshold
+
+    @property
+    def unique(self):
+        return len(self._unique) if self.unique_exact else f">{self.unique_cap}"
+
+    def top(self, n: int = 1) -> list[tuple]:
+        return sorted(self.counts.items(), key=lambda item: item[1], reverse=True)[:n]
+
+
+def _is_numeric(dtype) -> bool:
+    return pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype)
+
+
+class ColumnSummary:
+    """Streaming summary of one column, numeric or text."""
+
+    def __init__(self, name: str, numeric: bool):
+        self.name = name
+        self.numeric = numeric
+        self.rows = 0
+        if numeric:
+            self.stats = RunningStats()
+            self.sketch = QuantileSketch()
+        else:
+            self.count = 0
+            self.frequent = FrequentItems()
+
+    def update(self, column: pd.Series) -> None:
+        self.rows += len(column)
+        if self.numeric:
+            values = pd.to_numeric(column, errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+            values = values[~np.isnan(values)]
+            self.stats.update(values)
+            self.sketch.update(values)
+        else:
+            column = column.dropna()
+            self.count += len(column)
+            self.frequent.update(column)
+
+    def describe(self) -> pd.Series:
+        """Statistics with the same row names as pandas' describe()."""
+        if self.numeric:
+            s = self.stats
+            q25, q50, q75 = self.sketch.quantiles(QUANTILES)
+            if s.count:
+                # the sketch can only return values it has seen; clamp to the exact extremes
+                q25, q50, q75 = (min(max(q, s.min), s.max) for q in (q25, q50, q75))
+            values = [s.count, s.mean if s.count else np.nan, s.std, s.min if s.count else np.nan,
+                      q25, q50, q75, s.max if s.count else np.nan]
+            return pd.Series(values, index=["count", "mean", "std", "min", "25%", "50%", "75%", "max"],
+                             name=self.name, dtype=np.float64)
+        top = self.frequent.top(1)
+        values = [self.count, self.frequent.unique, top[0][0] if top else np.nan, top[0][1] if top else np.nan]
+        return pd.Series(values, index=["count", "unique", "top", "freq"], name=self.name, dtype=object)
+
+    def top_values(self, n: int = 10) -> list[tuple]:
+        return self.frequent.top(n) if not self.numeric else []
+
+
+def summarize_csv(file_path: str, columns: Optional[list[str]] = None, chunk_rows: int = CSV_CHUNK_ROWS,
+                  **read_csv_kwargs) -> dict[str, ColumnSummary]:
+    """
+    Read a CSV file in chunks and build a summary per column.
+
+    Args:
+        file_path (str): Path to the CSV file.
+        columns (list[str], optional): Only read these columns (all if None).
+        chunk_rows (int): Rows per chunk.
+        **read_csv_kwargs: Passed on to pandas.read_csv (e.g. sep, encoding).
+
+    Returns:
+        dict: {column name: ColumnSummary} in file order.
+
+    A column is numeric as long as all its chunks are. A column that turns out to
+    contain text in a later chunk (e.g. empty in the first chunk) is read again
+    as a text column, like pandas would type it when reading the whole file.
+    """
+    summaries: dict[str, ColumnSummary] = {}
+    text_later: list[str] = []
+    reader = pd.read_csv(file_path, usecols=columns, chunksize=chunk_rows, **read_csv_kwargs)
+    for chunk in reader:
+        for name in chunk.columns:
+            if name in text_later:
+                continue
+            numeric = _is_numeric(chunk[name].dtype)
+            if name not in summaries:
+                summaries[name] = ColumnSummary(name, numeric)
+            elif summaries[name].numeric and not numeric:
+                text_later.append(name)
+                continue
+            summaries[name].update(chunk[name])
+
+    if text_later:
+        for name in text_later:
+            summaries[name] = ColumnSummary(name, numeric=False)
+        kwargs = {**read_csv_kwargs, "dtype": str}
+        for chunk in pd.read_csv(file_path, usecols=text_later, chunksize=chunk_rows, **kwargs):
+            for name in text_later:
+                summaries[name].update(chunk[name])
+    return summaries
+
+
+def stream_describe(file_path: str, columns: Optional[list[str]] = None, chunk_rows: int = CSV_CHUNK_ROWS,
+                    **read_csv_kwargs) -> pd.DataFrame:
+    """
+    Streaming equivalent of pd.read_csv(file_path).describe().
+
+    Like pandas, only numeric columns are described when no columns are given
+    and all columns are text columns describe them instead.
+    Quantiles are approximate, everything else is exact (top/freq can be approximate
+    for text columns with more than TOP_K_CAPACITY distinct values).
+    """
+    summaries = summarize_csv(file_path, columns, chunk_rows, **read_csv_kwargs)
+    selected = list(summaries.values())
+    if columns is None and any(summary.numeric for summary in selected):
+        selected = [summary for summary in selected if summary.numeric]
+    return pd.concat([summary.describe() for summary in selected], axis=1)
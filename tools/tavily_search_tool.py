@@ -10,6 +10,8 @@ import os
 
 import json
 
+from tools.registry import tool_description
+
 def web_search(query: str, limit: int = 3) -> str:
     """
     Search Tavily for a given query string and return up to `limit` results.
@@ -33,7 +35,7 @@ def web_search(query: str, limit: int = 3) -> str:
 tavily_search_tool = Tool(
     name="web_search",
     func=web_search,
-    description="Search The web for a given query string and return up to 3 results."
+    description=tool_description("web_search")
 )
 
 if __name__ == "__main__":
@@ -0,0 +1,69 @@
+"""
+text_index.py
+Small in-memory lexical index (BM25) for ranking text chunks against a query.
+Used to return only the relevant parts of large tool outputs.
+"""
+
+import math
+import re
+from collections import Counter
+
+_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase word tokens of a text."""
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+class BM25Index:
+    """Okapi BM25 over a fixed list of documents."""
+
+    def __init__(self, documents: list[str], k1: float = 1.5, b: float = 0.75):
+        """
+        Args:
+            documents (list[str]): The texts to index.
+            k1 (float): Term frequency saturation.
+            b (float): Length normalisation.
+        """
+        self.k1 = k1
+        self.b = b
+        self.term_counts = [Counter(tokenize(document)) for document in documents]
+        self.lengths = [sum(counts.values()) for counts in self.term_counts]
+        self.avg_length = (sum(self.lengths) / len(self.lengths)) if self.lengths else 0.0
+
+        document_frequency = Counter()
+        for counts in self.term_counts:
+            document_frequency.update(counts.keys())
+        n = len(documents)
+        self.idf = {term: math.log(1 + (n - df + 0.5) / (df + 0.5)) for term, df in document_frequency.items()}
+
+    def __len__(self) -> int:
+        return len(self.term_counts)
+
+    def score(self, query: str, index: int) -> float:
+        """BM25 score of document `index` for `query`."""
+        counts = self.term_counts[index]
+        length_norm = 1 - self.b + self.b * (self.lengths[index] / self.avg_length if self.avg_length else 0.0)
+        score = 0.0
+        for term in set(tokenize(query)):
+            tf = counts.get(term, 0)
+            if tf:
+                score += self.idf[term] * tf * (self.k1 + 1) / (tf + self.k1 * length_norm)
+        return score
+
+    def search(self, query: str, top_k: int = 3) -> list[tuple[int, float]]:
+        """
+        Rank the documents for a query.
+
+        Args:
+            query (str): Search text.
+            top_k (int): Number of results.
+
+        Returns:
+            list of (document index, score), best first, only documents with a score above 0.
+        """
+        scores = [(index, self.score(query, index)) for index in range(len(self))]
+        scores = [item for item in scores if item[1] > 0]
+        scores.sort(key=lambda item: item[1], reverse=True)
+        return scores[:top_k]
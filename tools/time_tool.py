@@ -3,6 +3,8 @@ from datetime import datetime
 from langchain.agents import Tool
 from pytz import timezone as pytz_timezone, UnknownTimeZoneError
 
+from tools.registry import tool_description
+
 
 def get_current_time(timezone: str = "UTC") -> str:
     """
@@ -32,5 +34,5 @@ def get_current_time(timezone: str = "UTC") -> str:
 time_tool = Tool(
     name="current_time",
     func=get_current_time,
-    description="Gibt die aktuelle UTC-Zeit zurück. Optional: Geben Sie eine andere Zeitzone an, um die Zeit in dieser Zeitzone zu erhalten."
+    description=tool_description("current_time")
 )
\ No newline at end of file
@@ -0,0 +1,257 @@
+"""
+tool_cache.py
+Memoization of tool calls across the steps of a question and across questions.
+The same calls come up again and again (search_wikipedia("Mercedes Sosa"),
+get_defunct_countries(), the same arXiv query), so the results of the tools in
+TOOL_CACHE_POLICIES are stored in a SQLite database, keyed by the tool name and
+the normalised arguments. Each tool has a policy: never cached (the default,
+e.g. current_time or code execution), cached for a TTL (search results) or
+cached permanently (static data). The least recently used entries are evicted
+when the cache grows over TOOL_CACHE_MAX_BYTES. Hits and misses are counted per
+tool.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Optional
+
+from langchain_core.runnables import RunnableConfig
+from langchain_core.tools import BaseTool
+
+TOOL_CACHE_ENABLED = os.getenv("TOOL_CACHE", "1") != "0"
+TOOL_CACHE_DIR = os.getenv("TOOL_CACHE_DIR", os.path.join(tempfile.gettempdir(), "agent_tool_cache"))
+TOOL_CACHE_MAX_BYTES = int(os.getenv("TOOL_CACHE_MAX_BYTES", str(256 * 1024 ** 2)))
+# Lifetime of search results and of Wikipedia pages in seconds
+TOOL_CACHE_SEARCH_TTL = float(os.getenv("TOOL_CACHE_SEARCH_TTL", str(6 * 3600)))
+TOOL_CACHE_REFERENCE_TTL = float(os.getenv("TOOL_CACHE_REFERENCE_TTL", str(7 * 24 * 3600)))
+
+FOREVER = None
+# Tool name -> lifetime in seconds (FOREVER for static data). Tools that are not
+# listed are never cached: side effects (code execution, downloads), results that
+# change every call (current_time) or per-question state (read_result). Tools on
+# local files are not listed either, they have their own caches keyed by the file hash.
+TOOL_CACHE_POLICIES: dict[str, Optional[float]] = {
+    "get_defunct_countries": FOREVER,
+    "get_youtube_transcript": FOREVER,
+    "web_search": TOOL_CACHE_SEARCH_TTL,
+    "search_arxiv": TOOL_CACHE_SEARCH_TTL,
+    "search_wikipedia": TOOL_CACHE_REFERENCE_TTL,
+    "get_wikipedia_page": TOOL_CACHE_REFERENCE_TTL,
+    "get_wikipedia_toc": TOOL_CACHE_REFERENCE_TTL,
+    "search_wikipedia_page": TOOL_CACHE_REFERENCE_TTL,
+}
+
+_MISSING = object()
+# Type marker in front of a stored result: text as is, everything else as JSON
+_TEXT, _JSON = "text:", "json:"
+
+
+def _normalise(value: Any) -> Any:
+    """Arguments in a canonical form: whitespace collapsed in strings, containers recursively."""
+    if isinstance(value, str):
+        return " ".join(value.split())
+    if isinstance(value, dict):
+        return {str(key): _normalise(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalise(item) for item in value]
+    return value
+
+
+def cache_key(tool_name: str, args: tuple, kwargs: dict) -> str:
+    """SHA-256 of the tool name and the normalised arguments."""
+    payload = {"tool": tool_name, "args": _normalise(list(args)),
+               "kwargs": _normalise({key: value for key, value in kwargs.items() if value is not None})}
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class ToolCache:
+    """Size-bounded LRU of tool results on disk, safe to use from several threads."""
+
+    def __init__(self, cache_dir: str = TOOL_CACHE_DIR, max_bytes: int = TOOL_CACHE_MAX_BYTES):
+        """
+        Open (or create) the cache.
+
+        Args:
+            cache_dir (str): Directory for the database.
+            max_bytes (int): Maximum total size of the cached results.
+        """
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(cache_dir, "tool_results.sqlite"), check_same_thread=False)
+        self._stats: dict[str, dict[str, int]] = {}
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS results (
+                    key TEXT PRIMARY KEY,
+                    tool TEXT NOT NULL,
+                    result TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS results_last_access ON results (last_access)")
+
+    def _count(self, tool_name: str, field: str) -> None:
+        stats = self._stats.setdefault(tool_name, {"hits": 0, "misses": 0, "expired": 0})
+        stats[field] += 1
+
+    def get(self, tool_name: str, key: str, ttl: Optional[float]) -> Any:
+        """Cached result, or _MISSING if there is none or it is older than ttl seconds."""
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT result, created FROM results WHERE key = ?", (key,)).fetchone()
+            if row is not None and ttl is not None and now - row[1] > ttl:
+                self._conn.execute("DELETE FROM results WHERE key = ?", (key,))
+                self._count(tool_name, "expired")
+                row = None
+            if row is None:
+                self._count(tool_name, "misses")
+                return _MISSING
+            self._conn.execute("UPDATE results SET last_access = ? WHERE key = ?", (now, key))
+            self._count(tool_name, "hits")
+            return row[0]
+
+    def put(self, tool_name: str, key: str, result: str) -> None:
+        now = time.time()
+        size = len(result.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)",
+                               (key, tool_name, result, size, now, now))
+            self._evict()
+
+    def _evict(self) -> None:
+        """Delete least recently used results until the cache fits into max_bytes (lock held)."""
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._conn.execute("SELECT key, size FROM results ORDER BY last_access").fetchall():
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM results WHERE key = ?", (key,))
+            total -= size
+
+    def total_bytes(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        """Hits, misses and expired entries per tool since the cache was opened (or reset)."""
+        with self._lock:
+            return {tool: dict(counts) for tool, counts in self._stats.items()}
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._stats = {}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_cache: Optional[ToolCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_tool_cache() -> ToolCache:
+    """Return the process-wide tool cache."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ToolCache()
+    return _cache
+
+
+def _encode(result: Any) -> Optional[str]:
+    """Stored form of a tool result, or None if it cannot be stored (not JSON serializable)."""
+    if isinstance(result, str):
+        return _TEXT + result
+    try:
+        return _JSON + json.dumps(result, ensure_ascii=False)
+    except (TypeError, ValueError):
+        return None
+
+
+def _decode(stored: str) -> Any:
+    if stored.startswith(_JSON):
+        return json.loads(stored[len(_JSON):])
+    return stored[len(_TEXT):] if stored.startswith(_TEXT) else stored
+
+
+def _memoized(tool_name: str, func: Callable, ttl: Optional[float], cache: Optional[ToolCache]) -> Callable:
+    """Wrap a tool function; the RunnableConfig (if any) is passed through but not part of the key."""
+    def lookup(args: tuple, kwargs: dict, run: Callable[[], Any]) -> Any:
+        store = cache or get_tool_cache()
+        key = cache_key(tool_name, args, kwargs)
+        stored = store.get(tool_name, key, ttl)
+        if stored is not _MISSING:
+            return _decode(stored)
+        result = run()
+        # error messages (text starting with 'Error') are not stored
+        encoded = None if isinstance(result, str) and result.startswith("Error") else _encode(result)
+        if encoded is not None:
+            store.put(tool_name, key, encoded)
+        return result
+
+    if getattr(func, "lazy", None) is not None:  # registry._with_config: LangChain injects the config
+        def call_with_config(*args: Any, config: RunnableConfig, **kwargs: Any) -> Any:
+            return lookup(args, kwargs, lambda: func(*args, config=config, **kwargs))
+        return call_with_config
+
+    def call(*args: Any, **kwargs: Any) -> Any:
+        return lookup(args, kwargs, lambda: func(*args, **kwargs))
+    return call
+
+
+def memoize_tools(tools: list[BaseTool], policies: Optional[dict] = None,
+                  cache: Optional[ToolCache] = None) -> list[BaseTool]:
+    """
+    Return the tools with the results of the cacheable ones memoized.
+
+    Args:
+        tools (list[BaseTool]): Tools from the registry (Tool or StructuredTool).
+        policies (dict, optional): Tool name -> TTL in seconds or FOREVER, defaults to TOOL_CACHE_POLICIES.
+        cache (ToolCache, optional): Defaults to the process-wide cache.
+
+    Returns:
+        list[BaseTool]: Same names and schemas; tools without a policy are returned unchanged.
+    """
+    if not TOOL_CACHE_ENABLED and cache is None:
+        return list(tools)
+    policies = TOOL_CACHE_POLICIES if policies is None else policies
+    memoized = []
+    for tool in tools:
+        func = getattr(tool, "func", None)
+        if tool.name not in policies or func is None:
+            memoized.append(tool)
+            continue
+        memoized.append(tool.model_copy(update={"func": _memoized(tool.name, func, policies[tool.name], cache)}))
+    return memoized
+
+
+def tool_cache_stats() -> dict[str, dict[str, int]]:
+    return get_tool_cache().stats() if _cache is not None else {}
+
+
+def format_tool_cache_stats() -> str:
+    stats = tool_cache_stats()
+    if not stats:
+        return "no cached tool calls"
+    lines = []
+    for tool, counts in sorted(stats.items()):
+        calls = counts["hits"] + counts["misses"]
+        lines.append(f"{tool}: {counts['hits']}/{calls} hits ({counts['hits'] / calls:.0%}), "
+                     f"{counts['expired']} expired")
+    return "\n".join(lines)
@@ -1,11 +1,30 @@
 """
 wikipedia_tool.py
 LangChain Tool for fetching full Wikipedia page content.
+Pages are returned as compact text with tables as CSV rows (see html_to_text.py)
+instead of the raw HTML.
+
+Besides the full page, a page can be split into its sections: get_wikipedia_toc
+lists the sections and search_wikipedia_page returns only the sections that
+match a query (BM25), so the agent does not have to read the whole page.
+Pages are fetched once per process and cached.
 """
 
+import re
+from functools import lru_cache
+
 from langchain.agents import Tool
 
-import requests
+from tools import http_client
+from tools.html_to_text import convert_page, html_to_text
+from tools.text_index import BM25Index
+from tools.registry import tool_description
+
+WIKIPEDIA_API = 'https://en.wikipedia.org/w/api.php'
+# Longer sections are cut, so one hit cannot flood the prompt
+MAX_SECTION_CHARS = 4000
+
+_HEADING_PATTERN = re.compile(r"<h([2-6])[^>]*>(.*?)</h\1>", re.IGNORECASE | re.DOTALL)
 
 
 def search_wikipedia(query: str, limit: int = 5) -> list[dict]:
@@ -19,7 +38,7 @@ def search_wikipedia(query: str, limit: int = 5) -> list[dict]:
     Returns:
         list of dict: Each dict contains 'title' and 'snippet'.
     """
-    endpoint = 'https://en.wikipedia.org/w/api.php'
+    endpoint = WIKIPEDIA_API
     params = {
         'action': 'query',
         'list': 'search',
@@ -28,14 +47,29 @@ def search_wikipedia(query: str, limit: int = 5) -> list[dict]:
         'format': 'json',
         'srprop': 'snippet'
     }
-    resp = requests.get(endpoint, params=params)
+    resp = http_client.get(endpoint, params=params)
     resp.raise_for_status()
     data = resp.json().get('query', {}).get('search', [])
     return [{'title': item['title'], 'snippet': item['snippet']} for item in data]
 
-def get_wikipedia_page(title: str) -> str:
+def get_wikipedia_page(title: str) -> dict:
+    """
+    Retrieve the full content of a Wikipedia page by title as compact text.
+
+    Args:
+        title (str): The exact title of the Wikipedia page.
+
+    Returns:
+        dict: 'title', 'text' (Markdown-like, with '[Table N]' placeholders) and
+        'tables' (list of dicts with 'caption' and 'csv').
+    """
+    title = title.strip().strip("'\"")
+    return {"title": title, **convert_page(_fetch_page_html(title))}
+
+
+def get_wikipedia_page_html(title: str) -> str:
     """
-    Retrieve the full HTML content of a Wikipedia page by title.
+    Retrieve the raw HTML content of a Wikipedia page by title.
 
     Args:
         title (str): The exact title of the Wikipedia page.
@@ -43,27 +77,124 @@ def get_wikipedia_page(title: str) -> str:
     Returns:
         str: HTML content of the page.
     """
-    endpoint = 'https://en.wikipedia.org/w/api.php'
+    return _fetch_page_html(title)
+
+
+@lru_cache(maxsize=32)
+def _fetch_page_html(title: str) -> str:
+    endpoint = WIKIPEDIA_API
     params = {
         'action': 'parse',
         'page': title,
         'format': 'json',
-        'prop': 'text'
+        'prop': 'text',
+        'redirects': 1
     }
-    resp = requests.get(endpoint, params=params)
+    resp = http_client.get(endpoint, params=params)
     resp.raise_for_status()
-    return resp.json().get('parse', {}).get('text', {}).get('*', '')
+    data = resp.json()
+    if 'error' in data:
+        raise ValueError(data['error'].get('info', f"Page '{title}' not found"))
+    return data.get('parse', {}).get('text', {}).get('*', '')
+
+
+def split_sections(page_html: str) -> list[dict]:
+    """
+    Split a parsed Wikipedia page into its sections.
+
+    Args:
+        page_html (str): HTML as returned by the parse API.
+
+    Returns:
+        list of dict: Each dict contains 'number', 'level', 'title' and 'text'.
+        Section 0 is the introduction before the first heading.
+    """
+    sections = []
+    start, title, level = 0, "(Intro)", 1
+    for match in _HEADING_PATTERN.finditer(page_html):
+        sections.append({"level": level, "title": title, "text": html_to_text(page_html[start:match.start()])})
+        level = int(match.group(1))
+        title = html_to_text(match.group(2))
+        start = match.end()
+    sections.append({"level": level, "title": title, "text": html_to_text(page_html[start:])})
+    for number, section in enumerate(sections):
+        section["number"] = number
+    return sections
+
+
+@lru_cache(maxsize=32)
+def _page_index(title: str) -> tuple[list[dict], BM25Index]:
+    sections = split_sections(_fetch_page_html(title))
+    index = BM25Index([f"{section['title']}\n{section['text']}" for section in sections])
+    return sections, index
+
+
+def _format_section(section: dict) -> str:
+    text = section["text"]
+    if len(text) > MAX_SECTION_CHARS:
+        text = text[:MAX_SECTION_CHARS] + " ... [section truncated]"
+    return f"## {section['number']}. {section['title']}\n{text}"
+
+
+def get_wikipedia_toc(title: str) -> str:
+    """
+    Return the table of contents of a Wikipedia page.
+
+    Args:
+        title (str): The exact title of the Wikipedia page.
+
+    Returns:
+        str: One line per section with number, title and length in characters.
+    """
+    try:
+        sections, _ = _page_index(title.strip().strip("'\""))
+        lines = [f"{'  ' * max(section['level'] - 2, 0)}{section['number']}. {section['title']} ({len(section['text'])} chars)"
+                 for section in sections]
+        return f"Sections of '{title}':\n" + "\n".join(lines)
+    except Exception as e:
+        return f"Error reading Wikipedia page: {str(e)}"
+
+
+def search_wikipedia_page(title: str, query: str, top_k: int = 3) -> str:
+    """
+    Return only the sections of a Wikipedia page that match a query.
+
+    Args:
+        title (str): The exact title of the Wikipedia page.
+        query (str): Search terms, or a section number or section title from get_wikipedia_toc.
+        top_k (int): Maximum number of sections to return.
+
+    Returns:
+        str: The matching sections as text, best match first.
+    """
+    try:
+        sections, index = _page_index(title.strip().strip("'\""))
+        query = query.strip()
+
+        # direct access to a section from the table of contents
+        if query.isdigit() and int(query) < len(sections):
+            return _format_section(sections[int(query)])
+        for section in sections:
+            if section["title"].lower() == query.lower():
+                return _format_section(section)
+
+        hits = index.search(query, top_k=top_k)
+        if not hits:
+            return f"No section of '{title}' matches '{query}'. Use get_wikipedia_toc to list the sections."
+        return "\n\n".join(_format_section(sections[number]) for number, _ in hits)
+    except Exception as e:
+        return f"Error reading Wikipedia page: {str(e)}"
 
 wiki_search_tool = Tool(
     name="search_wikipedia",
     func=search_wikipedia,
-    description="Search Wikipedia for a given query string and return up to 5 results. Each result contains 'title' and 'snippet'."
+    description=tool_description("search_wikipedia")
 )
 
 wiki_page_tool = Tool(
     name="get_wikipedia_page",
     func=get_wikipedia_page,
-    description="Retrieve the full HTML content of a Wikipedia page by title. Provide the exact title of the Wikipedia page."
+    description=tool_description("get_wikipedia_page")
 )
 
 if __name__ == "__main__":